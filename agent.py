@@ -1,16 +1,19 @@
 from pydantic_ai import Agent
 from pydantic_ai.usage import UsageLimits
-from pydantic_ai.models.anthropic import AnthropicModel
-from pydantic_ai.mcp import MCPServerStdio
-
-from videojungle import ApiClient
+from utils.mcp_pool import mcp_pool
+from utils.profiling import profiled_run
 
 from pydantic import BaseModel, Field
 from typing import List
 from utils.tools import download
+from utils.vj import PooledApiClient, AsyncApiClient
+from utils.uploads import upload_or_link
+from utils.streaming import StreamedItems
+from utils.digest import add_digest_tool
+from utils.clients import anthropic_model
 import logfire
 import os
-import time
+import asyncio
 
 if not os.environ.get("VJ_API_KEY"):
     raise ValueError("VJ_API_KEY environment variable is not set.")
@@ -23,31 +26,12 @@ serper_api_key = os.environ["SERPER_API_KEY"]
 
 logfire.configure()
 
-vj = ApiClient(vj_api_key) # video jungle api client
-
-vj_server = MCPServerStdio(
-    'uvx',
-    args=[
-        '-p', '3.11',
-        '--from', 'video_editor_mcp@0.1.36',
-        'video-editor-mcp'
-    ],
-    env={
-        'VJ_API_KEY': vj_api_key,
-    },
-    timeout=30
-)
+vj = PooledApiClient(vj_api_key) # video jungle api client
+avj = AsyncApiClient(vj) # non-blocking view of the same client
 
-serper_server = MCPServerStdio(
-    'uvx',
-    args=[
-        '-p', '3.11',
-        'serper-mcp-server@latest',
-    ],
-    env={
-        'SERPER_API_KEY': serper_api_key,
-    }
-)
+vj_server = mcp_pool.get("video-editor")
+
+serper_server = mcp_pool.get("serper")
 
 class VideoItem(BaseModel):
     url: str
@@ -60,9 +44,10 @@ class VideoEdit(BaseModel):
     project_id: str
     edit_id: str
 
-model = AnthropicModel("claude-sonnet-4-20250514")
+model = anthropic_model("claude-sonnet-4-20250514")
 
 edit_agent = Agent(
+    name='edit_agent',
     model=model,
     system_prompt='You are an expert video editor. ' \
     'You can answer questions, download and analyze videos, and create rough video edits using a mix of projects and remote videos.' \
@@ -72,7 +57,11 @@ edit_agent = Agent(
     output_type=VideoEdit,
     instrument=True,
 )
+
+add_digest_tool(edit_agent, avj)
+
 search_agent = Agent(
+    name='search_agent',
     model=model,
     system_prompt='You are an expert video sourcer. You find the best source videos for a given topic.',
     mcp_servers=[vj_server, serper_server],
@@ -80,73 +69,85 @@ search_agent = Agent(
     instrument=True,
 )
 
-async def main():
-    async with search_agent.run_mcp_servers():
-        print("Search Agent is running")
-        result = await search_agent.run("can you search the web for the newest clips about nathan fielder? I'd like a list of 5 urls with video clips. it's may 21, 2025 by the way, and nathan is doing a show called 'the rehearsal'.",
-                                        usage_limits=UsageLimits(request_limit=7))
-
-    print(result)
-    print("Creating a Video Jungle project with the found videos")
-    project = vj.projects.create("Nathan Fielder Clips", description="Pydantic Agent Nathan Fielder Clips")
+async def process_video(project_id: str, video: VideoItem) -> bool:
+    """Download one video and add it to the project, returning whether it succeeded"""
+    print(f"Processing video - Title: {video.title}, URL: {video.url}")
+    # Create a safe filename by replacing problematic characters
+    safe_title = video.title.replace('/', '-').replace('\\', '-')
+    output_filename = f"{safe_title}.mp4"
+
+    try:
+        # Try to download the video
+        print(f"Downloading {video.title}...")
+        await asyncio.to_thread(download, video.url, output_path=output_filename, format="best")
+
+        # Check if file exists before uploading
+        if os.path.exists(output_filename):
+            print(f"Upload to Video Jungle: {video.title}")
+            asset_id, how = await avj.run(
+                upload_or_link, vj, project_id, output_filename,
+                name=video.title,
+                description=f"Agent downloaded video: {video.title}",
+            )
+            print(f"Asset {how}: {asset_id}")
+            # Optionally, you can delete the local file after uploading
+            os.remove(output_filename)
+            return True
+        print(f"Error: Download failed or file not found for {video.title}")
+
+    except Exception as e:
+        # Only print error message if it's not empty
+        if str(e):
+            print(f"Error processing {video.title}: {e}")
+        else:
+            print(f"Error processing {video.title}")
+    return False
 
-    successful_videos = 0
-    failed_videos = []
+async def main():
+    print("Creating a Video Jungle project for the found videos")
+    project = await avj.projects.create("Nathan Fielder Clips", description="Pydantic Agent Nathan Fielder Clips")
 
-    for video in result.output.videos:
-        print(f"Processing video - Title: {video.title}, URL: {video.url}")
-        # Create a safe filename by replacing problematic characters
-        safe_title = video.title.replace('/', '-').replace('\\', '-')
-        output_filename = f"{safe_title}.mp4"
+    # Each video is downloaded as soon as the search agent has streamed it out
+    videos = StreamedItems(VideoItem, "videos", key=lambda video: video.url)
 
+    async def search():
         try:
-            # Try to download the video
-            print(f"Downloading {video.title}...")
-            download(video.url, output_path=output_filename, format="best")
-
-            # Check if file exists before uploading
-            if os.path.exists(output_filename):
-                print(f"Upload to Video Jungle: {video.title}")
-                project.upload_asset(
-                    name=video.title,
-                    description=f"Agent downloaded video: {video.title}",
-                    filename=output_filename,
-                )
-                successful_videos += 1
-                # Optionally, you can delete the local file after uploading
-                os.remove(output_filename)
-            else:
-                print(f"Error: Download failed or file not found for {video.title}")
-                failed_videos.append(video.title)
-
-        except Exception as e:
-            # Only print error message if it's not empty
-            if str(e):
-                print(f"Error processing {video.title}: {e}")
-            else:
-                print(f"Error processing {video.title}")
-            failed_videos.append(video.title)
-            continue  # Skip to the next video
+            async with search_agent.run_mcp_servers():
+                print("Search Agent is running")
+                return await profiled_run(search_agent, "can you search the web for the newest clips about nathan fielder? I'd like a list of 5 urls with video clips. it's may 21, 2025 by the way, and nathan is doing a show called 'the rehearsal'.",
+                                          on_output=videos.on_output,
+                                          usage_limits=UsageLimits(request_limit=7))
+        finally:
+            videos.close()
+
+    async def handle(video: VideoItem):
+        return video, await process_video(project.id, video)
+
+    search_task = asyncio.create_task(search())
+    outcomes = await videos.consume(handle)
+    result = await search_task
+    print(result)
+
+    successful_videos = sum(ok for _, ok in outcomes)
+    failed_videos = [video.title for video, ok in outcomes if not ok]
 
     # Summary
     print(f"\nSummary: Successfully processed {successful_videos} videos")
     if failed_videos:
         print(f"Failed to process {len(failed_videos)} videos: {', '.join(failed_videos)}")
-    time.sleep(45) # wait 45 seconds for analysis to finish (we'll make this precise later)
+    await asyncio.sleep(45) # wait 45 seconds for analysis to finish (we'll make this precise later)
     # Next we can use the project info to generate a rough cut
     async with edit_agent.run_mcp_servers():
         print("Video Editing Agent is now running")
-        result = await edit_agent.run(f"""can you use the video assets in the project_id '{project.id}' to create a
+        result = await profiled_run(edit_agent, f"""can you use the video assets in the project_id '{project.id}' to create a
                                       single edit incorporating all the assets that are videos in there?
                                       be sure to not render the final video, just create the edit. if there are any outdoor scenes,
-                                      show them first. also, only use the assets in the project in the edit. you should grab
-                                      two asset's info from the project at a time, and use multiple requests from the get-project-assets
-                                      tool if you use it.""",
+                                      show them first. also, only use the assets in the project in the edit. call get_project_digest once to see
+                                      every video asset with its duration and indoor/outdoor setting instead of paging through get-project-assets.""",
                                       usage_limits=UsageLimits(request_limit=8))
     print(f"resultant project is: {result.output.project_id} and {result.output.edit_id}")
     # below is not necessary because open the edit in the browser is default behavior
     # vj.edits.open_in_browser(project.id, result.output.edit_id)
 
 if __name__ == "__main__":
-    import asyncio
-    asyncio.run(main())
+    asyncio.run(mcp_pool.run(main()))
@@ -1,15 +1,18 @@
-from videojungle import ApiClient
-
 from typing import List, Optional
-import instructor
-from anthropic import Anthropic # Assumes you've set your API key as an environment variable
 
 from pydantic import BaseModel
+from utils.vj import PooledApiClient, AsyncApiClient
+from utils.clients import instructor_client
+from utils.markdown import ANY_HEADING, iter_sections
+from utils.corpus_index import CorpusIndex
+from utils.render import RenderDownloader, RenderError
 import logfire
 import os
-import time
+import asyncio
 import click
+import random
 import re
+import time
 
 if not os.environ.get("VJ_API_KEY"):
     raise ValueError("VJ_API_KEY environment variable is not set.")
@@ -17,10 +20,9 @@ if not os.environ.get("VJ_API_KEY"):
 vj_api_key = os.environ["VJ_API_KEY"]
 
 logfire.configure()
-logfire.instrument_openai()
-logfire.instrument_anthropic()
 
-vj = ApiClient(vj_api_key) # video jungle api client
+vj = PooledApiClient(vj_api_key) # video jungle api client
+avj = AsyncApiClient(vj) # non-blocking view of the same client
 
 class ResearchTopic(BaseModel):
     heading: str
@@ -39,46 +41,13 @@ def parse_markdown_by_headings(file_path: str) -> List[ResearchTopic]:
     topics = []
 
     try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-
-        # Split by any heading (# or ##)
-        sections = re.split(r'^(#{1,6}\s+.+)$', content, flags=re.MULTILINE)
-
-        # Process sections
-        current_heading = None
-        current_content = []
-        found_first_heading = False
-
-        for i, section in enumerate(sections):
-            if section.strip():
-                # Check if this is a heading
-                if re.match(r'^#{1,6}\s+', section):
-                    found_first_heading = True
-                    # Save previous section if it has content and a heading
-                    if current_heading and current_content:
-                        content_text = '\n'.join(current_content).strip()
-                        # Check if the content has actual text (not just links/references)
-                        if has_meaningful_content(content_text):
-                            topics.append(ResearchTopic(
-                                heading=current_heading,
-                                content=content_text
-                            ))
-                    # Start new section
-                    current_heading = section.strip().lstrip('#').strip()
-                    current_content = []
-                else:
-                    # Only add content if we've found the first heading
-                    if found_first_heading:
-                        current_content.append(section.strip())
-
-        # Don't forget the last section
-        if current_heading and current_content:
-            content_text = '\n'.join(current_content).strip()
-            if has_meaningful_content(content_text):
+        # Split at every heading level, streaming the file a line at a time
+        for section in iter_sections(file_path, policy=ANY_HEADING):
+            # Check if the content has actual text (not just links/references)
+            if section.content and has_meaningful_content(section.content):
                 topics.append(ResearchTopic(
-                    heading=current_heading,
-                    content=content_text
+                    heading=section.heading,
+                    content=section.content
                 ))
 
     except FileNotFoundError:
@@ -110,19 +79,30 @@ def has_meaningful_content(content: str) -> bool:
     # Must have at least 50 characters of meaningful text
     return len(remaining_text) > 50
 
+# Bump when parse_markdown_by_headings or has_meaningful_content change, so indexed topics are re-parsed
+TOPIC_INDEX_VERSION = "1"
+
+def parse_topics(file_path: str) -> List[dict]:
+    """Topics of one markdown file, in the form kept by the research index."""
+    return [topic.model_dump(include={'heading', 'content'}) for topic in parse_markdown_by_headings(file_path)]
+
 def load_research_materials() -> List[ResearchTopic]:
     """Load and parse research materials from markdown files."""
     all_topics = []
 
     # Find all markdown files in the current directory
-    markdown_files = [f for f in os.listdir('.') if f.endswith('.md') and f not in ['README.md', 'CLAUDE.md']]
+    markdown_files = sorted(f for f in os.listdir('.') if f.endswith('.md') and f not in ['README.md', 'CLAUDE.md'])
 
     print(f"Found {len(markdown_files)} markdown files to process")
 
+    # Only new or changed files are parsed again; the rest come from the index
+    index = CorpusIndex('.', version=TOPIC_INDEX_VERSION)
+    topics_by_file = index.load(markdown_files, parse_topics)
+    if index.reused:
+        print(f"  - Loaded {index.reused} unchanged files from the research index")
+
     for file in markdown_files:
-        print(f"  - Processing {file}")
-        topics = parse_markdown_by_headings(file)
-        all_topics.extend(topics)
+        all_topics.extend(ResearchTopic(**topic) for topic in topics_by_file.get(file, []))
 
     # Add previous and next heading context
     for i, topic in enumerate(all_topics):
@@ -135,8 +115,7 @@ def load_research_materials() -> List[ResearchTopic]:
 
 def generate_voice_overlay_script(topic: ResearchTopic) -> VoiceOverScript:
     """Generate a voice overlay script for a single topic."""
-    workflow_client = Anthropic()
-    client = instructor.from_anthropic(workflow_client)
+    client = instructor_client("anthropic")
 
     # Build context information
     context_info = ""
@@ -181,7 +160,136 @@ def generate_voice_overlay_script(topic: ResearchTopic) -> VoiceOverScript:
     return resp
 
 
-async def async_main(generate_audio: bool, download_video: bool, topic_index: Optional[int] = None):
+class TopicResult(BaseModel):
+    number: int
+    heading: str
+    script: Optional[VoiceOverScript] = None
+    asset_id: Optional[str] = None
+    filename: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BatchLimits:
+    """Separate concurrency limits for each stage topics pass through"""
+
+    def __init__(self, scripts: int = 4, jobs: int = 3, downloads: int = 3):
+        self.scripts = asyncio.Semaphore(scripts)
+        self.jobs = asyncio.Semaphore(jobs)
+        self.downloads = asyncio.Semaphore(downloads)
+
+
+def parse_topic_selection(selection: str, count: int) -> List[int]:
+    """0-based topic indexes for --topics: 'all', a range like '3-7' or a list like '1,4,6' (1-based)."""
+    if selection.strip().lower() == 'all':
+        return list(range(count))
+    indexes = []
+    for part in selection.split(','):
+        first, _, last = part.strip().partition('-')
+        try:
+            start, end = int(first), int(last or first)
+        except ValueError:
+            raise ValueError(f"Invalid topic selection '{part.strip()}' (use 'all', '3-7' or '1,4,6')")
+        if not 1 <= start <= end <= count:
+            raise ValueError(f"Topics {part.strip()} are out of range (1-{count})")
+        indexes.extend(i for i in range(start - 1, end) if i not in indexes)
+    return indexes
+
+
+def topic_filename(topic: ResearchTopic, number: Optional[int] = None) -> str:
+    """Download name for a topic's video, numbered in batch mode so topics sharing a heading don't collide."""
+    name = f"{topic.heading.replace('/', '-').replace(' ', '_')[:50]}_video.mp4"
+    return f"{number:02d}_{name}" if number is not None else name
+
+
+async def wait_for_asset(asset_id: str, timeout: float = 900, poll_interval: float = 2.0,
+                         max_poll_interval: float = 15.0) -> str:
+    """Poll a generated asset until it is uploaded, returning its download URL."""
+    deadline = time.monotonic() + timeout
+    delay = poll_interval
+    while True:
+        asset = await avj.run(vj._make_request, "GET", f"/assets/{asset_id}")
+        if asset.get("uploaded") and asset.get("download_url"):
+            return asset["download_url"]
+        status = asset.get("status")
+        if status and status.lower() in ("failed", "error"):
+            raise RenderError(f"Generation of asset {asset_id} failed with status {status}")
+        if time.monotonic() + delay > deadline:
+            raise RenderError(f"Asset {asset_id} was not ready within {timeout:.0f}s")
+        await asyncio.sleep(delay * random.uniform(0.8, 1.2))
+        delay = min(delay * 1.5, max_poll_interval)
+
+
+async def process_topic(topic: ResearchTopic, number: int, generate_audio: bool, download_video: bool,
+                        limits: BatchLimits, batch: bool = False) -> TopicResult:
+    """Script, generate and download one topic, each stage under its own limit."""
+    result = TopicResult(number=number, heading=topic.heading)
+    label = f"[{number}] " if batch else ""
+    try:
+        # Generate voice overlay script for selected topic
+        async with limits.scripts:
+            print(f"\n{label}Generating voice overlay script for: {topic.heading}...")
+            if not batch:
+                if topic.previous_heading:
+                    print(f"  Previous: {topic.previous_heading}")
+                if topic.next_heading:
+                    print(f"  Next: {topic.next_heading}")
+            result.script = await asyncio.to_thread(generate_voice_overlay_script, topic)
+
+        print(f"\n{label}=== Voice Overlay Script ===")
+        print(f"Topic: {topic.heading}")
+        print(f"Duration estimate: {result.script.duration_estimate}")
+        print(f"\nScript:\n{result.script.script}")
+        print("===========================\n")
+
+        # Optionally generate video on Video Jungle
+        if not generate_audio:
+            return result
+        async with limits.jobs:
+            print(f"{label}Generating video on Video Jungle...")
+
+            # Create project with topic-specific name
+            project_name = f"Educational Video: {topic.heading[:50]}"
+            project = await avj.projects.create(
+                name=project_name,
+                description=f"Educational video about {topic.heading}",
+                generation_method="prompt-to-video"
+            )
+
+            script_id = project.scripts[0].id
+            print(f"{label}Created project: {project.name} with ID: {project.id}")
+
+            # Generate video
+            video = await avj.projects.generate_from_prompt(
+                project_id=project.id,
+                script_id=script_id,
+                prompt=result.script.script,
+            )
+
+        print(f"{label}Generated video with asset id: {video['asset_id']}")
+        result.asset_id = video['asset_id']
+
+        # Download the generated video if requested
+        if not download_video:
+            return result
+        print(f"\n{label}Waiting for video generation to complete...")
+        started = time.monotonic()
+        url = await wait_for_asset(result.asset_id)
+        print(f"{label}Video ready after {time.monotonic() - started:.0f}s")
+
+        filename = topic_filename(topic, number if batch else None)
+        async with limits.downloads:
+            print(f"{label}Downloading generated video as: {filename}")
+            result.filename = await avj.run(RenderDownloader(vj).download, url, filename)
+        print(f"{label}Video downloaded successfully!")
+    except Exception as e:
+        result.error = str(e)
+        print(f"{label}Failed: {str(e)[:200]}")
+    return result
+
+
+async def async_main(generate_audio: bool, download_video: bool, topic_index: Optional[int] = None,
+                     topic_selection: Optional[str] = None, script_workers: int = 4, max_jobs: int = 3,
+                     max_downloads: int = 3):
     """Main async function that runs the research agent."""
 
     # Load research materials
@@ -195,87 +303,65 @@ async def async_main(generate_audio: bool, download_video: bool, topic_index: Op
     if len(topics) > 20:
         print(f"  ... and {len(topics) - 20} more topics")
 
-    # Select topic to process
-    if topic_index is not None:
+    # Select topics to process
+    if topic_selection is not None:
+        try:
+            indexes = parse_topic_selection(topic_selection, len(topics))
+        except ValueError as e:
+            print(f"Error: {e}")
+            return
+        print(f"\nProcessing {len(indexes)} topics "
+              f"({script_workers} scripts, {max_jobs} generations, {max_downloads} downloads at a time)")
+    elif topic_index is not None:
         if 0 <= topic_index < len(topics):
-            selected_topic = topics[topic_index]
-            print(f"\nProcessing topic {topic_index + 1}: {selected_topic.heading}")
+            indexes = [topic_index]
+            print(f"\nProcessing topic {topic_index + 1}: {topics[topic_index].heading}")
         else:
             print(f"Error: Topic index {topic_index + 1} is out of range (1-{len(topics)})")
             return
     else:
         # Let user choose or process all
-        print("\nNo topic specified. Use --topic N to select a specific topic.")
+        print("\nNo topic specified. Use --topic N to select a specific topic, or --topics for a batch.")
         if len(topics) > 0:
-            selected_topic = topics[0]
-            print(f"Processing first topic: {selected_topic.heading}")
+            indexes = [0]
+            print(f"Processing first topic: {topics[0].heading}")
         else:
             print("No topics found to process.")
             return
 
-    # Generate voice overlay script for selected topic
-    print(f"\nGenerating voice overlay script for: {selected_topic.heading}...")
-    if selected_topic.previous_heading:
-        print(f"  Previous: {selected_topic.previous_heading}")
-    if selected_topic.next_heading:
-        print(f"  Next: {selected_topic.next_heading}")
-
-    voice_script = generate_voice_overlay_script(selected_topic)
-
-    print("\n=== Voice Overlay Script ===")
-    print(f"Topic: {selected_topic.heading}")
-    print(f"Duration estimate: {voice_script.duration_estimate}")
-    print(f"\nScript:\n{voice_script.script}")
-    print("===========================\n")
-
-    audio_asset_id = None
-
-    # Optionally generate video on Video Jungle
-    if generate_audio:
-        print("Generating video on Video Jungle...")
-
-        # Create project with topic-specific name
-        project_name = f"Educational Video: {selected_topic.heading[:50]}"
-        project = vj.projects.create(
-            name=project_name,
-            description=f"Educational video about {selected_topic.heading}",
-            generation_method="prompt-to-video"
-        )
-
-        script_id = project.scripts[0].id
-        print(f"Created project: {project.name} with ID: {project.id}")
-
-        # Generate video
-        video = vj.projects.generate_from_prompt(
-            project_id=project.id,
-            script_id=script_id,
-            prompt=voice_script.script,
-        )
-
-        print(f"Generated video with asset id: {video['asset_id']}")
-        audio_asset_id = video['asset_id']
-
-    # Download the generated video if requested
-    if download_video and audio_asset_id:
-        print("\nWaiting for video generation to complete...")
-        time.sleep(30)  # Wait for generation
-
-        filename = f"{selected_topic.heading.replace('/', '-').replace(' ', '_')[:50]}_video.mp4"
-
-        print(f"Downloading generated video as: {filename}")
-        vj.assets.download(audio_asset_id, filename=filename)
-        print("Video downloaded successfully!")
+    batch = topic_selection is not None
+    limits = BatchLimits(scripts=script_workers, jobs=max_jobs, downloads=max_downloads)
+    started = time.monotonic()
+    results = await asyncio.gather(*[
+        process_topic(topics[i], i + 1, generate_audio, download_video, limits, batch=batch) for i in indexes
+    ])
+
+    if batch:
+        print(f"\n=== Batch Summary ({time.monotonic() - started:.0f}s) ===")
+        for result in results:
+            outcome = f"failed: {result.error[:80]}" if result.error else (
+                result.filename or result.asset_id or "script only")
+            print(f"  {result.number}. {result.heading[:50]} - {outcome}")
+        failed = sum(1 for result in results if result.error)
+        print(f"{len(results) - failed}/{len(results)} topics succeeded")
 
 @click.command()
 @click.option('--generate-video', '-g', is_flag=True, help='Generate video with still images on Video Jungle')
 @click.option('--download', '-d', is_flag=True, help='Download the generated video')
 @click.option('--topic', '-t', type=int, help='Topic index to process (1-based). If not specified, processes the first topic.')
-def main(generate_video: bool, download: bool, topic: Optional[int]):
+@click.option('--topics', 'topic_selection', default=None, help="Batch of topics to process: 'all', a range like '3-7' or a list like '1,4,6'")
+@click.option('--script-workers', default=4, help='Scripts generated at the same time in batch mode (default: 4)')
+@click.option('--max-jobs', default=3, help='Video Jungle generations submitted at once (default: 3)')
+@click.option('--max-downloads', default=3, help='Video downloads in flight at once (default: 3)')
+def main(generate_video: bool, download: bool, topic: Optional[int], topic_selection: Optional[str],
+         script_workers: int, max_jobs: int, max_downloads: int):
     """Research agent that loads markdown documents and generates educational videos for individual topics."""
-    import asyncio
+    if topic and topic_selection:
+        raise click.UsageError("Use either --topic or --topics, not both")
     # Convert to 0-based index if provided
     topic_index = topic - 1 if topic else None
-    asyncio.run(async_main(generate_video, download, topic_index))
+    asyncio.run(async_main(generate_video, download, topic_index, topic_selection,
+                           script_workers, max_jobs, max_downloads))
 
 if __name__ == "__main__":
     main()
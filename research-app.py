@@ -10,11 +10,12 @@ from textual.reactive import reactive
 from textual.binding import Binding
 from textual import events
 import asyncio
-from openai import OpenAI
 import os
 from typing import Optional
 from datetime import datetime
 
+from utils.clients import openai_client
+
 
 class QueryRefinementWidget(Static):
     """Widget to display the current query and its refinements"""
@@ -170,9 +171,9 @@ class ResearchApp(App):
     def __init__(self):
         super().__init__()
         # Set a very long timeout (2 hours) for deep research
-        self.client = OpenAI(
-            api_key=os.getenv("OPENAI_API_KEY"),
-            timeout=7200.0  # 2 hours timeout
+        self.client = openai_client(
+            timeout=7200.0,  # 2 hours timeout
+            instrument=False
         )
         self.current_query = ""
         self.refined_query = ""
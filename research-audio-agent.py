@@ -1,21 +1,25 @@
 from pydantic_ai import Agent
-from pydantic_ai.models.gemini import GeminiModel
-from pydantic_ai.mcp import MCPServerStdio
-
-from videojungle import ApiClient, VideoEditCreate, VideoEditAsset, VideoEditAudioAsset, VideoAudioLevel
 
 from typing import List, Dict, Tuple, Optional
-import instructor
-from openai import OpenAI
 
 from pydantic import BaseModel, Field
 from utils.tools import download
+from utils.vj import PooledApiClient, AsyncApiClient
+from utils.uploads import upload_or_link
+from utils.mcp_cache import invalidate_project
+from utils.clients import gemini_model, instructor_client
+from utils.serper import SerperClient
+from utils.routing import CascadeFailed, ModelCascade, min_relevance, route_stats, video_urls
+from utils.edit_spec import BeatEdit
+from utils.beats import MAX_BEAT_SECONDS, MIN_BEAT_SECONDS, merge_candidates
+from utils.journal import RunJournal
+from utils.markdown import H2, iter_sections
 import logfire
 import os
-import time
+import asyncio
 import click
-import re
 import json
+import time
 from datetime import datetime
 
 if not os.environ.get("VJ_API_KEY"):
@@ -28,34 +32,23 @@ vj_api_key = os.environ["VJ_API_KEY"]
 serper_api_key = os.environ["SERPER_API_KEY"]
 
 logfire.configure()
-logfire.instrument_openai()
-
-vj = ApiClient(vj_api_key)  # video jungle api client
-
-vj_server = MCPServerStdio(
-    'uvx',
-    args=[
-        '-p', '3.11',
-        '--from', 'video_editor_mcp@0.1.36',
-        'video-editor-mcp'
-    ],
-    env={
-        'VJ_API_KEY': vj_api_key,
-    },
-    timeout=30
-)
 
-serper_server = MCPServerStdio(
-    'uvx',
-    args=[
-        '-p', '3.11',
-        'serper-mcp-server@latest',
-    ],
-    env={
-        'SERPER_API_KEY': serper_api_key,
-    },
-    timeout=30
-)
+vj = PooledApiClient(vj_api_key)  # video jungle api client
+avj = AsyncApiClient(vj)  # non-blocking view of the same client
+
+serper = SerperClient(serper_api_key)  # direct video search, no MCP round trips
+
+
+class ResourceLimits:
+    """Separate concurrency limits for the shared resources beats compete for"""
+
+    def __init__(self, search: int = 4, downloads: int = 3, uploads: int = 2):
+        self.search = asyncio.Semaphore(search)
+        self.downloads = asyncio.Semaphore(downloads)
+        self.uploads = asyncio.Semaphore(uploads)
+
+
+limits = ResourceLimits()
 
 
 class VideoItem(BaseModel):
@@ -80,6 +73,26 @@ class VideoBeats(BaseModel):
     beats: List[Beat]
 
 
+class BeatCandidate(BaseModel):
+    duration_seconds: int
+    scene_description: str
+    search_terms: List[str]
+    importance: int = Field(default=3, description="How central this moment is to the whole story, from 1 (minor) to 5 (essential)")
+
+
+class SectionBeats(BaseModel):
+    beats: List[BeatCandidate]
+
+
+class BeatVideoList(BaseModel):
+    beat_number: int
+    videos: List[VideoItem] = Field(default_factory=list)
+
+
+class BeatVideoLists(BaseModel):
+    beats: List[BeatVideoList] = Field(default_factory=list)
+
+
 class BeatWithAssets(BaseModel):
     beat: Beat
     video_asset_id: Optional[str] = None
@@ -89,36 +102,23 @@ class BeatWithAssets(BaseModel):
 
 def parse_markdown_sections(file_path: str, skip_intro: bool = True) -> List[Tuple[str, str]]:
     """Parse markdown file and extract heading-content pairs."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # Split by ## headings (h2 level)
-    sections = re.split(r'^## ', content, flags=re.MULTILINE)[1:]  # Skip content before first heading
-    
-    heading_content_pairs = []
-    for section in sections:
-        lines = section.strip().split('\n', 1)
-        heading = lines[0].strip()
-        content = lines[1].strip() if len(lines) > 1 else ""
-        
-        # Skip introduction and references sections
-        if skip_intro and heading.lower() in ['introduction', 'references']:
-            continue
-            
-        heading_content_pairs.append((heading, content))
-    
-    return heading_content_pairs
+    # Split by ## headings (h2 level), skipping introduction and references sections
+    skipped = ['introduction', 'references'] if skip_intro else []
+    return [(section.heading, section.content)
+            for section in iter_sections(file_path, policy=H2, skip_headings=skipped)]
+
+
+BEATS_SYSTEM_PROMPT = "You are an expert documentary filmmaker who creates compelling visual narratives from research content. Create specific, cinematic beat descriptions that tell a visual story."
 
 
 def generate_video_beats(sections: List[Tuple[str, str]], model: str = "o3-mini") -> VideoBeats:
-    """Use specified model to generate video beats from research sections."""
-    client = OpenAI()
-    instructor_client = instructor.from_openai(client)
+    """Use specified model to generate video beats from research sections, in one request over the whole document."""
+    client = instructor_client("openai")
     
     # Prepare the content for analysis
     research_content = "Research Document Sections:\n\n"
     for heading, content in sections:
-        research_content += f"## {heading}\n{content[:800]}...\n\n"  # Truncate long sections
+        research_content += f"## {heading}\n{content}\n\n"
     
     beats_prompt = f"""
     Create a series of video beats (short scenes) that tell the story from this research document.
@@ -137,13 +137,10 @@ def generate_video_beats(sections: List[Tuple[str, str]], model: str = "o3-mini"
     {research_content}
     """
     
-    response = instructor_client.chat.completions.create(
+    response = client.chat.completions.create(
         model=model,
         messages=[
-            {
-                "role": "system",
-                "content": "You are an expert documentary filmmaker who creates compelling visual narratives from research content. Create specific, cinematic beat descriptions that tell a visual story."
-            },
+            {"role": "system", "content": BEATS_SYSTEM_PROMPT},
             {
                 "role": "user",
                 "content": beats_prompt
@@ -155,7 +152,97 @@ def generate_video_beats(sections: List[Tuple[str, str]], model: str = "o3-mini"
     return response
 
 
-def generate_voiceover_from_research(sections: List[Tuple[str, str]], project_id: str, script_id: str) -> Optional[Tuple[str, float]]:
+def section_chunks(sections: List[Tuple[str, str]], max_chars: int = 12000) -> List[Tuple[str, str]]:
+    """Split sections longer than max_chars at paragraph breaks, so long documents are covered without truncation."""
+    chunks = []
+    for heading, content in sections:
+        part = []
+        size = 0
+        for paragraph in content.split('\n\n'):
+            if part and size + len(paragraph) > max_chars:
+                chunks.append((heading, '\n\n'.join(part)))
+                part, size = [], 0
+            part.append(paragraph)
+            size += len(paragraph) + 2
+        chunks.append((heading, '\n\n'.join(part)))
+    return chunks
+
+
+async def generate_section_beats(client, heading: str, content: str, outline: List[str], model: str) -> SectionBeats:
+    """Map step: beat candidates for one section (or part of one), with the document outline for context."""
+    beats_prompt = f"""
+    You are planning part of a documentary told in video beats (short scenes).
+    The full document covers these sections, in order:
+    {chr(10).join(f"- {h}" for h in outline)}
+
+    Create 1-3 video beats for the section below only. Each beat should be
+    {MIN_BEAT_SECONDS}-{MAX_BEAT_SECONDS} seconds long and focus on a specific visual moment.
+
+    For each beat, provide:
+    1. Duration in seconds ({MIN_BEAT_SECONDS}-{MAX_BEAT_SECONDS})
+    2. A cinematic scene description that captures a specific moment
+    3. 2-3 specific search terms to find relevant video clips
+    4. An importance from 1 to 5: how central this moment is to the whole documentary
+
+    Focus on visual storytelling - describe what the viewer will see.
+
+    ## {heading}
+    {content}
+    """
+
+    return await client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": BEATS_SYSTEM_PROMPT},
+            {"role": "user", "content": beats_prompt}
+        ],
+        response_model=SectionBeats
+    )
+
+
+def merge_beat_candidates(candidates: List[List[BeatCandidate]], max_beats: int = 10,
+                          total_seconds: Optional[float] = None) -> VideoBeats:
+    """Reduce step: one ordered, duration-balanced VideoBeats from per-chunk candidates (see utils.beats)."""
+    kept = merge_candidates(candidates, max_beats=max_beats, total_seconds=total_seconds)
+    return VideoBeats(beats=[
+        Beat(beat_number=number, duration_seconds=seconds,
+             scene_description=beat.scene_description, search_terms=beat.search_terms)
+        for number, (beat, seconds) in enumerate(kept, 1)
+    ])
+
+
+async def generate_video_beats_map_reduce(sections: List[Tuple[str, str]], model: str = "o3-mini", concurrency: int = 4,
+                                          max_beats: int = 10, total_seconds: Optional[float] = None) -> VideoBeats:
+    """
+    Generate beat candidates for every section concurrently (at most `concurrency`
+    requests at a time), then merge them into one VideoBeats.
+
+    Sections are sent in full; long ones are split into several requests rather than truncated.
+    """
+    client = instructor_client("openai", use_async=True)
+    chunks = section_chunks(sections)
+    outline = [heading for heading, _ in sections]
+    slots = asyncio.Semaphore(concurrency)
+
+    async def generate(index: int, heading: str, content: str) -> List[BeatCandidate]:
+        async with slots:
+            started = time.perf_counter()
+            try:
+                result = await generate_section_beats(client, heading, content, outline, model)
+            except Exception as e:
+                print(f"  [{index + 1}/{len(chunks)}] {heading}: failed ({str(e)[:100]})")
+                return []
+        print(f"  [{index + 1}/{len(chunks)}] {heading}: {len(result.beats)} beats ({time.perf_counter() - started:.1f}s)")
+        return result.beats
+
+    candidates = await asyncio.gather(*[generate(i, heading, content) for i, (heading, content) in enumerate(chunks)])
+    if not any(candidates):
+        print("  No section produced beats, falling back to a single request")
+        return await asyncio.to_thread(generate_video_beats, sections, model)
+    return merge_beat_candidates(candidates, max_beats=max_beats, total_seconds=total_seconds)
+
+
+async def generate_voiceover_from_research(sections: List[Tuple[str, str]], project_id: str, script_id: str) -> Optional[Tuple[str, float]]:
     """Generate a 30-second voiceover from research text."""
     # Compile key points from research sections
     research_summary = "Create a compelling 30-second documentary narration based on this research:\n\n"
@@ -169,7 +256,7 @@ def generate_voiceover_from_research(sections: List[Tuple[str, str]], project_id
     
     try:
         print("  Generating voiceover from research text...")
-        audio = vj.projects.generate(
+        audio = await avj.projects.generate(
             script_id=script_id,
             project_id=project_id,
             parameters={
@@ -179,11 +266,11 @@ def generate_voiceover_from_research(sections: List[Tuple[str, str]], project_id
         )
         
         # Wait for audio generation to complete and get asset info
-        time.sleep(5)
+        await asyncio.sleep(5)
         
         # Get the audio asset to check duration
         try:
-            project = vj.projects.get(project_id)
+            project = await avj.projects.get(project_id)
             audio_asset = next((a for a in project.assets if str(a.id) == audio['asset_id']), None)
             if audio_asset and hasattr(audio_asset, 'duration'):
                 duration = audio_asset.duration
@@ -229,7 +316,7 @@ async def search_vj_library(search_terms: List[str], scene_description: str = ""
     for query in unique_queries:
         try:
             # Use video_files.search to search the VJ library
-            results = vj.video_files.search(query=query, limit=10)
+            results = await avj.video_files.search(query=query, limit=10)
             if results and len(results) > 0:
                 # Return the first good match
                 for result in results:
@@ -249,7 +336,7 @@ async def search_vj_library(search_terms: List[str], scene_description: str = ""
 async def search_project_assets(project_id: str, search_terms: List[str], scene_description: str = "") -> Optional[Dict]:
     """Search project assets for matching videos."""
     try:
-        project = vj.projects.get(project_id)
+        project = await avj.projects.get(project_id)
         assets = project.assets
         
         # Create search queries
@@ -282,73 +369,212 @@ async def search_project_assets(project_id: str, search_terms: List[str], scene_
     return None
 
 
-async def search_for_videos_with_serper(search_query: str, scene_description: str) -> VideoList:
-    """Search for videos using Serper via MCP and Claude with relevance ranking."""
-    # Create a search agent with Serper and VJ MCP servers
-    search_agent = Agent(
-        model=GeminiModel("gemini-2.5-pro"),
-        mcp_servers=[serper_server, vj_server],
-        instructions="""You are an expert video sourcer and relevance analyst. Use the Serper search tool to find relevant video content.
-        You also have access to Video Jungle tools to search existing video libraries.
-        Focus on finding actual video URLs from platforms like YouTube, Vimeo, Dailymotion, etc.
-        
-        CRITICAL: For each video found, you MUST:
-        1. Analyze how well the video title/description matches the scene requirements
-        2. Assign a relevance_score from 0.0 to 1.0 based on:
-           - 0.8-1.0: Excellent match - video clearly depicts the described scene
-           - 0.6-0.8: Good match - video contains relevant elements
-           - 0.4-0.6: Moderate match - somewhat related but missing key elements
-           - 0.2-0.4: Poor match - only tangentially related
-           - 0.0-0.2: Very poor match - barely related or wrong context
-        3. Provide a brief relevance_reason explaining the score
-        4. Sort results by relevance_score in descending order
-        
-        Only include videos with relevance_score >= 0.5 in your final results.""",
-        output_type=VideoList,
-    )
-    
-    search_prompt = f"""
-    Search for video clips that match this specific scene:
-    
+STOPWORDS = {'with', 'from', 'that', 'this', 'have', 'been', 'their', 'there', 'which', 'while', 'where'}
+
+
+def _keywords(text: str) -> set:
+    return {word.strip('.,;:!?"\'()').lower() for word in text.split()
+            if len(word) > 4 and word.lower() not in STOPWORDS}
+
+
+def score_video(video: dict, beat: Beat) -> Tuple[float, str]:
+    """Cheap relevance score from keyword overlap between a search result and the beat"""
+    text = f"{video.get('title', '')} {video.get('snippet', '')}".lower()
+    term_hits = [term for term in beat.search_terms if term.lower() in text]
+    keywords = _keywords(beat.scene_description) | _keywords(" ".join(beat.search_terms))
+    keyword_hits = [word for word in keywords if word in text]
+    score = 0.6 * len(term_hits) / max(len(beat.search_terms), 1) + 0.4 * len(keyword_hits) / max(len(keywords), 1)
+    matched = term_hits or keyword_hits
+    return round(min(score, 1.0), 2), f"matched: {', '.join(matched[:5])}" if matched else "no keyword match"
+
+
+rerank_agent = Agent(
+    model=gemini_model("gemini-2.5-pro"),
+    instructions="""You are an expert video sourcer and relevance analyst. You will be given candidate videos
+    from a web search for one scene of a documentary.
+
+    For each candidate, assign a relevance_score from 0.0 to 1.0 based on:
+       - 0.8-1.0: Excellent match - video clearly depicts the described scene
+       - 0.6-0.8: Good match - video contains relevant elements
+       - 0.4-0.6: Moderate match - somewhat related but missing key elements
+       - 0.2-0.4: Poor match - only tangentially related
+       - 0.0-0.2: Very poor match - barely related or wrong context
+    and a brief relevance_reason explaining the score.
+
+    Only return candidates with relevance_score >= 0.5, sorted by relevance_score in descending order.
+    Copy each url and title exactly as given; never invent videos.""",
+    output_type=VideoList,
+)
+
+
+rerank_cascade = ModelCascade("beat_rerank", [
+    ("flash", gemini_model("gemini-2.5-flash")),
+    ("pro", gemini_model("gemini-2.5-pro")),
+], validators=[min_relevance(0.5), video_urls()])
+
+
+async def rerank_videos(candidates: List[VideoItem], scene_description: str) -> List[VideoItem]:
+    """Have the LLM rescore candidates against the scene, cheapest model first"""
+    listing = "\n".join(f"{i + 1}. {video.title} | {video.url}" for i, video in enumerate(candidates))
+    known = {video.url for video in candidates}
+
+    def only_candidates(output):
+        invented = [video.url for video in output.videos if video.url not in known]
+        return f"returned {len(invented)} videos that were not candidates" if invented else None
+
+    prompt = f"""
     Scene description: {scene_description}
-    Search terms: {search_query}
-    
-    IMPORTANT: You must find videos that actually depict or relate to "{scene_description}".
-    
-    For each video:
-    1. Search using the provided terms and variations
-    2. Evaluate how well each result matches the scene description
-    3. Score each video's relevance (0.0-1.0)
-    4. Only return videos with relevance >= 0.5
-    5. Sort by relevance score (highest first)
-    
-    Return 5-10 highly relevant videos that truly match the scene requirements.
+
+    Candidate videos:
+    {listing}
     """
-    
     try:
-        async with search_agent.run_mcp_servers():
-            result = await search_agent.run(search_prompt)
-            return result.output
-            
+        result = await rerank_cascade.run(rerank_agent, prompt, validators=[only_candidates])
+    except CascadeFailed as e:
+        if e.last_result is None:
+            raise
+        # Every model answered but none found a good match: trust the strongest model's answer
+        result = e.last_result
+    return [video for video in result.output.videos if video.url in known]
+
+
+def beat_queries(beat: Beat) -> List[str]:
+    return list(dict.fromkeys(term.strip() for term in beat.search_terms[:3] if term.strip()))
+
+
+def keyword_candidates(beat: Beat, results: Dict[str, List[dict]]) -> List[VideoItem]:
+    """The top search results for a beat's queries, ranked by keyword overlap"""
+    candidates = {}
+    for query in beat_queries(beat):
+        for video in results.get(query, []):
+            if video.get("link") and video["link"] not in candidates:
+                score, reason = score_video(video, beat)
+                candidates[video["link"]] = VideoItem(
+                    url=video["link"],
+                    title=video.get("title", ""),
+                    relevance_score=score,
+                    relevance_reason=reason,
+                )
+    return sorted(candidates.values(), key=lambda v: v.relevance_score, reverse=True)[:10]
+
+
+async def search_for_videos_with_serper(beat: Beat, rerank: bool = True) -> VideoList:
+    """Search for videos with the Serper API, optionally reranking the results with an LLM."""
+    try:
+        results = await serper.search_videos_batch(beat_queries(beat))
     except Exception as e:
         print(f"    Search error: {str(e)[:100]}")
         return VideoList(videos=[])
 
+    videos = keyword_candidates(beat, results)
+    if rerank and videos:
+        try:
+            return VideoList(videos=await rerank_videos(videos, beat.scene_description))
+        except Exception as e:
+            print(f"    Rerank error, using keyword ranking: {str(e)[:100]}")
+    return VideoList(videos=videos)
+
+
+batch_rerank_agent = Agent(
+    model=gemini_model("gemini-2.5-pro"),
+    instructions="""You are an expert video sourcer and relevance analyst. You will be given several scenes
+    of a documentary, each with its beat number and the candidate videos a web search found for it.
+
+    For each beat, score its own candidates: assign a relevance_score from 0.0 to 1.0 based on:
+       - 0.8-1.0: Excellent match - video clearly depicts the described scene
+       - 0.6-0.8: Good match - video contains relevant elements
+       - 0.4-0.6: Moderate match - somewhat related but missing key elements
+       - 0.2-0.4: Poor match - only tangentially related
+       - 0.0-0.2: Very poor match - barely related or wrong context
+    and a brief relevance_reason explaining the score.
+
+    Return one entry per beat number. Only keep candidates with relevance_score >= 0.5, sorted by
+    relevance_score in descending order; a beat with no good candidates gets an empty list.
+    Copy each url and title exactly as given; never invent videos or move them between beats.""",
+    output_type=BeatVideoLists,
+)
 
-async def search_and_download_for_beat(beat: Beat, project: any) -> Optional[str]:
-    """Search web and download video for a specific beat."""
-    print(f"\n  Searching web for Beat {beat.beat_number} videos...")
-    print(f"  Scene: {beat.scene_description[:80]}...")
-    
-    # Combine search terms into a query
-    search_query = " OR ".join(beat.search_terms[:2])
+
+batch_rerank_cascade = ModelCascade("beat_rerank_batch", [
+    ("flash", gemini_model("gemini-2.5-flash")),
+    ("pro", gemini_model("gemini-2.5-pro")),
+])
+
+
+async def rerank_beats(beats: List[Beat], candidates: Dict[int, List[VideoItem]]) -> Dict[int, List[VideoItem]]:
+    """Rescore the candidates of many beats in a single LLM run, cheapest model first"""
+    sections = []
+    for beat in beats:
+        listing = "\n".join(f"    {i + 1}. {video.title} | {video.url}"
+                            for i, video in enumerate(candidates[beat.beat_number]))
+        sections.append(f"Beat {beat.beat_number}: {beat.scene_description}\n  Candidate videos:\n{listing}")
+    known = {number: {video.url for video in videos} for number, videos in candidates.items()}
+
+    def only_candidates(output):
+        invented = [video.url for entry in output.beats for video in entry.videos
+                    if video.url not in known.get(entry.beat_number, ())]
+        return f"returned {len(invented)} videos that were not candidates for their beat" if invented else None
+
+    prompt = "\n\n".join(sections)
+    try:
+        result = await batch_rerank_cascade.run(batch_rerank_agent, prompt, validators=[only_candidates])
+    except CascadeFailed as e:
+        if e.last_result is None:
+            raise
+        result = e.last_result
+    reranked = {number: [] for number in candidates}
+    for entry in result.output.beats:
+        if entry.beat_number in reranked:
+            reranked[entry.beat_number] = [video for video in entry.videos if video.url in known[entry.beat_number]]
+    return reranked
+
+
+async def search_beats_batch(beats: List[Beat], rerank: bool = True) -> Dict[int, VideoList]:
+    """
+    Source web candidates for many beats at once
+
+    Every beat's queries go out in one Serper batch and, with rerank, all the
+    candidates are scored in one LLM run instead of one run per beat.
+
+    Returns:
+        A VideoList per beat number (empty when nothing relevant was found)
+
+    Raises:
+        The search error, if the batch search itself fails
+    """
+    queries = list(dict.fromkeys(query for beat in beats for query in beat_queries(beat)))
+    results = await serper.search_videos_batch(queries)
+
+    candidates = {beat.beat_number: keyword_candidates(beat, results) for beat in beats}
+    to_rerank = [beat for beat in beats if candidates[beat.beat_number]]
+    if rerank and to_rerank:
+        try:
+            candidates.update(await rerank_beats(
+                to_rerank, {beat.beat_number: candidates[beat.beat_number] for beat in to_rerank},
+            ))
+        except Exception as e:
+            print(f"  Batch rerank error, using keyword ranking: {str(e)[:100]}")
+    return {number: VideoList(videos=videos) for number, videos in candidates.items()}
+
+
+async def search_and_download_for_beat(beat: Beat, project: any, rerank: bool = True,
+                                      candidates: Optional[VideoList] = None) -> Optional[str]:
+    """Search web and download video for a specific beat, starting from batch search candidates if given."""
+    tag = f"[Beat {beat.beat_number}]"
     
     try:
-        # Use Serper search with relevance scoring
-        result = await search_for_videos_with_serper(search_query, beat.scene_description)
+        if candidates is not None and candidates.videos:
+            result = candidates
+        else:
+            if candidates is not None:
+                print(f"  {tag} Batch search came back empty, searching this beat on its own...")
+            print(f"  {tag} Searching web: {beat.scene_description[:80]}...")
+            # Use Serper search with relevance scoring
+            async with limits.search:
+                result = await search_for_videos_with_serper(beat, rerank=rerank)
         
         if not result.videos:
-            print("    No relevant videos found (all scored < 0.5)")
+            print(f"    {tag} No relevant videos found")
             return None
         
         # Sort by relevance score (should already be sorted, but ensure)
@@ -356,9 +582,9 @@ async def search_and_download_for_beat(beat: Beat, project: any) -> Optional[str
         
         # Try videos in order of relevance
         for i, video in enumerate(sorted_videos[:5]):
-            print(f"    Attempt {i+1}: {video.title[:50]}... (relevance: {video.relevance_score:.2f})")
+            print(f"    {tag} Attempt {i+1}: {video.title[:50]}... (relevance: {video.relevance_score:.2f})")
             if video.relevance_reason:
-                print(f"      Reason: {video.relevance_reason[:80]}...")
+                print(f"      {tag} Reason: {video.relevance_reason[:80]}...")
             
             safe_title = video.title.replace('/', '-').replace('\\', '-')[:40]
             output_filename = f"beat_{beat.beat_number}_{safe_title}.mp4"
@@ -366,174 +592,193 @@ async def search_and_download_for_beat(beat: Beat, project: any) -> Optional[str
             # Try downloading with retries
             for retry in range(2):  # 2 attempts per video
                 try:
-                    download(video.url, output_path=output_filename)
+                    async with limits.downloads:
+                        await asyncio.to_thread(download, video.url, output_path=output_filename)
                     
                     if os.path.exists(output_filename) and os.path.getsize(output_filename) > 1000:  # Check file exists and is not empty
                         # Upload to project
-                        asset = project.upload_asset(
-                            name=f"Beat {beat.beat_number}: {video.title}"[:100],
-                            description=f"Beat {beat.beat_number} - {beat.scene_description[:150]} (relevance: {video.relevance_score:.2f})",
-                            filename=output_filename,
-                        )
+                        async with limits.uploads:
+                            asset_id, how = await avj.run(
+                                upload_or_link, vj, project.id, output_filename,
+                                name=f"Beat {beat.beat_number}: {video.title}"[:100],
+                                description=f"Beat {beat.beat_number} - {beat.scene_description[:150]} (relevance: {video.relevance_score:.2f})",
+                            )
                         os.remove(output_filename)
-                        print(f"    Uploaded successfully (relevance score: {video.relevance_score:.2f})")
-                        return asset.id
+                        print(f"    {tag} {how.capitalize()} successfully (relevance score: {video.relevance_score:.2f})")
+                        return asset_id
                     else:
                         if os.path.exists(output_filename):
                             os.remove(output_filename)
-                        print(f"    Empty or invalid file, trying next...")
+                        print(f"    {tag} Empty or invalid file, trying next...")
                         break
                         
                 except Exception as e:
-                    print(f"    Download attempt {retry+1} failed: {str(e)[:50]}")
+                    print(f"    {tag} Download attempt {retry+1} failed: {str(e)[:50]}")
                     if os.path.exists(output_filename):
                         os.remove(output_filename)
                     if retry == 0:
-                        print(f"    Retrying...")
-                        time.sleep(2)
+                        print(f"    {tag} Retrying...")
+                        await asyncio.sleep(2)
                     else:
-                        print(f"    Moving to next video...")
+                        print(f"    {tag} Moving to next video...")
                         break
                 
     except Exception as e:
-        print(f"  Search error: {str(e)[:100]}")
+        print(f"  {tag} Search error: {str(e)[:100]}")
     
     return None
 
 
-async def find_or_create_video_for_beat(beat: Beat, project: any) -> BeatWithAssets:
-    """Find existing video or download new one for a beat."""
+async def find_existing_video_for_beat(beat: Beat, project: any) -> BeatWithAssets:
+    """Look for a video for a beat in the Video Jungle library, then in the project."""
     beat_with_assets = BeatWithAssets(beat=beat)
+    tag = f"[Beat {beat.beat_number}]"
     
-    print(f"\nProcessing Beat {beat.beat_number}: {beat.scene_description[:60]}...")
+    print(f"  {tag} Processing: {beat.scene_description[:60]}...")
     
     # 1. Search Video Jungle library first
-    print("  Checking Video Jungle library...")
     vj_result = await search_vj_library(beat.search_terms, beat.scene_description)
     if vj_result:
         beat_with_assets.video_asset_id = vj_result['id']
         beat_with_assets.video_source = 'vj_library'
-        print(f"  Found in VJ library: {vj_result['name'][:60]} (matched: {vj_result.get('matched_query', '')})")
+        print(f"  {tag} Found in VJ library: {vj_result['name'][:60]} (matched: {vj_result.get('matched_query', '')})")
         return beat_with_assets
     
     # 2. Search project assets
-    print("  Checking project assets...")
     project_result = await search_project_assets(project.id, beat.search_terms, beat.scene_description)
     if project_result:
         beat_with_assets.video_asset_id = project_result['id']
         beat_with_assets.video_source = 'project'
-        print(f"  Found in project: {project_result['name'][:60]} (matched: {project_result.get('matched_query', '')})")
+        print(f"  {tag} Found in project: {project_result['name'][:60]} (matched: {project_result.get('matched_query', '')})")
+    
+    return beat_with_assets
+
+
+async def find_or_create_video_for_beat(beat: Beat, project: any, rerank: bool = True,
+                                        found: Optional[BeatWithAssets] = None,
+                                        candidates: Optional[VideoList] = None) -> BeatWithAssets:
+    """
+    Find existing video or download new one for a beat.
+
+    Args:
+        found: Result of an earlier find_existing_video_for_beat, to skip those lookups
+        candidates: This beat's web candidates from search_beats_batch
+    """
+    beat_with_assets = found or await find_existing_video_for_beat(beat, project)
+    if beat_with_assets.video_asset_id:
         return beat_with_assets
     
     # 3. Search and download from web
-    print("  Not found locally, searching web...")
-    downloaded_asset_id = await search_and_download_for_beat(beat, project)
+    print(f"  [Beat {beat.beat_number}] Not found in library or project, searching web...")
+    downloaded_asset_id = await search_and_download_for_beat(beat, project, rerank=rerank, candidates=candidates)
     if downloaded_asset_id:
         beat_with_assets.video_asset_id = downloaded_asset_id
         beat_with_assets.video_source = 'downloaded'
-        print("Downloaded and uploaded new video")
-    else:
-        print("Could not find suitable video for this beat")
     
     return beat_with_assets
 
 
-def create_edit_from_beats(project_id: str, beats_with_assets: List[BeatWithAssets], voiceover_id: str, audio_duration: float):
-    """Create a video edit from the collected beats matching audio duration."""
-    # Calculate time per beat based on audio duration
-    total_beats = len([b for b in beats_with_assets if b.video_asset_id])
-    if total_beats == 0:
-        return None
-        
-    time_per_beat = audio_duration / total_beats
-    
-    # Prepare video sequence
-    video_sequence = []
-    current_time = 0
-    
-    for beat_data in beats_with_assets:
-        if beat_data.video_asset_id:
-            # Convert seconds to time format (HH:MM:SS.mmm)
-            start_time = f"00:00:{current_time:06.3f}"
-            end_time = f"00:00:{current_time + time_per_beat:06.3f}"
-            
-            # Determine asset type based on source
-            if beat_data.video_source == 'vj_library':
-                asset_type = "videofile"
-            else:
-                asset_type = "asset"
-            
-            video_asset = VideoEditAsset(
-                video_id=beat_data.video_asset_id,  # Pass as string, not UUID
-                type=asset_type,
-                video_start_time=start_time,
-                video_end_time=end_time,
-                audio_levels=[VideoAudioLevel(audio_level=0.5, start_time=start_time, end_time=end_time)]
-            )
-            video_sequence.append(video_asset)
-            current_time += time_per_beat
-    
-    # Prepare audio overlay
-    audio_overlays = []
-    if voiceover_id:
-        audio_end_time = f"00:00:{audio_duration:06.3f}"
-        audio_overlay = VideoEditAudioAsset(
-            audio_id=voiceover_id,  # Pass as string, not UUID
-            type="voiceover",
-            audio_start_time="00:00:00.000",
-            audio_end_time=audio_end_time,
-            audio_levels=[VideoAudioLevel(audio_level=1.0, start_time="00:00:00.000", end_time=audio_end_time)]
-        )
-        audio_overlays.append(audio_overlay)
-    
-    # Create edit configuration
-    edit_config = VideoEditCreate(
-        name=f"Documentary Edit - {datetime.now().strftime('%Y%m%d_%H%M%S')}",
+async def resolve_beats(beats: List[Beat], project: any, concurrency: int = 4, rerank: bool = True,
+                        batch_search: bool = True, on_resolved=None) -> List[BeatWithAssets]:
+    """
+    Resolve every beat concurrently (at most `concurrency` at a time), keeping beat order.
+
+    With batch_search, library and project lookups run first, and all beats still
+    without a video are searched on the web together (see search_beats_batch).
+    on_resolved, if given, is called with each BeatWithAssets as soon as it is done.
+    """
+    beat_slots = asyncio.Semaphore(concurrency)
+    done = 0
+    found = [None] * len(beats)
+    candidates = {}
+
+    if batch_search:
+        async def lookup(beat: Beat) -> Optional[BeatWithAssets]:
+            async with beat_slots:
+                try:
+                    return await find_existing_video_for_beat(beat, project)
+                except Exception as e:
+                    print(f"  [Beat {beat.beat_number}] Lookup failed: {str(e)[:100]}")
+                    return None
+
+        found = await asyncio.gather(*[lookup(beat) for beat in beats])
+        unresolved = [beat for beat, result in zip(beats, found) if result is not None and not result.video_asset_id]
+        if unresolved:
+            print(f"\nBatch searching the web for {len(unresolved)} beats...")
+            try:
+                async with limits.search:
+                    candidates = await search_beats_batch(unresolved, rerank=rerank)
+            except Exception as e:
+                print(f"  Batch search failed, searching each beat on its own: {str(e)[:100]}")
+
+    async def resolve(beat: Beat, existing: Optional[BeatWithAssets]) -> BeatWithAssets:
+        nonlocal done
+        async with beat_slots:
+            started = time.perf_counter()
+            try:
+                result = await find_or_create_video_for_beat(
+                    beat, project, rerank=rerank, found=existing,
+                    # None (a failed lookup or batch search) makes the beat search on its own
+                    candidates=candidates.get(beat.beat_number),
+                )
+            except Exception as e:
+                print(f"  [Beat {beat.beat_number}] Failed: {str(e)[:100]}")
+                result = BeatWithAssets(beat=beat)
+        done += 1
+        if on_resolved is not None:
+            on_resolved(result)
+        outcome = result.video_source or "no video found"
+        print(f"[{done}/{len(beats)}] Beat {beat.beat_number}: {outcome} ({time.perf_counter() - started:.1f}s)")
+        return result
+
+    return await asyncio.gather(*[resolve(beat, existing) for beat, existing in zip(beats, found)])
+
+
+def documentary_edit(beats_with_assets: List[BeatWithAssets], voiceover_id: str, audio_duration: float) -> BeatEdit:
+    """Lay out the beats with videos under the voiceover, for both the API and the saved spec; patch it with update_beat."""
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    return BeatEdit.from_beats(
+        beats_with_assets, voiceover_id, audio_duration,
+        name=f"Documentary Edit - {stamp}",
         description="Documentary video created from research",
-        video_edit_version="v1",
-        video_output_format="mp4",
-        video_output_resolution="1920x1080",
-        video_output_fps=30.0,
-        video_output_filename=f"documentary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4",
-        skip_rendering=False,
-        video_series_sequential=video_sequence,
-        audio_overlay=audio_overlays,
-        subtitles=True
+        output_filename=f"documentary_{stamp}.mp4",
+        video_audio_level=0.5,
     )
+
+
+async def create_edit_from_beats(project_id: str, edit_layout: BeatEdit):
+    """Create a video edit from the laid out beats."""
+    if not edit_layout.clip_count:
+        return None
     
     # Create the edit using the fixed API method
     try:
-        edit = vj.projects.create_edit(project_id, edit_config)
+        edit = await avj.projects.create_edit(project_id, edit_layout.spec.to_video_edit_create())
+        invalidate_project(project_id)
         return edit
     except Exception as e:
         print(f"Edit creation error: {str(e)}")
         return None
 
 
-async def async_main(markdown_file: str, project_id: Optional[str], model: str = "o3-mini"):
-    """Process a markdown research file and create a video documentary."""
-    # Parse markdown sections (skip introduction)
-    print(f"Parsing markdown file: {markdown_file}")
-    sections = parse_markdown_sections(markdown_file, skip_intro=True)
-    print(f"  Found {len(sections)} sections to process")
-    
-    # Get or create Video Jungle project
+async def setup_project(markdown_file: str, project_id: Optional[str]) -> Tuple[any, str]:
+    """Get or create the Video Jungle project, returning it with its voiceover script ID."""
     if project_id:
         print(f"\nUsing existing Video Jungle project: {project_id}")
         try:
-            project = vj.projects.get(project_id)
+            project = await avj.projects.get(project_id)
             print(f"  Found project: {project.name}")
             # Get the first script ID from the existing project
             if project.scripts and len(project.scripts) > 0:
                 script_id = project.scripts[0].id
             else:
                 print("  Warning: No scripts found in project, creating new prompt...")
-                prompt = vj.prompts.generate(
+                prompt = await avj.prompts.generate(
                     task="You are creating cinematic documentary narration. The tone should be engaging, dramatic, and professional.",
                     parameters=["script", "context"]
                 )
                 # Update project with new prompt
-                project = vj.projects.update(
+                project = await avj.projects.update(
                     project_id,
                     prompt_id=prompt.id,
                     generation_method="prompt-to-speech"
@@ -549,13 +794,13 @@ async def async_main(markdown_file: str, project_id: Optional[str], model: str =
         project_name = f"Documentary: {os.path.basename(markdown_file).replace('.md', '')}"
         
         # Create prompt for voiceover generation
-        prompt = vj.prompts.generate(
+        prompt = await avj.prompts.generate(
             task="You are creating cinematic documentary narration. The tone should be engaging, dramatic, and professional.",
             parameters=["script", "context"]
         )
         
         # Create project
-        project = vj.projects.create(
+        project = await avj.projects.create(
             name=project_name,
             description=f"Documentary video from research: {markdown_file}",
             prompt_id=prompt.id,
@@ -565,36 +810,118 @@ async def async_main(markdown_file: str, project_id: Optional[str], model: str =
         script_id = project.scripts[0].id
         print(f"  Created project: {project.name} (ID: {project.id})")
     
-    # Generate voiceover first from research text
-    print("\nGenerating 30-second voiceover from research...")
-    voiceover_result = generate_voiceover_from_research(sections, project.id, script_id)
-    if not voiceover_result:
-        print("  Failed to generate voiceover")
-        return
+    return project, script_id
+
+
+async def async_main(markdown_file: Optional[str], project_id: Optional[str], model: str = "o3-mini", rerank: bool = True,
+                     concurrency: int = 4, batch_search: bool = True, resume: Optional[str] = None,
+                     map_reduce: bool = True, beat_workers: int = 4, **resource_limits):
+    """Process a markdown research file and create a video documentary."""
+    # Every finished stage is journaled, so a failed run can be resumed where it stopped
+    if resume:
+        journal = RunJournal.open(resume)
+        # The resumed run keeps the inputs it was started with, not the CLI defaults
+        run = journal.get("run")
+        markdown_file = run["markdown_file"]
+        project_id = run.get("project_id") or project_id
+        model = run.get("model") or model
+        print(f"Resuming run {journal.run_id}")
+    else:
+        journal = RunJournal.create()
+        journal.record("run", {"markdown_file": markdown_file, "project_id": project_id, "model": model})
+        print(f"Starting run {journal.run_id} (if it fails, continue it with --resume {journal.run_id})")
     
-    voiceover_id, audio_duration = voiceover_result
-    print(f"  Generated voiceover (duration: {audio_duration:.1f}s)")
+    # Parse markdown sections (skip introduction)
+    print(f"Parsing markdown file: {markdown_file}")
+    sections = parse_markdown_sections(markdown_file, skip_intro=True)
+    print(f"  Found {len(sections)} sections to process")
     
-    # Now generate video beats
-    print(f"\nGenerating video beats using {model}...")
-    video_beats = generate_video_beats(sections, model=model)
-    print(f"  Generated {len(video_beats.beats)} beats")
+    # Get or create Video Jungle project
+    checkpoint = journal.get("project")
+    if checkpoint:
+        project = await avj.projects.get(checkpoint["project_id"])
+        script_id = checkpoint["script_id"]
+        print(f"\nResuming with project: {project.name} (ID: {project.id})")
+    else:
+        project, script_id = await setup_project(markdown_file, project_id)
+        journal.record("project", {"project_id": project.id, "script_id": script_id})
     
-    # Process each beat
-    print("\nProcessing video beats...")
-    beats_with_assets = []
+    # Generate voiceover first from research text
+    checkpoint = journal.get("voiceover")
+    if checkpoint:
+        voiceover_id, audio_duration = checkpoint["voiceover_id"], checkpoint["audio_duration"]
+        print(f"\nResuming with voiceover {voiceover_id} (duration: {audio_duration:.1f}s)")
+    else:
+        print("\nGenerating 30-second voiceover from research...")
+        voiceover_result = await generate_voiceover_from_research(sections, project.id, script_id)
+        if not voiceover_result:
+            print("  Failed to generate voiceover")
+            return
+        
+        voiceover_id, audio_duration = voiceover_result
+        journal.record("voiceover", {"voiceover_id": voiceover_id, "audio_duration": audio_duration})
+        print(f"  Generated voiceover (duration: {audio_duration:.1f}s)")
     
-    for beat in video_beats.beats:
-        beat_data = await find_or_create_video_for_beat(beat, project)
-        beats_with_assets.append(beat_data)
+    # Now generate video beats
+    checkpoint = journal.get("beats")
+    if checkpoint:
+        video_beats = VideoBeats(**checkpoint)
+        print(f"\nResuming with {len(video_beats.beats)} generated beats")
+    else:
+        if map_reduce:
+            print(f"\nGenerating video beats for each section using {model} ({beat_workers} at a time)...")
+            video_beats = await generate_video_beats_map_reduce(
+                sections, model=model, concurrency=beat_workers, total_seconds=audio_duration,
+            )
+        else:
+            print(f"\nGenerating video beats using {model}...")
+            video_beats = await asyncio.to_thread(generate_video_beats, sections, model=model)
+        journal.record("beats", video_beats.model_dump())
+        print(f"  Generated {len(video_beats.beats)} beats")
+    
+    # Resolve beats concurrently; each shared resource has its own limit
+    global limits
+    limits = ResourceLimits(**resource_limits)
+    resolved = {}
+    for data in journal.entries("beat").values():
+        beat_with_assets = BeatWithAssets(**data)
+        if beat_with_assets.video_asset_id:
+            resolved[beat_with_assets.beat.beat_number] = beat_with_assets
+    missing = [beat for beat in video_beats.beats if beat.beat_number not in resolved]
+    if resolved:
+        print(f"\n{len(resolved)} beats already have videos")
+    # Lay out the edit now and patch each beat's clip in as soon as it resolves
+    edit_layout = documentary_edit(
+        [resolved.get(beat.beat_number) or BeatWithAssets(beat=beat) for beat in video_beats.beats],
+        voiceover_id, audio_duration,
+    )
+
+    def on_resolved(beat_with_assets: BeatWithAssets):
+        journal.record("beat", beat_with_assets.model_dump(), key=beat_with_assets.beat.beat_number)
+        edit_layout.update_beat(beat_with_assets)
+
+    print(f"\nProcessing {len(missing)} video beats ({concurrency} at a time)...")
+    fresh = await resolve_beats(
+        missing, project, concurrency=concurrency, rerank=rerank, batch_search=batch_search,
+        on_resolved=on_resolved,
+    )
+    resolved.update({b.beat.beat_number: b for b in fresh})
+    beats_with_assets = [resolved[beat.beat_number] for beat in video_beats.beats]
     
     # Wait for video analysis
-    print("\nWaiting for video analysis to complete...")
-    time.sleep(30)
+    if any(b.video_source == 'downloaded' for b in fresh):
+        print("\nWaiting for video analysis to complete...")
+        await asyncio.sleep(30)
     
     # Create final edit matching audio duration
     print("\nCreating final edit...")
-    edit = create_edit_from_beats(project.id, beats_with_assets, voiceover_id, audio_duration)
+    edit = journal.get("edit")
+    if edit:
+        print("  Edit was already created in this run")
+    else:
+        edit = await create_edit_from_beats(project.id, edit_layout)
+        if edit:
+            journal.record("edit", edit)
     
     # Summary
     successful_beats = sum(1 for b in beats_with_assets if b.video_asset_id is not None)
@@ -603,79 +930,25 @@ async def async_main(markdown_file: str, project_id: Optional[str], model: str =
     print(f"  Voiceover duration: {audio_duration:.1f} seconds")
     print(f"  Project ID: {project.id}")
     print(f"  Project URL: https://app.video-jungle.com/projects/{project.id}")
+    print(route_stats().summary(prefix="beat_rerank"))
     
-    # Save edit configuration in video edit JSON spec format
-    # Calculate time segments for each beat
+    # Save the same edit configuration in video edit JSON spec format
     beats_with_video = [b for b in beats_with_assets if b.video_asset_id]
-    time_per_beat = audio_duration / len(beats_with_video) if beats_with_video else 0
-    current_time = 0
-    
-    # Build video_series_sequential array
-    video_series_sequential = []
-    for b in beats_with_assets:
-        if b.video_asset_id:
-            start_time = f"00:00:{current_time:06.3f}"
-            end_time = f"00:00:{current_time + time_per_beat:06.3f}"
-            
-            video_clip = {
-                "video_id": b.video_asset_id,
-                "video_start_time": start_time,
-                "video_end_time": end_time,
-                "type": "videofile" if b.video_source == "vj_library" else "asset",
-                "audio_levels": [
-                    {
-                        "audio_level": "0.5",
-                        "start_time": start_time,
-                        "end_time": end_time
-                    }
-                ]
+    edit_spec = edit_layout.spec.to_json(metadata={
+        "project_id": project.id,
+        "project_url": f"https://app.video-jungle.com/project/{project.id}",
+        "total_duration": audio_duration,
+        "beats_with_video": len(beats_with_video),
+        "total_beats": len(beats_with_assets),
+        "missing_beats": [
+            {
+                "beat_number": b.beat.beat_number,
+                "description": b.beat.scene_description,
+                "search_terms": b.beat.search_terms
             }
-            video_series_sequential.append(video_clip)
-            current_time += time_per_beat
-    
-    # Build audio_overlay array for voiceover
-    audio_overlay = []
-    if voiceover_id:
-        audio_overlay.append({
-            "audio_id": voiceover_id,
-            "type": "voiceover",
-            "audio_start_time": "00:00:00.000",
-            "audio_end_time": f"00:00:{audio_duration:06.3f}",
-            "audio_levels": [
-                {
-                    "audio_level": "1.0",
-                    "start_time": "00:00:00.000",
-                    "end_time": f"00:00:{audio_duration:06.3f}"
-                }
-            ]
-        })
-    
-    # Create output in video edit spec format
-    edit_spec = {
-        "video_edit_version": "1.0",
-        "video_output_format": "mp4",
-        "video_output_resolution": "1920x1080",
-        "video_output_fps": 30.0,
-        "edit_name": f"documentary-{project.id}",
-        "video_output_filename": f"documentary_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp4",
-        "audio_overlay": audio_overlay,
-        "video_series_sequential": video_series_sequential,
-        "metadata": {
-            "project_id": project.id,
-            "project_url": f"https://app.video-jungle.com/project/{project.id}",
-            "total_duration": audio_duration,
-            "beats_with_video": len(beats_with_video),
-            "total_beats": len(beats_with_assets),
-            "missing_beats": [
-                {
-                    "beat_number": b.beat.beat_number,
-                    "description": b.beat.scene_description,
-                    "search_terms": b.beat.search_terms
-                }
-                for b in beats_with_assets if not b.video_asset_id
-            ]
-        }
-    }
+            for b in beats_with_assets if not b.video_asset_id
+        ]
+    })
     
     output_file = f"edit_{project.id}.json"
     with open(output_file, 'w') as f:
@@ -684,13 +957,28 @@ async def async_main(markdown_file: str, project_id: Optional[str], model: str =
 
 
 @click.command()
-@click.option('--markdown-file', '-m', required=True, help='Path to the markdown research file')
+@click.option('--markdown-file', '-m', default=None, help='Path to the markdown research file (required unless resuming)')
 @click.option('--project-id', '-p', default=None, help='Existing Video Jungle project ID to use (if not provided, creates a new project)')
 @click.option('--model', '-o', default='o3-mini', help='Model to use for beat generation (default: o3-mini)')
-def main(markdown_file: str, project_id: str, model: str):
+@click.option('--rerank/--no-rerank', default=True, help='Rerank web search results with an LLM (default: on)')
+@click.option('--concurrency', '-c', default=4, help='Beats resolved at the same time (default: 4)')
+@click.option('--batch-search/--per-beat-search', default=True, help='Source all beats from the web in one batched search and rerank (default: on)')
+@click.option('--max-searches', default=4, help='Web searches in flight at once (default: 4)')
+@click.option('--max-downloads', default=3, help='Video downloads in flight at once (default: 3)')
+@click.option('--max-uploads', default=2, help='Uploads to Video Jungle in flight at once (default: 2)')
+@click.option('--map-reduce/--single-request', default=True, help='Generate beats per section concurrently and merge them, instead of one request over the whole document (default: on)')
+@click.option('--beat-workers', default=4, help='Section beat requests in flight at once (default: 4)')
+@click.option('--resume', 'resume', default=None, metavar='RUN_ID', help='Continue a failed run, skipping the stages and beats it finished')
+def main(markdown_file: str, project_id: str, model: str, rerank: bool, concurrency: int, batch_search: bool,
+         max_searches: int, max_downloads: int, max_uploads: int, map_reduce: bool, beat_workers: int, resume: str):
     """Process a markdown research file and create a video documentary with beats."""
-    import asyncio
-    asyncio.run(async_main(markdown_file, project_id, model))
+    if not markdown_file and not resume:
+        raise click.UsageError("--markdown-file is required unless --resume is given")
+    asyncio.run(async_main(
+        markdown_file, project_id, model, rerank, concurrency, batch_search, resume,
+        map_reduce=map_reduce, beat_workers=beat_workers,
+        search=max_searches, downloads=max_downloads, uploads=max_uploads,
+    ))
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 from pydantic_ai import Agent
-from pydantic_ai.models.anthropic import AnthropicModel
-from pydantic_ai.mcp import MCPServerStdio
+from utils.mcp_pool import mcp_pool
+from utils.profiling import profiled_run
+from utils.clients import anthropic_model
 import logfire
 import os
 
@@ -14,33 +15,14 @@ vj_api_key = os.environ["VJ_API_KEY"]
 serper_api_key = os.environ["SERPER_API_KEY"] 
 logfire.configure()
 
-serper_server = MCPServerStdio(
-    'uvx',
-    args=[
-        '-p', '3.11',
-        'serper-mcp-server@latest',
-    ],
-    env={
-        'SERPER_API_KEY': serper_api_key,
-    }
-)
-vj_server = MCPServerStdio(  
-    'uvx',
-    args=[
-        '-p', '3.11',
-        '--from', 'video_editor_mcp@latest',
-        'video-editor-mcp'
-    ],
-    env={
-        'VJ_API_KEY': vj_api_key,
-    },
-    timeout=30
-)
+serper_server = mcp_pool.get("serper")
+vj_server = mcp_pool.get("video-editor")
 
 
-model = AnthropicModel("claude-sonnet-4-20250514")
+model = anthropic_model("claude-sonnet-4-20250514")
 
 agent = Agent(  
+    name='search',
     model=model,
     system_prompt='You are an expert video editor. ' \
     'You can answer questions, download and analyze videos, and create rough video edits using remote videos.',  
@@ -50,9 +32,9 @@ agent = Agent(
 async def main():
     async with agent.run_mcp_servers():
         print("Agent is running")
-        result = await agent.run("can you search my videos for all skateboarding clips? Id like a summary and list of all of them.")  
+        result = await profiled_run(agent, "can you search my videos for all skateboarding clips? Id like a summary and list of all of them.")  
     print(result.output)
 
 if __name__ == "__main__":
     import asyncio
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(mcp_pool.run(main()))
\ No newline at end of file
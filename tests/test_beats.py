@@ -0,0 +1,49 @@
+from types import SimpleNamespace
+
+from utils.beats import MAX_BEAT_SECONDS, beat_count, merge_candidates
+
+
+def candidate(name, importance=3, duration=7):
+    return SimpleNamespace(name=name, importance=importance, duration_seconds=duration)
+
+
+def chunks(count, per_chunk=3):
+    return [[candidate(f"{c}.{i}", importance=5 - i) for i in range(per_chunk)] for c in range(count)]
+
+
+def test_beat_count_covers_long_narration():
+    assert beat_count(30, 10) == 6
+    assert beat_count(300, 10) == 30
+    assert beat_count(2, 10) == 1
+
+
+def test_long_narration_is_fully_covered():
+    kept = merge_candidates(chunks(12), max_beats=10, total_seconds=300)
+    assert len(kept) == 30
+    assert sum(seconds for _, seconds in kept) == 300
+    assert all(seconds <= MAX_BEAT_SECONDS for _, seconds in kept)
+
+
+def test_too_few_candidates_caps_beat_length():
+    kept = merge_candidates(chunks(2), max_beats=10, total_seconds=300)
+    assert len(kept) == 6
+    assert [seconds for _, seconds in kept] == [MAX_BEAT_SECONDS] * 6
+
+
+def test_every_chunk_keeps_its_best_beat_in_document_order():
+    kept = merge_candidates(chunks(4), max_beats=6)
+    names = [beat.name for beat, _ in kept]
+    assert names[:1] == ["0.0"]
+    assert {"0.0", "1.0", "2.0", "3.0"} <= set(names)
+    assert names == sorted(names)
+
+
+def test_short_narration_is_split_evenly():
+    kept = merge_candidates(chunks(12), max_beats=10, total_seconds=31)
+    assert [seconds for _, seconds in kept] == [5, 5, 5, 5, 5, 6]
+    assert merge_candidates([[], []]) == []
+
+
+def test_short_narration_gets_one_beat_no_longer_than_itself():
+    kept = merge_candidates(chunks(3), max_beats=10, total_seconds=3.2)
+    assert [seconds for _, seconds in kept] == [3]
@@ -0,0 +1,30 @@
+import pytest
+
+from utils.cassette import Cassette, CassetteMiss
+
+
+def recorded(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    cassette = Cassette(path, mode="record")
+    cassette.call("vj", "GET /projects", {"page": 1}, lambda: ["first"])
+    cassette.call("vj", "GET /projects", {"page": 2}, lambda: ["second"])
+    return path
+
+
+def test_replay_prefers_the_exact_request(tmp_path):
+    cassette = Cassette(recorded(tmp_path))
+    assert cassette.call("vj", "GET /projects", {"page": 2}, None) == ["second"]
+    assert cassette.call("vj", "GET /projects", {"page": 1}, None) == ["first"]
+
+
+def test_mismatch_warns_and_replays_in_order(tmp_path, capsys):
+    cassette = Cassette(recorded(tmp_path))
+    assert cassette.call("vj", "GET /projects", {"page": 9}, None) == ["first"]
+    assert "differs from the recording" in capsys.readouterr().out
+
+
+def test_strict_replay_raises_on_mismatch(tmp_path):
+    cassette = Cassette(recorded(tmp_path), strict=True)
+    with pytest.raises(CassetteMiss):
+        cassette.call("vj", "GET /projects", {"page": 9}, None)
+    assert cassette.call("vj", "GET /projects", {"page": 1}, None) == ["first"]
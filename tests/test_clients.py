@@ -0,0 +1,26 @@
+import asyncio
+
+import httpx
+
+from utils.clients import LoopLocalTransport
+
+
+def test_each_event_loop_gets_its_own_pool():
+    built = []
+
+    def factory():
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, json=len(built)))
+        built.append(transport)
+        return transport
+
+    transport = LoopLocalTransport(factory)
+    client = httpx.AsyncClient(transport=transport)
+
+    async def fetch_twice():
+        first = await client.get("https://example.com/a")
+        second = await client.get("https://example.com/b")
+        return first.json(), second.json()
+
+    assert asyncio.run(fetch_twice()) == (1, 1)
+    assert asyncio.run(fetch_twice()) == (2, 2)
+    assert len(transport._transports) == 1  # the closed loop's pool was dropped
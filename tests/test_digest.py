@@ -0,0 +1,45 @@
+from types import SimpleNamespace
+
+from utils.digest import DigestCache, digest_asset, project_digest
+
+
+def asset(analysis, description=None):
+    return SimpleNamespace(id="a1", keyname="clip.mp4", create_parameters={"analysis": analysis},
+                           generated_description=None, description=description, is_analyzing=False)
+
+
+def test_explicit_flags_and_duration_are_used():
+    digest = digest_asset(asset({"indoor": True, "outdoor": False, "duration": "00:01:02.5",
+                                 "summary": "A skater lands a kickflip. Then falls."}))
+    assert (digest.indoor, digest.outdoor, digest.duration) == (True, False, 62.5)
+    assert digest.summary == "A skater lands a kickflip."
+
+
+def test_key_names_do_not_count_as_mentions():
+    digest = digest_asset(asset({"indoor": None, "outdoor": None, "notes": "no scenes"}))
+    assert (digest.indoor, digest.outdoor) == (False, False)
+
+
+def test_flags_are_inferred_from_values():
+    digest = digest_asset(asset({"scenes": [{"text": "A kitchen at night"}, {"text": "Sunset on the beach"}]}))
+    assert (digest.indoor, digest.outdoor) == (True, True)
+    assert digest_asset(asset({}, description="Riding through the park")).outdoor
+
+
+def project_asset(asset_id, asset_type="user", status="analyzed"):
+    return SimpleNamespace(id=asset_id, keyname=asset_id, asset_type=asset_type, status=status,
+                           create_parameters={"analysis": {"duration": 4}}, generated_description=None,
+                           description=None, is_analyzing=status in ("uploaded", "processing", "queued", None))
+
+
+def test_project_digest_caches_only_finished_analyses(tmp_path):
+    project = SimpleNamespace(assets=[
+        project_asset("done"),
+        project_asset("failed", status="error"),
+        project_asset("linked", asset_type="video-reference"),
+        project_asset("audio", asset_type="audio"),
+    ])
+    client = SimpleNamespace(projects=SimpleNamespace(get=lambda project_id: project))
+    cache = DigestCache(str(tmp_path / "digests.json"))
+    assert [digest.id for digest in project_digest(client, "p1", cache)] == ["done", "failed", "linked"]
+    assert sorted(DigestCache(cache.path).entries) == ["done", "linked"]
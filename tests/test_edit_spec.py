@@ -0,0 +1,62 @@
+import uuid
+from types import SimpleNamespace
+
+from utils.edit_spec import BeatEdit, EditSpec, voiceover_edit_spec
+from utils.timeline import Clip, ClipRequest, solve_timeline
+
+
+def beat(number, asset_id=None, source="project"):
+    return SimpleNamespace(beat=SimpleNamespace(beat_number=number), video_asset_id=asset_id, video_source=source)
+
+
+def layout(edit):
+    return [(clip.asset_id, clip.type, clip.frames) for clip in edit.spec.timeline]
+
+
+def test_from_beats_splits_voiceover_between_beats_with_video():
+    edit = BeatEdit.from_beats([beat(1, "a"), beat(2), beat(3, "c", "vj_library")], "voice", 10)
+    assert layout(edit) == [("a", "asset", 150), ("c", "videofile", 150)]
+    assert edit.spec.audio[0].frames == 300
+
+
+def test_update_beat_swaps_adds_and_removes_clips():
+    edit = BeatEdit.from_beats([beat(1, "a"), beat(2), beat(3, "c")], "voice", 10)
+    edit.update_beat(beat(3, "d"))
+    assert layout(edit) == [("a", "asset", 150), ("d", "asset", 150)]
+    edit.update_beat(beat(2, "b"))
+    assert layout(edit) == [("a", "asset", 100), ("b", "asset", 100), ("d", "asset", 100)]
+    edit.update_beat(beat(1))
+    assert layout(edit) == [("b", "asset", 150), ("d", "asset", 150)]
+    edit.update_beat(beat(1))
+    assert edit.clip_count == 2
+
+
+def test_voiceover_shorter_than_one_frame_per_clip_drops_later_clips():
+    beats = [beat(n, f"v{n}") for n in range(1, 6)]
+    edit = BeatEdit.from_beats(beats, "voice", 0.1)
+    assert layout(edit) == [("v1", "asset", 1), ("v2", "asset", 1), ("v3", "asset", 1)]
+
+    edit.update_beat(beat(3))
+    assert [asset_id for asset_id, _, _ in layout(edit)] == ["v1", "v2", "v4"]
+    edit.update_beat(beat(3, "x"))
+    assert [asset_id for asset_id, _, _ in layout(edit)] == ["v1", "v2", "x"]
+    assert edit.spec.timeline.frames == edit.spec.audio[0].frames == 3
+
+
+def test_spec_serialises_the_same_layout_both_ways():
+    spec = EditSpec(name="Test", fps=30)
+    spec.timeline.append(Clip(asset_id=str(uuid.uuid4()), in_frame=30, out_frame=75))
+    spec.add_audio(str(uuid.uuid4()), 1.5)
+    data = spec.to_json()
+    sdk = spec.to_video_edit_create()
+    clip = data["video_series_sequential"][0]
+    assert (clip["video_start_time"], clip["video_end_time"]) == ("00:00:01.000", "00:00:02.500")
+    assert sdk.video_series_sequential[0].video_end_time.isoformat(timespec="milliseconds") == "00:00:02.500"
+    assert data["audio_overlay"][0]["audio_end_time"] == "00:00:01.500"
+
+
+def test_voiceover_edit_spec():
+    solved = solve_timeline([ClipRequest(asset_id="a", asset_duration=10)], 4)
+    data = voiceover_edit_spec(solved, "voice", 4, name="VO")
+    assert data["name"] == "VO"
+    assert data["video_series_sequential"][0]["video_end_time"] == "00:00:04.000"
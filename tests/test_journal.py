@@ -0,0 +1,44 @@
+import pytest
+
+from utils.journal import RunJournal
+
+
+def test_stages_and_keyed_entries_survive_reopening(tmp_path):
+    journal = RunJournal.create(str(tmp_path))
+    journal.record("project", {"project_id": "p1"})
+    journal.record("beat", {"video": None}, key=1)
+    journal.record("beat", {"video": "v1"}, key=1)
+    journal.record("beat", {"video": "v2"}, key=2)
+
+    reopened = RunJournal.open(journal.run_id, str(tmp_path))
+    assert reopened.get("project") == {"project_id": "p1"}
+    assert reopened.get("edit", "missing") == "missing"
+    assert reopened.entries("beat") == {"1": {"video": "v1"}, "2": {"video": "v2"}}
+
+
+def test_open_unknown_run(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        RunJournal.open("nope", str(tmp_path))
+
+
+def test_partial_last_line_is_dropped_and_appends_stay_readable(tmp_path):
+    journal = RunJournal.create(str(tmp_path))
+    journal.record("project", {"project_id": "p1"})
+    with open(journal.path, "a") as f:
+        f.write('{"stage": "voiceover", "key": null, "da')  # crash mid-write
+
+    resumed = RunJournal.open(journal.run_id, str(tmp_path))
+    assert resumed.get("voiceover") is None
+    resumed.record("voiceover", {"voiceover_id": "a1"})
+
+    again = RunJournal.open(journal.run_id, str(tmp_path))
+    assert again.get("project") == {"project_id": "p1"}
+    assert again.get("voiceover") == {"voiceover_id": "a1"}
+
+
+def test_unreadable_line_is_skipped(tmp_path):
+    journal = RunJournal.create(str(tmp_path))
+    with open(journal.path, "a") as f:
+        f.write("not json\n")
+    journal.record("edit", {"edit_id": "e1"})
+    assert RunJournal.open(journal.run_id, str(tmp_path)).get("edit") == {"edit_id": "e1"}
@@ -0,0 +1,99 @@
+import asyncio
+import os
+import time
+
+import pytest
+from pydantic import BaseModel
+
+from utils.llm_cache import LLM_CACHE_ENV, LLMResponseCache, request_key
+
+
+@pytest.fixture(autouse=True)
+def cache_enabled(monkeypatch):
+    monkeypatch.delenv(LLM_CACHE_ENV, raising=False)
+
+
+class Answer(BaseModel):
+    text: str
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = 0
+
+    def create(self, model, messages, response_model, **kwargs):
+        self.calls += 1
+        return response_model(text=f"{messages[0]['content']} #{self.calls}")
+
+
+class FakeAsyncClient(FakeClient):
+    async def create(self, model, messages, response_model, **kwargs):
+        return FakeClient.create(self, model, messages, response_model, **kwargs)
+
+
+def ask(client, prompt, **kwargs):
+    return client.chat.completions.create(model="m", messages=[{"role": "user", "content": prompt}],
+                                          response_model=Answer, **kwargs)
+
+
+def test_request_key_ignores_retry_arguments_and_needs_a_schema():
+    kwargs = {"model": "m", "messages": [], "response_model": Answer}
+    assert request_key("", kwargs)[0] == request_key("", {**kwargs, "max_retries": 3})[0]
+    assert request_key("", {**kwargs, "model": "other"})[0] != request_key("", kwargs)[0]
+    assert request_key("", {"model": "m", "messages": []}) is None
+    assert request_key("", {**kwargs, "stream": True}) is None
+
+
+def test_repeated_request_is_served_from_disk(tmp_path):
+    path = str(tmp_path / "cache.json")
+    fake = FakeClient()
+    client = LLMResponseCache(path).wrap(fake)
+    assert ask(client, "hi").text == "hi #1"
+    assert ask(client, "hi").text == "hi #1"
+    assert ask(client, "hi", cache=False).text == "hi #2"
+
+    reloaded = LLMResponseCache(path).wrap(fake)
+    assert ask(reloaded, "hi").text == "hi #1"
+    assert fake.calls == 2
+
+
+def test_async_client_is_cached(tmp_path):
+    fake = FakeAsyncClient()
+    client = LLMResponseCache(str(tmp_path / "cache.json")).wrap(fake)
+    first = asyncio.run(ask(client, "hi"))
+    second = asyncio.run(ask(client, "hi"))
+    assert first == second and fake.calls == 1
+
+
+def test_expired_responses_are_not_used(tmp_path):
+    fake = FakeClient()
+    client = LLMResponseCache(str(tmp_path / "cache.json")).wrap(fake)
+    ask(client, "hi", cache_ttl=0.01)
+    time.sleep(0.02)
+    assert ask(client, "hi").text == "hi #2"
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.json"), max_entries=2)
+    fake = FakeClient()
+    client = cache.wrap(fake)
+    ask(client, "a")
+    ask(client, "b")
+    ask(client, "a")  # b is now the least recently used
+    ask(client, "c")
+    assert fake.calls == 3
+    assert ask(client, "a").text == "a #1"
+    assert ask(client, "b").text == "b #4"
+
+
+def test_cache_hits_do_not_rewrite_the_file(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = LLMResponseCache(path)
+    client = cache.wrap(FakeClient())
+    ask(client, "hi")
+    written = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(written - 10**9, written - 10**9))
+    ask(client, "hi")
+    assert os.stat(path).st_mtime_ns == written - 10**9
+    cache.flush()
+    assert os.stat(path).st_mtime_ns != written - 10**9
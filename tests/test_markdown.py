@@ -0,0 +1,74 @@
+import pytest
+
+from utils.markdown import ANY_HEADING, H2, find_section, iter_sections
+
+DOCUMENT = """Preamble that belongs to no section.
+
+# Title
+
+## Introduction
+Intro text.
+
+## Early Life
+Born somewhere. ünïcödé
+
+### Childhood
+Grew up.
+
+```bash
+## not a heading
+```
+
+## References
+- a link
+"""
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "research.md"
+    path.write_text(DOCUMENT, encoding="utf-8")
+    return str(path)
+
+
+def test_h2_policy_keeps_deeper_headings_in_the_body(document):
+    sections = list(iter_sections(document, policy=H2))
+    assert [s.heading for s in sections] == ["Introduction", "Early Life", "References"]
+    body = sections[1].content
+    assert body.startswith("Born somewhere. ünïcödé")
+    assert "### Childhood" in body
+    assert "## not a heading" in body
+
+
+def test_any_policy_splits_at_every_level(document):
+    sections = list(iter_sections(document, policy=ANY_HEADING))
+    assert [(s.heading, s.level) for s in sections] == [
+        ("Title", 1), ("Introduction", 2), ("Early Life", 2), ("Childhood", 3), ("References", 2),
+    ]
+    assert sections[0].content == ""
+
+
+def test_skip_headings_is_case_insensitive(document):
+    sections = iter_sections(document, skip_headings=["introduction", "REFERENCES"])
+    assert [s.heading for s in sections] == ["Early Life"]
+
+
+def test_byte_offsets_and_lazy_reads(document):
+    raw = DOCUMENT.encode("utf-8")
+    eager = list(iter_sections(document, policy=ANY_HEADING))
+    lazy = list(iter_sections(document, policy=ANY_HEADING, lazy=True))
+    for full, section in zip(eager, lazy):
+        assert section.content is None
+        assert section.read() == full.content
+        assert raw[section.start:section.body_start].decode().lstrip("#").strip() == section.heading
+    assert lazy[-1].end == len(raw)
+
+
+def test_find_section(document):
+    assert find_section(document, "early life").read().startswith("Born somewhere.")
+    assert find_section(document, "Missing") is None
+
+
+def test_unknown_policy(document):
+    with pytest.raises(ValueError):
+        list(iter_sections(document, policy="h3"))
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from utils.mcp_cache import MCPToolCache, call_key
+
+
+def test_call_key_normalises_arguments():
+    assert call_key("vj", "search", {"query": " skate ", "limit": None}) == call_key("vj", "search", {"query": "skate"})
+
+
+def test_entries_expire_and_persist(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = MCPToolCache(path)
+    cache.put("fresh", "vj", "search", {"ok": True}, ttl=60)
+    cache.put("stale", "vj", "search", {"ok": True}, ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("stale") is None
+    reloaded = MCPToolCache(path)
+    assert reloaded.get("fresh")["result"] == {"ok": True}
+    assert "stale" not in reloaded.entries
+
+
+def test_hook_caches_reads_and_mutations_invalidate(tmp_path):
+    cache = MCPToolCache(str(tmp_path / "cache.json"))
+    calls = []
+
+    async def call_tool(name, args, metadata):
+        calls.append(name)
+        return {"call": len(calls)}
+
+    hook = cache.hook("vj", {"get-project-assets": 60}, mutating_tools={"update-video-edit"})
+
+    async def scenario():
+        first = await hook(None, call_tool, "get-project-assets", {"project_id": "p"})
+        second = await hook(None, call_tool, "get-project-assets", {"project_id": "p"})
+        await hook(None, call_tool, "update-video-edit", {})
+        third = await hook(None, call_tool, "get-project-assets", {"project_id": "p"})
+        return first, second, third
+
+    assert asyncio.run(scenario()) == ({"call": 1}, {"call": 1}, {"call": 3})
+    assert cache.hits == 1
+
+
+def test_invalidate_only_drops_calls_with_matching_arguments(tmp_path):
+    cache = MCPToolCache(str(tmp_path / "cache.json"))
+    cache.put("p1", "vj", "get-project-assets", [], ttl=60, arguments={"project_id": "p1"})
+    cache.put("p2", "vj", "get-project-assets", [], ttl=60, arguments={"project_id": "p2"})
+    cache.put("search", "vj", "search-remote-videos", [], ttl=60, arguments={"query": "skate"})
+    assert cache.invalidate("vj", arguments={"project_id": "p1"}) == 1
+    assert sorted(cache.entries) == ["p2", "search"]
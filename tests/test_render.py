@@ -0,0 +1,96 @@
+import json
+
+from utils.render import RenderDownloader
+
+BODY = b"new render " * 100
+ETAG = '"v2"'
+
+
+class Response:
+    def __init__(self, status_code, body, headers):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, size):
+        for i in range(0, len(self.body), size):
+            yield self.body[i:i + size]
+
+
+class Server:
+    """Serves BODY, honouring Range only when If-Range matches its ETag"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, headers=None, **kwargs):
+        headers = headers or {}
+        self.requests.append(headers)
+        if "Range" in headers and headers.get("If-Range") == ETAG:
+            start = int(headers["Range"].split("=")[1].rstrip("-"))
+            if start >= len(BODY):
+                return Response(416, b"", {"Content-Range": f"bytes */{len(BODY)}"})
+            return Response(206, BODY[start:], {"Content-Range": f"bytes {start}-{len(BODY) - 1}/{len(BODY)}",
+                                                "ETag": ETAG})
+        return Response(200, BODY, {"Content-Length": str(len(BODY)), "ETag": ETAG})
+
+
+def downloader(server):
+    client = type("Client", (), {"session": server})()
+    return RenderDownloader(client, progress_interval=60)
+
+
+def test_leftover_part_from_another_render_is_discarded(tmp_path):
+    target = tmp_path / "edit.mp4"
+    (tmp_path / "edit.mp4.part").write_bytes(b"old render bytes")
+    (tmp_path / "edit.mp4.part.json").write_text(json.dumps({"url": "https://cdn/old.mp4", "etag": '"v1"'}))
+    server = Server()
+    downloader(server).download("https://cdn/new.mp4?sig=1", str(target))
+    assert target.read_bytes() == BODY
+    assert server.requests == [{}]
+    assert not (tmp_path / "edit.mp4.part.json").exists()
+
+
+def test_part_without_record_is_not_resumed(tmp_path):
+    target = tmp_path / "edit.mp4"
+    (tmp_path / "edit.mp4.part").write_bytes(b"unknown")
+    downloader(Server()).download("https://cdn/new.mp4", str(target))
+    assert target.read_bytes() == BODY
+
+
+def test_same_render_resumes_with_if_range(tmp_path):
+    target = tmp_path / "edit.mp4"
+    (tmp_path / "edit.mp4.part").write_bytes(BODY[:300])
+    (tmp_path / "edit.mp4.part.json").write_text(json.dumps({"url": "https://cdn/new.mp4", "etag": ETAG}))
+    server = Server()
+    downloader(server).download("https://cdn/new.mp4?sig=2", str(target))
+    assert target.read_bytes() == BODY
+    assert server.requests == [{"Range": "bytes=300-", "If-Range": ETAG}]
+
+
+def test_changed_etag_restarts_from_zero(tmp_path):
+    target = tmp_path / "edit.mp4"
+    (tmp_path / "edit.mp4.part").write_bytes(b"x" * 300)
+    (tmp_path / "edit.mp4.part.json").write_text(json.dumps({"url": "https://cdn/new.mp4", "etag": '"v1"'}))
+    downloader(Server()).download("https://cdn/new.mp4", str(target))
+    assert target.read_bytes() == BODY
+
+
+def test_part_longer_than_the_render_restarts_from_zero(tmp_path):
+    target = tmp_path / "edit.mp4"
+    (tmp_path / "edit.mp4.part").write_bytes(BODY + b"trailing bytes")
+    (tmp_path / "edit.mp4.part.json").write_text(json.dumps({"url": "https://cdn/new.mp4", "etag": ETAG}))
+    server = Server()
+    downloader(server).download("https://cdn/new.mp4", str(target))
+    assert target.read_bytes() == BODY
+    assert server.requests == [{"Range": f"bytes={len(BODY) + 14}-", "If-Range": ETAG}, {}]
+    assert not (tmp_path / "edit.mp4.part.json").exists()
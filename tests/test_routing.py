@@ -0,0 +1,103 @@
+import asyncio
+from typing import List
+
+import pytest
+from pydantic import BaseModel
+from pydantic_ai import Agent
+from pydantic_ai.messages import ModelResponse, ToolCallPart
+from pydantic_ai.models.function import FunctionModel
+
+from utils.profiling import PROFILE_ENV
+from utils.routing import CascadeFailed, ModelCascade, RouteStats, is_video_url, min_relevance, video_urls
+
+
+class Video(BaseModel):
+    url: str
+    relevance_score: float = 0.0
+
+
+class VideoList(BaseModel):
+    videos: List[Video]
+
+
+def answering(*videos):
+    def respond(messages, info):
+        args = {"videos": [{"url": url, "relevance_score": score} for url, score in videos]}
+        return ModelResponse(parts=[ToolCallPart(info.output_tools[0].name, args)])
+    return FunctionModel(respond)
+
+
+def failing(messages, info):
+    raise RuntimeError("model unavailable")
+
+
+@pytest.fixture(autouse=True)
+def no_profiling(monkeypatch):
+    monkeypatch.setenv(PROFILE_ENV, "0")
+
+
+@pytest.fixture
+def stats(tmp_path):
+    return RouteStats(str(tmp_path / "stats.json"))
+
+
+def cascade(stats, *models):
+    return ModelCascade("search", list(models), validators=[min_relevance(0.5), video_urls()], stats=stats)
+
+
+async def run(cascade):
+    return await cascade.run(Agent(output_type=VideoList), "find videos")
+
+
+def test_cheap_model_is_used_when_its_output_validates(stats):
+    result = asyncio.run(run(cascade(
+        stats,
+        ("cheap", answering(("https://youtu.be/a", 0.9))),
+        ("pro", answering(("https://youtu.be/b", 0.9))),
+    )))
+    assert result.output.videos[0].url == "https://youtu.be/a"
+    assert "search:pro" not in stats.routes
+
+
+def test_escalates_on_failed_validation_and_errors(stats):
+    result = asyncio.run(run(cascade(
+        stats,
+        ("error", FunctionModel(failing)),
+        ("weak", answering(("https://youtu.be/a", 0.1))),
+        ("pro", answering(("https://vimeo.com/1", 0.8))),
+    )))
+    assert result.output.videos[0].url == "https://vimeo.com/1"
+    assert stats.routes["search:weak"]["failures"] == {"only 0 videos with relevance >= 0.5": 1}
+    assert stats.routes["search:error"]["successes"] == 0
+    assert RouteStats(stats.path).routes["search:pro"]["successes"] == 1
+
+
+def test_raises_with_last_result_when_every_model_fails(stats):
+    with pytest.raises(CascadeFailed) as failed:
+        asyncio.run(run(cascade(stats, ("only", answering(("not a url", 0.9))))))
+    assert failed.value.last_result.output.videos[0].url == "not a url"
+
+
+def test_video_url_checks():
+    assert is_video_url("https://www.youtube.com/watch?v=x")
+    assert is_video_url("https://cdn.example.com/clip.MP4")
+    assert not is_video_url("https://example.com/article")
+    assert not is_video_url("ftp://youtube.com/x")
+
+
+def test_only_validated_output_reaches_on_output(stats):
+    outputs = []
+
+    async def on_output(output, final=False):
+        outputs.append((final, [video.url for video in output.videos] if final else output))
+
+    async def go():
+        return await cascade(
+            stats,
+            ("weak", answering(("https://youtu.be/a", 0.1))),
+            ("cheap", answering(("https://youtu.be/b", 0.9))),
+            ("pro", answering(("https://youtu.be/c", 0.9))),
+        ).run(Agent(output_type=VideoList), "find videos", on_output=on_output)
+
+    asyncio.run(go())
+    assert outputs == [(True, ["https://youtu.be/b"])]
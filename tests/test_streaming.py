@@ -0,0 +1,48 @@
+import asyncio
+from typing import List
+
+from pydantic import BaseModel
+
+from utils.streaming import StreamedItems
+
+
+class Video(BaseModel):
+    url: str
+
+
+class VideoList(BaseModel):
+    videos: List[Video]
+
+
+def partial(*urls):
+    return {"videos": [{"url": url} for url in urls]}
+
+
+async def stream(*steps):
+    items = StreamedItems(Video, "videos", key=lambda video: video.url)
+    for output, final in steps:
+        await items.on_output(output, final=final)
+    items.close()
+    handled = await items.consume(lambda video: asyncio.sleep(0, video.url))
+    return items, handled
+
+
+def test_items_are_queued_once_complete():
+    items, handled = asyncio.run(stream(
+        (partial("a"), False),
+        (partial("a", "b"), False),
+        (partial("a", "b", "c"), False),
+        (VideoList(videos=[Video(url=u) for u in "abc"]), True),
+    ))
+    assert handled == ["a", "b", "c"]
+    assert items.queued == 3
+
+
+def test_waiting_items_from_a_rejected_output_are_dropped():
+    items, handled = asyncio.run(stream(
+        (partial("bad", "worse", "next"), False),  # output tool call that fails validation
+        (partial("good", "x"), False),  # the retry
+        (VideoList(videos=[Video(url="good"), Video(url="x")]), True),
+    ))
+    assert handled == ["good", "x"]
+    assert items.seen == {"good", "x"}
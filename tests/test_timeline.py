@@ -0,0 +1,126 @@
+import random
+
+import pytest
+
+from utils.timeline import (
+    Clip, ClipRequest, Timeline, TimelineError, frames_to_timestamp, solve_timeline, split_evenly,
+)
+
+
+def test_frames_to_timestamp():
+    assert frames_to_timestamp(0) == "00:00:00.000"
+    assert frames_to_timestamp(45) == "00:00:01.500"
+    assert frames_to_timestamp(30 * 3661) == "01:01:01.000"
+
+
+def test_split_evenly():
+    assert split_evenly(10, 3) == [3, 3, 4]
+    assert sum(split_evenly(901, 7)) == 901
+
+
+def test_solve_fills_duration_exactly():
+    clips = [ClipRequest(asset_id=str(i), asset_duration=20) for i in range(3)]
+    solved = solve_timeline(clips, 10.1)
+    assert sum(clip.frames for clip in solved) == 303
+    assert [clip.timeline_frame for clip in solved] == [0, solved[0].frames, solved[0].frames + solved[1].frames]
+
+
+def test_solve_keeps_preferred_proportions():
+    clips = [
+        ClipRequest(asset_id="a", preferred_seconds=2, asset_duration=60),
+        ClipRequest(asset_id="b", preferred_seconds=6, asset_duration=60),
+    ]
+    a, b = solve_timeline(clips, 16)
+    assert (a.frames, b.frames) == (120, 360)
+
+
+def test_solve_respects_asset_length_and_source_start():
+    clips = [
+        ClipRequest(asset_id="short", source_start=1, asset_duration=3),
+        ClipRequest(asset_id="long", asset_duration=100),
+    ]
+    short, long = solve_timeline(clips, 20)
+    assert short.in_frame == 30
+    assert short.out_frame <= 90
+    assert short.frames + long.frames == 600
+
+
+def test_solve_drops_clips_that_overflow_minimums():
+    clips = [ClipRequest(asset_id=str(i), min_seconds=4, asset_duration=10) for i in range(5)]
+    solved = solve_timeline(clips, 10)
+    assert [clip.asset_id for clip in solved] == ["0", "1"]
+
+
+def test_solve_raises_when_clips_are_too_short():
+    with pytest.raises(TimelineError):
+        solve_timeline([ClipRequest(asset_id="a", asset_duration=2)], 10)
+
+
+@pytest.mark.parametrize("preferred", [-5, 0])
+def test_solve_treats_non_positive_preference_as_fair_share(preferred):
+    clips = [
+        ClipRequest(asset_id="x", asset_duration=100, preferred_seconds=preferred),
+        ClipRequest(asset_id="y", asset_duration=100),
+    ]
+    x, y = solve_timeline(clips, 30)
+    assert (x.frames, y.frames) == (450, 450)
+
+
+def clips(*lengths):
+    return [Clip(asset_id=chr(ord("a") + i), out_frame=frames) for i, frames in enumerate(lengths)]
+
+
+def test_timeline_positions_ripple():
+    timeline = Timeline(clips(10, 20, 30))
+    assert (len(timeline), timeline.frames) == (3, 60)
+    assert [timeline.start_frame(i) for i in range(4)] == [0, 10, 30, 60]
+    timeline.resize(0, 5)
+    assert [timeline.start_frame(i) for i in range(4)] == [0, 5, 25, 55]
+
+
+def test_timeline_insert_remove_and_lookup():
+    timeline = Timeline(clips(10, 20))
+    timeline.insert(1, Clip(asset_id="x", out_frame=5))
+    assert [clip.asset_id for clip in timeline] == ["a", "x", "b"]
+    assert timeline.clip_at(12)[:2] == (1, timeline[1])
+    assert timeline.clip_at(15)[2] == 0
+    assert timeline.remove(-1).asset_id == "b"
+    assert timeline.frames == 15
+    with pytest.raises(IndexError):
+        timeline[2]
+
+
+def test_timeline_split():
+    timeline = Timeline(clips(10, 20))
+    index = timeline.split(15)
+    assert index == 2
+    assert [(clip.in_frame, clip.out_frame) for clip in timeline] == [(0, 10), (0, 5), (5, 20)]
+    assert timeline.split(10) == 1
+
+
+def test_timeline_matches_a_list():
+    rng = random.Random(7)
+    timeline, expected = Timeline(), []
+    for step in range(2000):
+        if expected and rng.random() < 0.3:
+            index = rng.randrange(len(expected))
+            assert timeline.remove(index) == expected.pop(index)
+        else:
+            index = rng.randint(0, len(expected))
+            clip = Clip(asset_id=str(step), out_frame=rng.randint(1, 100))
+            timeline.insert(index, clip)
+            expected.insert(index, clip)
+    assert list(timeline) == expected
+    assert timeline.frames == sum(clip.frames for clip in expected)
+
+
+@pytest.mark.parametrize("change", [
+    lambda timeline: timeline.resize(0, 0),
+    lambda timeline: timeline.replace(1, Clip(asset_id="x", in_frame=5, out_frame=5)),
+])
+def test_timeline_rejected_change_keeps_clips(change):
+    timeline = Timeline(clips(10, 20))
+    with pytest.raises(TimelineError):
+        change(timeline)
+    assert [(clip.asset_id, clip.frames) for clip in timeline] == [("a", 10), ("b", 20)]
+    assert timeline.frames == 30
@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import mcp_cache
+from utils.uploads import UploadManifest, file_hash, upload_or_link
+
+
+@pytest.fixture(autouse=True)
+def tool_cache(tmp_path, monkeypatch):
+    cache = mcp_cache.MCPToolCache(str(tmp_path / "tool-cache.json"))
+    monkeypatch.setattr(mcp_cache, "_tool_cache", cache)
+    return cache
+
+
+class FakeAssets:
+    def __init__(self, create_parameters=None):
+        self.uploads = 0
+        self.links = []
+        self.create_parameters = create_parameters
+
+    def get(self, asset_id):
+        return SimpleNamespace(id=asset_id, create_parameters=self.create_parameters)
+
+    def upload_asset(self, name, description, project_id, filename):
+        self.uploads += 1
+        return SimpleNamespace(id=f"asset-{self.uploads}", create_parameters=self.create_parameters)
+
+    def add_videofile_to_project(self, project_id, video_file_id, description=""):
+        self.links.append(video_file_id)
+        return SimpleNamespace(id=f"ref-{video_file_id}")
+
+
+class FakeVideoFiles:
+    def __init__(self, files=()):
+        self.files = list(files)
+
+    def list(self):
+        return self.files
+
+
+def setup(tmp_path, create_parameters=None, library=()):
+    video = tmp_path / "clip.mp4"
+    video.write_bytes(b"frames")
+    client = SimpleNamespace(assets=FakeAssets(create_parameters), video_files=FakeVideoFiles(library))
+    return client, str(video), UploadManifest(str(tmp_path / "uploads.json"))
+
+
+def test_same_project_reuses_asset(tmp_path):
+    client, video, manifest = setup(tmp_path)
+    assert upload_or_link(client, "p1", video, "clip", "", manifest) == ("asset-1", "uploaded")
+    assert upload_or_link(client, "p1", video, "clip", "", manifest) == ("asset-1", "reused")
+    assert client.assets.uploads == 1
+
+
+def test_new_project_links_video_file_named_by_the_upload(tmp_path):
+    client, video, manifest = setup(tmp_path, create_parameters={"video_file_id": "vf-1"})
+    upload_or_link(client, "p1", video, "clip", "", manifest)
+    assert upload_or_link(client, "p2", video, "clip", "", manifest) == ("ref-vf-1", "linked")
+    assert client.assets.links == ["vf-1"]
+    assert client.assets.uploads == 1
+
+
+def test_new_project_links_library_file_with_the_same_hash(tmp_path):
+    client, video, manifest = setup(tmp_path)
+    client.video_files.files = [
+        SimpleNamespace(id="vf-other", hash="0" * 64),
+        SimpleNamespace(id="vf-2", hash=file_hash(video)),
+    ]
+    upload_or_link(client, "p1", video, "clip", "", manifest)
+    assert upload_or_link(client, "p2", video, "clip", "", manifest) == ("ref-vf-2", "linked")
+    assert upload_or_link(client, "p3", video, "clip", "", manifest) == ("ref-vf-2", "linked")
+    assert client.assets.uploads == 1
+
+
+def test_library_copy_found_after_the_first_upload(tmp_path):
+    client, video, manifest = setup(tmp_path)
+    upload_or_link(client, "p1", video, "clip", "", manifest)
+    client.video_files.files = [SimpleNamespace(id="vf-3", hash=file_hash(video))]
+    assert upload_or_link(client, "p2", video, "clip", "", manifest) == ("ref-vf-3", "linked")
+
+
+def test_without_a_library_copy_the_file_is_uploaded_again(tmp_path):
+    client, video, manifest = setup(tmp_path)
+    upload_or_link(client, "p1", video, "clip", "", manifest)
+    assert upload_or_link(client, "p2", video, "clip", "", manifest) == ("asset-2", "uploaded")
+    assert client.assets.links == []
+
+
+def test_upload_drops_cached_project_assets(tmp_path, tool_cache):
+    client, video, manifest = setup(tmp_path)
+    tool_cache.put("assets", "video-editor", "get-project-assets", [], ttl=60, arguments={"project_id": "p1"})
+    upload_or_link(client, "p1", video, "clip", "", manifest)
+    assert tool_cache.entries == {}
@@ -0,0 +1,68 @@
+"""
+Merging per-section beat candidates into one documentary sequence.
+
+research-audio-agent generates beat candidates for each section of a research
+document separately (the map step). merge_candidates picks which to keep and
+how long each runs (the reduce step), independent of the models involved:
+
+    kept = merge_candidates(candidates, max_beats=10, total_seconds=audio_duration)
+    for candidate, seconds in kept:
+        ...
+
+Candidates only need ``importance`` and ``duration_seconds`` attributes.
+"""
+import math
+from typing import List, Optional, Sequence, Tuple
+
+from utils.timeline import split_evenly
+
+MIN_BEAT_SECONDS = 5
+MAX_BEAT_SECONDS = 10
+
+
+def beat_count(total_seconds: float, max_beats: int) -> int:
+    """
+    How many beats a running time needs: max_beats, raised so beats of at most
+    MAX_BEAT_SECONDS cover the whole time, and lowered so none is shorter than
+    MIN_BEAT_SECONDS
+    """
+    total = int(round(total_seconds))
+    needed = math.ceil(total / MAX_BEAT_SECONDS)
+    return max(1, min(max(max_beats, needed), total // MIN_BEAT_SECONDS))
+
+
+def merge_candidates(candidates: Sequence[Sequence], max_beats: int = 10,
+                     total_seconds: Optional[float] = None) -> List[Tuple[object, int]]:
+    """
+    (candidate, seconds) for the beats to keep, in document order
+
+    Every chunk's most important candidate is kept before any chunk's second
+    one, so the whole document stays covered when there are more candidates
+    than beats. The running time (total_seconds, or the kept candidates' own
+    total) is split evenly between the kept beats. With total_seconds, the
+    beat count is raised as far as needed to cover it with beats of at most
+    MAX_BEAT_SECONDS; only when there are too few candidates for that are the
+    beats capped at MAX_BEAT_SECONDS and part of the time left uncovered. A
+    running time under MIN_BEAT_SECONDS gets a single beat of that length.
+
+    Args:
+        candidates: Candidates for each chunk, chunks in document order
+        max_beats: Beats to keep when no running time is given (or it needs fewer)
+        total_seconds: Running time the beats should fill, e.g. the voiceover length
+    """
+    ranked = []
+    for chunk, beats in enumerate(candidates):
+        by_importance = sorted(range(len(beats)), key=lambda i: -beats[i].importance)
+        for rank, i in enumerate(by_importance):
+            ranked.append((rank, -beats[i].importance, chunk, i))
+
+    count = beat_count(total_seconds, max_beats) if total_seconds else max_beats
+    kept = sorted(sorted(ranked)[:count], key=lambda r: (r[2], r[3]))
+    chosen = [candidates[chunk][i] for _, _, chunk, i in kept]
+    if not chosen:
+        return []
+
+    total = max(1, round(total_seconds or sum(beat.duration_seconds for beat in chosen)))
+    shortest = min(MIN_BEAT_SECONDS, total)  # never longer than the running time itself
+    durations = [min(MAX_BEAT_SECONDS, max(shortest, seconds)) for seconds in split_evenly(total, len(chosen))]
+    return list(zip(chosen, durations))
@@ -0,0 +1,16 @@
+import os
+
+CACHE_DIR_ENV = "AGENT_CACHE_DIR"
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "video-editing-agent")
+
+
+def cache_path(*parts: str) -> str:
+    """
+    Path inside the shared on-disk cache directory, creating parent directories
+
+    The directory defaults to ~/.cache/video-editing-agent and can be moved
+    with the AGENT_CACHE_DIR environment variable.
+    """
+    path = os.path.join(os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,340 @@
+"""
+Record/replay layer for every external call the agents make.
+
+Set AGENT_CASSETTE to a file path to enable it:
+
+    AGENT_CASSETTE=runs/voice.jsonl AGENT_CASSETTE_MODE=record uv run voice-overlay.py
+    AGENT_CASSETTE=runs/voice.jsonl uv run voice-overlay.py    # replays, fully offline
+
+AGENT_CASSETTE_MODE is "record" or "replay" (default: replay when the file
+exists, record otherwise). AGENT_CASSETTE_LATENCY scales the recorded
+latency that is re-injected on replay: 0 (default) replays instantly, 1.0
+replays at the recorded speed. AGENT_CASSETTE_STRICT=1 makes replay fail
+with CassetteMiss whenever a request differs from the recording, instead of
+warning and falling back to the next interaction on the same route.
+
+Interactions are captured at four seams: Video Jungle API requests,
+httpx traffic from the shared LLM/HTTP clients, MCP tool listing and
+calls, and yt-dlp downloads (replayed as sparse files of the recorded size).
+"""
+import asyncio
+import base64
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+from pydantic_ai.exceptions import ModelRetry
+from pydantic_ai.mcp import MCPServer
+from pydantic_ai.tools import ToolDefinition
+from pydantic_core import to_jsonable_python
+
+CASSETTE_ENV = "AGENT_CASSETTE"
+MODE_ENV = "AGENT_CASSETTE_MODE"
+LATENCY_ENV = "AGENT_CASSETTE_LATENCY"
+STRICT_ENV = "AGENT_CASSETTE_STRICT"
+
+
+class CassetteMiss(LookupError):
+    """Raised on replay when no recorded interaction matches a request"""
+
+
+class ReplayedError(RuntimeError):
+    """Re-raised on replay for an interaction that failed while recording"""
+
+
+def _digest(value) -> str:
+    data = json.dumps(value, sort_keys=True, default=str).encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+class Cassette:
+    """
+    An append-only JSONL log of external interactions.
+
+    Each interaction has a route (e.g. "vj GET /projects/<id>") and a key that
+    also covers the request body. On replay an exact key match is preferred;
+    otherwise the next unused interaction on the same route is returned with
+    a warning, so requests that embed timestamps still replay in order. In
+    strict mode a key mismatch raises CassetteMiss instead.
+    """
+
+    def __init__(self, path: str, mode: str = "replay", latency: float = 0.0, strict: bool = False):
+        """
+        Args:
+            path: JSONL file to record to or replay from
+            mode: "record" or "replay"
+            latency: Fraction of the recorded latency to re-inject on replay
+            strict: On replay, only accept interactions whose key matches exactly
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.strict = strict
+        self._lock = threading.Lock()
+        self._interactions = []
+        self._used = set()
+
+        if mode == "record":
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            open(path, 'w').close()
+        else:
+            with open(path, 'r') as f:
+                self._interactions = [json.loads(line) for line in f if line.strip()]
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _record(self, kind, route, request, elapsed, response=None, error=None):
+        entry = {
+            "kind": kind,
+            "route": route,
+            "key": _digest([kind, route, request]),
+            "elapsed": round(elapsed, 4),
+        }
+        if error is not None:
+            entry["error"] = {"type": type(error).__name__, "message": str(error)}
+        else:
+            entry["response"] = response
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(entry) + "\n")
+
+    def _lookup(self, kind, route, request):
+        key = _digest([kind, route, request])
+        with self._lock:
+            match = None
+            for i, entry in enumerate(self._interactions):
+                if i in self._used or entry["route"] != route:
+                    continue
+                if entry["key"] == key:
+                    match = i
+                    break
+                if match is None:
+                    match = i
+            if match is None:
+                raise CassetteMiss(f"No recorded interaction for {route}")
+            if self._interactions[match]["key"] != key:
+                if self.strict:
+                    raise CassetteMiss(f"No recorded interaction for {route} matches the request")
+                print(f"Warning: cassette request for {route} differs from the recording; "
+                      f"replaying the next recorded interaction on that route")
+            self._used.add(match)
+            return self._interactions[match]
+
+    def _replay_result(self, entry, errors):
+        if "error" in entry:
+            error_cls = errors.get(entry["error"]["type"], ReplayedError)
+            raise error_cls(entry["error"]["message"])
+        return entry["response"]
+
+    def call(self, kind, route, request, fn, errors=None):
+        """
+        Record or replay a blocking call
+
+        Args:
+            kind: Interaction family, e.g. "vj" or "http"
+            route: Stable description of the endpoint being called
+            request: JSON-serialisable request details used for matching
+            fn: Zero-argument callable performing the real call; must return
+                a JSON-serialisable value
+            errors: Optional map of exception names to re-raise on replay
+        """
+        if self.replaying:
+            entry = self._lookup(kind, route, request)
+            if self.latency:
+                time.sleep(entry["elapsed"] * self.latency)
+            return self._replay_result(entry, errors or {})
+
+        start = time.perf_counter()
+        try:
+            response = fn()
+        except Exception as e:
+            self._record(kind, route, request, time.perf_counter() - start, error=e)
+            raise
+        self._record(kind, route, request, time.perf_counter() - start, response=response)
+        return response
+
+    async def acall(self, kind, route, request, fn, errors=None):
+        """Async version of call; fn returns an awaitable"""
+        if self.replaying:
+            entry = self._lookup(kind, route, request)
+            if self.latency:
+                await asyncio.sleep(entry["elapsed"] * self.latency)
+            return self._replay_result(entry, errors or {})
+
+        start = time.perf_counter()
+        try:
+            response = await fn()
+        except Exception as e:
+            self._record(kind, route, request, time.perf_counter() - start, error=e)
+            raise
+        self._record(kind, route, request, time.perf_counter() - start, response=response)
+        return response
+
+
+_active = None
+_active_loaded = False
+
+
+def active_cassette():
+    """Return the cassette configured through the environment, if any"""
+    global _active, _active_loaded
+    if not _active_loaded:
+        _active_loaded = True
+        path = os.environ.get(CASSETTE_ENV)
+        if path:
+            mode = os.environ.get(MODE_ENV) or ("replay" if os.path.exists(path) else "record")
+            latency = float(os.environ.get(LATENCY_ENV, "0") or 0)
+            strict = os.environ.get(STRICT_ENV, "0") not in ("", "0")
+            _active = Cassette(path, mode=mode, latency=latency, strict=strict)
+            print(f"Cassette {mode}: {path}")
+    return _active
+
+
+# httpx transports (LLM providers, Serper, ...)
+
+def _http_route(request: httpx.Request) -> str:
+    return f"{request.method} {request.url.host}{request.url.path}"
+
+
+def _http_request(request: httpx.Request) -> dict:
+    return {"query": request.url.query.decode('utf-8', 'replace'),
+            "body": hashlib.sha256(request.content).hexdigest()}
+
+
+def _serialise_response(response: httpx.Response) -> dict:
+    return {
+        "status": response.status_code,
+        "headers": {k: v for k, v in response.headers.items()
+                    if k.lower() not in ("content-encoding", "content-length", "transfer-encoding")},
+        "body": base64.b64encode(response.content).decode(),
+    }
+
+
+def _build_response(data: dict, request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        status_code=data["status"],
+        headers=data["headers"],
+        content=base64.b64decode(data["body"]),
+        request=request,
+    )
+
+
+class CassetteTransport(httpx.BaseTransport):
+    """Synchronous httpx transport that records or replays through a cassette"""
+
+    def __init__(self, cassette: Cassette, transport: httpx.BaseTransport = None):
+        self.cassette = cassette
+        self.transport = transport or httpx.HTTPTransport()
+
+    def handle_request(self, request):
+        def send():
+            response = self.transport.handle_request(request)
+            response.read()
+            return _serialise_response(response)
+        data = self.cassette.call("http", _http_route(request), _http_request(request), send)
+        return _build_response(data, request)
+
+    def close(self):
+        self.transport.close()
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport):
+    """Asynchronous httpx transport that records or replays through a cassette"""
+
+    def __init__(self, cassette: Cassette, transport: httpx.AsyncBaseTransport = None):
+        self.cassette = cassette
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        async def send():
+            response = await self.transport.handle_async_request(request)
+            await response.aread()
+            return _serialise_response(response)
+        data = await self.cassette.acall("http", _http_route(request), _http_request(request), send)
+        return _build_response(data, request)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+# MCP servers
+
+class CassetteMCPServer(MCPServer):
+    """
+    Wraps an MCP server so tool listings and tool calls go through a cassette.
+
+    On replay the wrapped server is never started, so no uvx process is spawned.
+    """
+
+    def __init__(self, server: MCPServer, name: str, cassette: Cassette):
+        self.server = server
+        self.name = name
+        self.cassette = cassette
+        self.tool_prefix = server.tool_prefix
+        self.log_level = server.log_level
+        self.log_handler = server.log_handler
+        self.timeout = server.timeout
+        self.process_tool_call = server.process_tool_call
+        self.allow_sampling = server.allow_sampling
+        self._running_count = 0
+
+    @asynccontextmanager
+    async def client_streams(self):
+        """The wrapped server's streams; the wrapper never opens its own"""
+        async with self.server.client_streams() as streams:
+            yield streams
+
+    @property
+    def is_running(self) -> bool:
+        if self.cassette.replaying:
+            return bool(self._running_count)
+        return self.server.is_running
+
+    async def __aenter__(self):
+        if not self.cassette.replaying:
+            self.server.sampling_model = self.sampling_model
+            await self.server.__aenter__()
+        self._running_count += 1
+        return self
+
+    async def __aexit__(self, *args):
+        self._running_count -= 1
+        if not self.cassette.replaying:
+            return await self.server.__aexit__(*args)
+
+    async def list_tools(self):
+        async def fetch():
+            return [dataclasses.asdict(tool) for tool in await self.server.list_tools()]
+        tools = await self.cassette.acall("mcp", f"{self.name} list_tools", {}, fetch)
+        return [ToolDefinition(**tool) for tool in tools]
+
+    async def call_tool(self, tool_name, arguments, metadata=None):
+        async def fetch():
+            result = await self.server.call_tool(tool_name, arguments, metadata)
+            return to_jsonable_python(result, bytes_mode='base64')
+        return await self.cassette.acall(
+            "mcp", f"{self.name} {tool_name}", arguments, fetch,
+            errors={"ModelRetry": ModelRetry},
+        )
+
+    def __repr__(self) -> str:
+        return f"CassetteMCPServer({self.name!r}, {self.server!r})"
+
+
+def wrap_mcp_server(server: MCPServer, name: str) -> MCPServer:
+    """Return server wrapped for the active cassette, or unchanged if there is none"""
+    cassette = active_cassette()
+    if cassette is None:
+        return server
+    return CassetteMCPServer(server, name, cassette)
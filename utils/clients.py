@@ -0,0 +1,193 @@
+"""
+Process-wide registry of LLM and HTTP clients.
+
+Every helper returns the same configured client for the same arguments, so
+repeated calls reuse one keep-alive connection pool instead of paying for a
+fresh pool, TLS handshake and client setup each time. Async connections
+belong to the event loop that opened them, so the async clients keep one
+pool per loop (see LoopLocalTransport).
+"""
+import asyncio
+import threading
+
+import httpx
+import instructor
+import logfire
+from anthropic import Anthropic, AsyncAnthropic
+from openai import OpenAI, AsyncOpenAI
+from pydantic_ai.models.anthropic import AnthropicModel
+from pydantic_ai.models.gemini import GeminiModel
+from pydantic_ai.models.openai import OpenAIModel
+from pydantic_ai.providers.anthropic import AnthropicProvider
+from pydantic_ai.providers.google_gla import GoogleGLAProvider
+from pydantic_ai.providers.openai import OpenAIProvider
+
+from utils.cassette import active_cassette, CassetteTransport, AsyncCassetteTransport
+from utils.llm_cache import default_llm_cache
+
+HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=90)
+HTTP_TIMEOUT = httpx.Timeout(timeout=600, connect=5)
+
+_clients = {}
+_lock = threading.RLock()
+
+
+def _cached(key, factory):
+    """Return the client stored under key, building it with factory on first use"""
+    with _lock:
+        if key not in _clients:
+            _clients[key] = factory()
+        return _clients[key]
+
+
+class LoopLocalTransport(httpx.AsyncBaseTransport):
+    """
+    An async transport with a separate connection pool for each event loop
+
+    The async clients are built once per process, often at import time before
+    any loop runs, and live across several asyncio.run calls. Sharing one pool
+    would hand a request connections opened on a loop that has since closed,
+    so each loop gets its own transport, and those of closed loops are dropped.
+    """
+
+    def __init__(self, factory):
+        """
+        Args:
+            factory: Builds the transport for a new loop, e.g. an AsyncHTTPTransport
+        """
+        self.factory = factory
+        self._transports = {}
+        self._lock = threading.Lock()
+
+    def _current(self) -> httpx.AsyncBaseTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            for stale in [other for other in self._transports if other.is_closed()]:
+                # Its connections can't be closed without their loop; dropping them releases the sockets
+                del self._transports[stale]
+            if loop not in self._transports:
+                self._transports[loop] = self.factory()
+            return self._transports[loop]
+
+    async def handle_async_request(self, request):
+        return await self._current().handle_async_request(request)
+
+    async def aclose(self):
+        """Close the running loop's pool (the others are closed from their own loops, or dropped)"""
+        with self._lock:
+            transport = self._transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+
+def _timeout_kwargs(timeout):
+    """SDK clients ignore the httpx client timeout, so pass it explicitly"""
+    return {"timeout": timeout} if timeout is not None else {}
+
+
+def http_client(timeout=None) -> httpx.Client:
+    """Shared synchronous httpx client"""
+    def build():
+        transport = httpx.HTTPTransport(limits=HTTP_LIMITS)
+        cassette = active_cassette()
+        if cassette is not None:
+            transport = CassetteTransport(cassette, transport)
+        return httpx.Client(transport=transport, timeout=timeout or HTTP_TIMEOUT)
+    return _cached(("http", timeout), build)
+
+
+def async_http_client(timeout=None) -> httpx.AsyncClient:
+    """Shared asynchronous httpx client, with a connection pool per event loop"""
+    def build():
+        transport = LoopLocalTransport(lambda: httpx.AsyncHTTPTransport(limits=HTTP_LIMITS))
+        cassette = active_cassette()
+        if cassette is not None:
+            transport = AsyncCassetteTransport(cassette, transport)
+        return httpx.AsyncClient(transport=transport, timeout=timeout or HTTP_TIMEOUT)
+    return _cached(("async-http", timeout), build)
+
+
+def openai_client(timeout=None, instrument=True) -> OpenAI:
+    """Shared OpenAI client, instrumented with logfire by default"""
+    def build():
+        client = OpenAI(http_client=http_client(timeout), **_timeout_kwargs(timeout))
+        if instrument:
+            logfire.instrument_openai(client)
+        return client
+    return _cached(("openai", timeout, instrument), build)
+
+
+def async_openai_client(timeout=None, instrument=True) -> AsyncOpenAI:
+    """Shared AsyncOpenAI client, instrumented with logfire by default"""
+    def build():
+        client = AsyncOpenAI(http_client=async_http_client(timeout), **_timeout_kwargs(timeout))
+        if instrument:
+            logfire.instrument_openai(client)
+        return client
+    return _cached(("async-openai", timeout, instrument), build)
+
+
+def anthropic_client(timeout=None, instrument=True) -> Anthropic:
+    """Shared Anthropic client, instrumented with logfire by default"""
+    def build():
+        client = Anthropic(http_client=http_client(timeout), **_timeout_kwargs(timeout))
+        if instrument:
+            logfire.instrument_anthropic(client)
+        return client
+    return _cached(("anthropic", timeout, instrument), build)
+
+
+def async_anthropic_client(timeout=None, instrument=True) -> AsyncAnthropic:
+    """Shared AsyncAnthropic client, instrumented with logfire by default"""
+    def build():
+        client = AsyncAnthropic(http_client=async_http_client(timeout), **_timeout_kwargs(timeout))
+        if instrument:
+            logfire.instrument_anthropic(client)
+        return client
+    return _cached(("async-anthropic", timeout, instrument), build)
+
+
+def instructor_client(provider: str, use_async: bool = False, cache: bool = True):
+    """
+    Shared instructor client wrapping the registry's provider client
+
+    Args:
+        provider: Either "openai" or "anthropic"
+        use_async: Whether to wrap the async client
+        cache: Whether create calls go through the on-disk response cache (see utils.llm_cache)
+    """
+    def build():
+        if provider == "openai":
+            return instructor.from_openai(async_openai_client() if use_async else openai_client())
+        if provider == "anthropic":
+            return instructor.from_anthropic(async_anthropic_client() if use_async else anthropic_client())
+        raise ValueError(f"Unknown instructor provider: {provider}")
+    client = _cached(("instructor", provider, use_async), build)
+    return default_llm_cache().wrap(client) if cache else client
+
+
+# pydantic_ai models. Agents created with instrument=True already trace model
+# requests, so the underlying provider clients are left uninstrumented.
+
+def anthropic_model(model_name: str) -> AnthropicModel:
+    """pydantic_ai Anthropic model backed by the shared async client"""
+    provider = _cached(("provider", "anthropic"), lambda: AnthropicProvider(
+        anthropic_client=async_anthropic_client(instrument=False)
+    ))
+    return AnthropicModel(model_name, provider=provider)
+
+
+def gemini_model(model_name: str) -> GeminiModel:
+    """pydantic_ai Gemini model backed by the shared async HTTP client"""
+    provider = _cached(("provider", "google-gla"), lambda: GoogleGLAProvider(
+        http_client=async_http_client()
+    ))
+    return GeminiModel(model_name, provider=provider)
+
+
+def openai_model(model_name: str) -> OpenAIModel:
+    """pydantic_ai OpenAI model backed by the shared async client"""
+    provider = _cached(("provider", "openai"), lambda: OpenAIProvider(
+        openai_client=async_openai_client(instrument=False)
+    ))
+    return OpenAIModel(model_name, provider=provider)
@@ -0,0 +1,125 @@
+"""
+Persistent, incremental index of parsed research documents.
+
+research-agent used to re-read and re-parse every markdown file in the
+directory on every run, re-running the meaningful-content checks on every
+section, even when nothing had changed. CorpusIndex keeps each file's parsed
+sections on disk keyed by path, mtime, size and content hash, and only hands
+files whose content actually changed back to the parser:
+
+    index = CorpusIndex(".", version="1")
+    sections = index.load(markdown_files, parse)  # {file: [section dict, ...]}
+
+A file whose mtime moved but whose content hash is unchanged (a touch, a
+checkout) is not re-parsed. Bump version when the parser changes so stale
+results are dropped. Set RESEARCH_INDEX=0 to always parse from scratch.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Callable, Dict, List
+
+from utils.cache import cache_path
+
+RESEARCH_INDEX_ENV = "RESEARCH_INDEX"
+
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class CorpusIndex:
+    """Parsed sections of a directory's documents, re-parsed only when a file changes"""
+
+    def __init__(self, directory: str = ".", path: str = None, version: str = "1"):
+        """
+        Args:
+            directory: Directory the indexed files live in
+            path: Index file location (default: one per directory in the shared cache dir)
+            version: Parser version; an index written by another version is discarded
+        """
+        self.directory = os.path.abspath(directory)
+        key = hashlib.sha256(self.directory.encode()).hexdigest()[:16]
+        self.path = path or cache_path("research-index", f"{key}.json")
+        self.version = version
+        self.enabled = os.environ.get(RESEARCH_INDEX_ENV) != "0"
+        self._lock = threading.Lock()
+        self.parsed = 0
+        self.reused = 0
+        self.files: Dict[str, dict] = {}
+        if self.enabled and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    data = json.load(f)
+                if data.get("version") == version:
+                    self.files = data.get("files", {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable research index {self.path}: {e}")
+
+    def _fresh(self, name: str, stat: os.stat_result):
+        """The indexed entry for a file if its content is unchanged, else None"""
+        entry = self.files.get(name)
+        if entry is None:
+            return None
+        if entry["mtime"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+            return entry
+        if entry["size"] == stat.st_size and entry["hash"] == file_hash(os.path.join(self.directory, name)):
+            entry["mtime"] = stat.st_mtime_ns
+            return entry
+        return None
+
+    def load(self, names: List[str], parse: Callable[[str], List[dict]]) -> Dict[str, List[dict]]:
+        """
+        Sections of each file, from the index where possible
+
+        Args:
+            names: File names relative to the directory
+            parse: Called with a file's path when it is new or changed; returns JSON-serialisable sections
+
+        Returns:
+            {name: sections} for every file that could be read
+        """
+        with self._lock:
+            sections = {}
+            changed = False
+            for name in names:
+                file_path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    print(f"Warning: File {file_path} not found")
+                    continue
+                indexed_mtime = self.files.get(name, {}).get("mtime")
+                entry = self._fresh(name, stat) if self.enabled else None
+                if entry is not None:
+                    changed = changed or stat.st_mtime_ns != indexed_mtime
+                    self.reused += 1
+                else:
+                    print(f"  - Processing {name}")
+                    entry = {
+                        "mtime": stat.st_mtime_ns,
+                        "size": stat.st_size,
+                        "hash": file_hash(file_path),
+                        "sections": parse(file_path),
+                    }
+                    self.files[name] = entry
+                    self.parsed += 1
+                    changed = True
+                sections[name] = entry["sections"]
+            for name in [name for name in self.files if name not in sections]:
+                del self.files[name]
+                changed = True
+            if changed and self.enabled:
+                self._save()
+            return sections
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"version": self.version, "directory": self.directory, "files": self.files}, f)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,241 @@
+"""
+Compact, token-efficient digests of a project's video assets.
+
+The edit agents used to page through get-project-assets two assets at a
+time, spending requests and context on verbose asset dumps. project_digest
+builds a single table of every video asset (id, duration, indoor/outdoor
+flag and a one-line scene summary) from the analysis Video Jungle has
+already produced. Finished analyses are cached on disk by asset id, since
+they never change once complete. The edit agents get it as a tool:
+
+    add_digest_tool(edit_agent, avj)
+"""
+import json
+import os
+import re
+import threading
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from utils.cache import cache_path
+
+VIDEO_ASSET_TYPES = ("user", "video", "video-reference")
+ANALYZED_STATUS = "analyzed"
+
+INDOOR_WORDS = {"indoor", "indoors", "inside", "interior", "room", "studio", "kitchen", "office",
+                "hallway", "bedroom", "living room", "warehouse", "gym", "stage"}
+OUTDOOR_WORDS = {"outdoor", "outdoors", "outside", "exterior", "street", "park", "skatepark", "beach",
+                 "sky", "forest", "field", "mountain", "ocean", "road", "city", "garden", "desert"}
+
+
+class AssetDigest(BaseModel):
+    id: str
+    name: str
+    duration: Optional[float] = None
+    indoor: bool = False
+    outdoor: bool = False
+    summary: str = ""
+    analyzed: bool = True
+
+
+def _find_key(data, names):
+    """First value stored under any of names, searching nested dicts and lists"""
+    if isinstance(data, dict):
+        for name in names:
+            if data.get(name) not in (None, ""):
+                return data[name]
+        children = data.values()
+    elif isinstance(data, list):
+        children = data
+    else:
+        return None
+    for child in children:
+        found = _find_key(child, names)
+        if found is not None:
+            return found
+    return None
+
+
+def _as_seconds(value) -> Optional[float]:
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        # "12.5", "00:01:02.5" or "1:02"
+        try:
+            seconds = 0.0
+            for part in value.strip().split(":"):
+                seconds = seconds * 60 + float(part)
+            return seconds
+        except ValueError:
+            return None
+    return None
+
+
+def _string_values(data):
+    """Every string value in nested dicts and lists, leaving out the keys"""
+    if isinstance(data, dict):
+        data = list(data.values())
+    if isinstance(data, list):
+        for child in data:
+            yield from _string_values(child)
+    elif isinstance(data, str):
+        yield data
+
+
+def _mentions(text: str, words) -> bool:
+    return any(re.search(rf"\b{re.escape(word)}\b", text) for word in words)
+
+
+def _first_sentence(text: str, limit: int = 90) -> str:
+    text = " ".join(text.split())
+    sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    return sentence if len(sentence) <= limit else sentence[:limit - 3].rstrip() + "..."
+
+
+def digest_asset(asset) -> AssetDigest:
+    """Reduce one Video Jungle asset to its digest row"""
+    params = asset.create_parameters if isinstance(asset.create_parameters, dict) else {}
+    analysis = params.get("analysis") or {}
+
+    duration = _as_seconds(_find_key(analysis, ("duration", "video_duration", "length"))
+                           or _find_key(params, ("duration", "video_duration")))
+
+    described = _find_key(analysis, ("summary", "description", "scene_description")) \
+        or asset.generated_description or asset.description or ""
+    summary = described if isinstance(described, str) else json.dumps(described)
+
+    setting = _find_key(analysis, ("setting", "location", "environment"))
+    indoor = _find_key(analysis, ("indoor", "is_indoor"))
+    outdoor = _find_key(analysis, ("outdoor", "is_outdoor"))
+    if not isinstance(indoor, bool) or not isinstance(outdoor, bool):
+        # No explicit flags: infer them from what the analysis says about the scenes
+        # Only values count: a key such as "outdoor" says nothing about the scene
+        text = " ".join(_string_values([setting, described, analysis])).lower()
+        indoor = indoor if isinstance(indoor, bool) else _mentions(text, INDOOR_WORDS)
+        outdoor = outdoor if isinstance(outdoor, bool) else _mentions(text, OUTDOOR_WORDS)
+
+    return AssetDigest(
+        id=asset.id,
+        name=asset.keyname or "",
+        duration=duration,
+        indoor=indoor,
+        outdoor=outdoor,
+        summary=_first_sentence(summary),
+        analyzed=not asset.is_analyzing,
+    )
+
+
+class DigestCache:
+    """On-disk cache of digests for assets whose analysis has finished"""
+
+    def __init__(self, path: str = None):
+        self.path = path or cache_path("asset-digests.json")
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable digest cache {self.path}: {e}")
+
+    def get(self, asset_id: str) -> Optional[AssetDigest]:
+        with self._lock:
+            entry = self.entries.get(asset_id)
+        return AssetDigest(**entry) if entry else None
+
+    def put_many(self, digests: List[AssetDigest]):
+        with self._lock:
+            for digest in digests:
+                self.entries[digest.id] = digest.model_dump()
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+
+
+_digest_cache = None
+_digest_cache_lock = threading.Lock()
+
+
+def default_digest_cache() -> DigestCache:
+    """The process-wide digest cache"""
+    global _digest_cache
+    with _digest_cache_lock:
+        if _digest_cache is None:
+            _digest_cache = DigestCache()
+        return _digest_cache
+
+
+def project_digest(client, project_id: str, cache: DigestCache = None) -> List[AssetDigest]:
+    """
+    Digest every video asset in a project, reusing cached analysis where possible
+
+    Args:
+        client: Video Jungle ApiClient
+        project_id: Project to digest
+        cache: Digest cache to consult (default: the shared one)
+    """
+    cache = cache or default_digest_cache()
+    project = client.projects.get(project_id)
+    digests, fresh = [], []
+    for asset in project.assets:
+        if asset.asset_type not in VIDEO_ASSET_TYPES:
+            continue
+        digest = cache.get(asset.id)
+        if digest is None:
+            digest = digest_asset(asset)
+            # Failed or unknown statuses may still change, so only finished analyses are cached
+            if asset.status == ANALYZED_STATUS:
+                fresh.append(digest)
+        digests.append(digest)
+    if fresh:
+        cache.put_many(fresh)
+    return digests
+
+
+def format_digest(digests: List[AssetDigest]) -> str:
+    """Render digests as one compact pipe-separated table"""
+    if not digests:
+        return "No video assets in this project."
+    lines = ["id | seconds | setting | summary"]
+    for digest in digests:
+        setting = ("indoor+outdoor" if digest.indoor and digest.outdoor
+                   else "indoor" if digest.indoor
+                   else "outdoor" if digest.outdoor
+                   else "unknown")
+        seconds = f"{digest.duration:.1f}" if digest.duration is not None else "?"
+        summary = digest.summary or digest.name
+        if not digest.analyzed:
+            summary = f"(still analyzing) {summary}"
+        lines.append(f"{digest.id} | {seconds} | {setting} | {summary}")
+    return "\n".join(lines)
+
+
+def project_digest_table(client, project_id: str) -> str:
+    """project_digest rendered with format_digest"""
+    return format_digest(project_digest(client, project_id))
+
+
+def add_digest_tool(agent, avj):
+    """
+    Register the get_project_digest tool on an agent
+
+    Args:
+        agent: The pydantic_ai Agent that plans or creates edits
+        avj: AsyncApiClient the digest is built on
+    """
+    @agent.tool_plain
+    async def get_project_digest(project_id: str) -> str:
+        """
+        One compact table of every video asset in a project: id, duration in seconds,
+        indoor/outdoor setting and a one-line scene summary. Call this once to plan the
+        whole edit instead of paging through get-project-assets.
+
+        Args:
+            project_id: The Video Jungle project id
+        """
+        return await avj.run(project_digest_table, avj.client, project_id)
+
+    return get_project_digest
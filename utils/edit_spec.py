@@ -0,0 +1,269 @@
+"""
+One edit layout, serialised for both the Video Jungle SDK and the JSON edit spec.
+
+research-audio-agent used to lay out its clips twice: once as SDK objects for
+create_edit and again as the JSON spec saved next to the project, with each
+pass recomputing timings and asset types. EditSpec holds the layout once, on
+a frame-accurate Timeline, and renders it either way:
+
+    edit = BeatEdit.from_beats(beats_with_assets, voiceover_id, audio_duration, name="Documentary")
+    await avj.projects.create_edit(project_id, edit.spec.to_video_edit_create())
+    json.dump(edit.spec.to_json(), f)
+
+BeatEdit remembers which clip belongs to which beat, so the layout can be
+created before the beats are resolved and patched as each beat's video is
+found, rather than rebuilt.
+"""
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+from videojungle import VideoAudioLevel, VideoEditAsset, VideoEditAudioAsset, VideoEditCreate
+
+from utils.timeline import FPS, Clip, SolvedClip, Timeline, frames_to_timestamp, seconds_to_frames, split_evenly
+
+ZERO = "00:00:00.000"
+
+
+class AudioOverlay(BaseModel):
+    audio_id: str
+    type: str = "voiceover"
+    frames: int
+    level: float = 1.0
+
+
+class EditSpec:
+    """
+    A sequential edit: clips back to back on a Timeline, with audio overlays from the start
+
+    Args:
+        name: Edit name (default: timestamped)
+        description: Edit description
+        fps: Frame rate of the edit
+        resolution: Output resolution
+        output_filename: Rendered file name (default: derived from the name)
+        skip_rendering: Create the edit without rendering it
+        subtitles: Burn in subtitles when rendering
+        video_audio_level: Volume of the clips' own audio under the overlays
+    """
+
+    def __init__(self, name: str = None, description: str = None, fps: int = FPS, resolution: str = "1920x1080",
+                 output_filename: str = None, skip_rendering: bool = False, subtitles: bool = True,
+                 video_audio_level: float = 0.5):
+        self.name = name or f"Edit {datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        self.description = description
+        self.fps = fps
+        self.resolution = resolution
+        self.output_filename = output_filename or f"{self.name.replace(' ', '_').lower()}.mp4"
+        self.skip_rendering = skip_rendering
+        self.subtitles = subtitles
+        self.video_audio_level = video_audio_level
+        self.timeline = Timeline(fps=fps)
+        self.audio: List[AudioOverlay] = []
+
+    def add_audio(self, audio_id: str, seconds: float, type: str = "voiceover", level: float = 1.0):
+        self.audio.append(AudioOverlay(audio_id=audio_id, type=type, frames=seconds_to_frames(seconds, self.fps),
+                                       level=level))
+
+    def _times(self, start: int, end: int):
+        return frames_to_timestamp(start, self.fps), frames_to_timestamp(end, self.fps)
+
+    def to_json(self, metadata: dict = None) -> dict:
+        """The JSON edit spec, as accepted by projects.render_edit"""
+        clips = []
+        for clip in self.timeline:
+            start, end = self._times(clip.in_frame, clip.out_frame)
+            clips.append({
+                "video_id": clip.asset_id,
+                "type": clip.type,
+                "video_start_time": start,
+                "video_end_time": end,
+                "audio_levels": [{"audio_level": str(self.video_audio_level), "start_time": start, "end_time": end}],
+            })
+        overlays = []
+        for audio in self.audio:
+            end = frames_to_timestamp(audio.frames, self.fps)
+            overlays.append({
+                "audio_id": audio.audio_id,
+                "type": audio.type,
+                "audio_start_time": ZERO,
+                "audio_end_time": end,
+                "audio_levels": [{"audio_level": str(audio.level), "start_time": ZERO, "end_time": end}],
+            })
+        spec = {
+            "video_edit_version": "1.0",
+            "video_output_format": "mp4",
+            "video_output_resolution": self.resolution,
+            "video_output_fps": float(self.fps),
+            "name": self.name,
+            "video_output_filename": self.output_filename,
+            "skip_rendering": self.skip_rendering,
+            "subtitles": self.subtitles,
+            "video_series_sequential": clips,
+            "audio_overlay": overlays,
+        }
+        if self.description:
+            spec["description"] = self.description
+        if metadata:
+            spec["metadata"] = metadata
+        return spec
+
+    def to_video_edit_create(self) -> VideoEditCreate:
+        """The same edit as SDK objects, for projects.create_edit"""
+        clips = []
+        for clip in self.timeline:
+            start, end = self._times(clip.in_frame, clip.out_frame)
+            clips.append(VideoEditAsset(
+                video_id=clip.asset_id,
+                type=clip.type,
+                video_start_time=start,
+                video_end_time=end,
+                audio_levels=[VideoAudioLevel(audio_level=self.video_audio_level, start_time=start, end_time=end)],
+            ))
+        overlays = []
+        for audio in self.audio:
+            end = frames_to_timestamp(audio.frames, self.fps)
+            overlays.append(VideoEditAudioAsset(
+                audio_id=audio.audio_id,
+                type=audio.type,
+                audio_start_time=ZERO,
+                audio_end_time=end,
+                audio_levels=[VideoAudioLevel(audio_level=audio.level, start_time=ZERO, end_time=end)],
+            ))
+        return VideoEditCreate(
+            name=self.name,
+            description=self.description,
+            video_edit_version="1.0",
+            video_output_format="mp4",
+            video_output_resolution=self.resolution,
+            video_output_fps=float(self.fps),
+            video_output_filename=self.output_filename,
+            skip_rendering=self.skip_rendering,
+            video_series_sequential=clips,
+            audio_overlay=overlays,
+            subtitles=self.subtitles,
+        )
+
+
+def beat_clip_type(video_source: Optional[str]) -> str:
+    """Library videos are referenced as videofiles, everything in the project as assets"""
+    return "videofile" if video_source == "vj_library" else "asset"
+
+
+def clip_shares(total_frames: int, count: int) -> List[int]:
+    """
+    Even split of total_frames between count clips; with fewer frames than clips,
+    only the first total_frames clips get one, so the clips never outrun the audio
+    """
+    return split_evenly(total_frames, min(count, total_frames))
+
+
+class BeatEdit:
+    """
+    An EditSpec laid out from documentary beats, patched one beat at a time
+
+    The voiceover's frames are split evenly between the beats that have a
+    video, in beat order; under a voiceover shorter than one frame per clip
+    the later clips are left out. Swapping a beat's video replaces its clip
+    in place, and a beat gaining or losing its video inserts or removes its
+    clip and re-splits the lengths. Each patch costs time linear in the
+    number of beats, instead of rebuilding the edit.
+    """
+
+    def __init__(self, spec: EditSpec, beat_numbers: List[int], audio_frames: int):
+        self.spec = spec
+        self.audio_frames = audio_frames
+        self._position = {number: i for i, number in enumerate(beat_numbers)}
+        self._order = list(beat_numbers)
+        self._video: Dict[int, Optional[Tuple[str, str]]] = {number: None for number in beat_numbers}
+
+    @classmethod
+    def from_beats(cls, beats_with_assets, voiceover_id: Optional[str], audio_duration: float,
+                   **spec_options) -> "BeatEdit":
+        """
+        Args:
+            beats_with_assets: BeatWithAssets in beat order
+            voiceover_id: Voiceover asset laid over the whole edit, if any
+            audio_duration: Voiceover length in seconds, which the clips fill
+            **spec_options: Passed to EditSpec (name, description, ...)
+        """
+        spec = EditSpec(**spec_options)
+        if voiceover_id:
+            spec.add_audio(voiceover_id, audio_duration)
+        edit = cls(spec, [b.beat.beat_number for b in beats_with_assets],
+                   seconds_to_frames(audio_duration, spec.fps))
+        for b in beats_with_assets:
+            edit._video[b.beat.beat_number] = _beat_video(b)
+        edit._layout()
+        return edit
+
+    @property
+    def clip_count(self) -> int:
+        return len(self.spec.timeline)
+
+    @property
+    def _video_count(self) -> int:
+        return sum(video is not None for video in self._video.values())
+
+    def _clip_index(self, beat_number: int) -> int:
+        """Timeline index of a beat's clip (or where it would go)"""
+        position = self._position[beat_number]
+        return sum(self._video[number] is not None for number in self._order[:position])
+
+    def _layout(self):
+        """Lay out every beat's clip from scratch"""
+        videos = [self._video[number] for number in self._order if self._video[number] is not None]
+        timeline = Timeline(fps=self.spec.fps)
+        for (asset_id, clip_type), frames in zip(videos, clip_shares(self.audio_frames, len(videos))):
+            timeline.append(Clip(asset_id=asset_id, type=clip_type, in_frame=0, out_frame=frames))
+        self.spec.timeline = timeline
+
+    def _rebalance(self):
+        timeline = self.spec.timeline
+        for i, frames in enumerate(clip_shares(self.audio_frames, len(timeline))):
+            if timeline[i].frames != frames:
+                timeline.resize(i, frames)
+
+    def update_beat(self, beat_with_assets):
+        """Bring one beat's clip in line with its (new) video asset"""
+        number = beat_with_assets.beat.beat_number
+        had, has = self._video[number], _beat_video(beat_with_assets)
+        if had == has:
+            return
+        fitted = self._video_count <= self.audio_frames
+        index = self._clip_index(number)
+        self._video[number] = has
+        if not (fitted and self._video_count <= self.audio_frames):
+            # Some clips don't get a frame, so which ones are shown may change
+            self._layout()
+            return
+        timeline = self.spec.timeline
+        asset_id, clip_type = has or had
+        if had and has:
+            timeline.replace(index, timeline[index].model_copy(update={"asset_id": asset_id, "type": clip_type}))
+            return
+        if had:
+            timeline.remove(index)
+        else:
+            # Start at one frame; _rebalance gives it its share of the voiceover
+            timeline.insert(index, Clip(asset_id=asset_id, type=clip_type, in_frame=0, out_frame=1))
+        self._rebalance()
+
+
+def _beat_video(beat_with_assets) -> Optional[Tuple[str, str]]:
+    """(asset id, clip type) of a beat's video, or None without one"""
+    if not beat_with_assets.video_asset_id:
+        return None
+    return beat_with_assets.video_asset_id, beat_clip_type(beat_with_assets.video_source)
+
+
+def voiceover_edit_spec(solved: List[SolvedClip], audio_id: str, audio_seconds: float, name: str = None,
+                        fps: int = FPS, video_audio_level: float = 0.0, skip_rendering: bool = True) -> dict:
+    """The JSON edit spec for solved clips under a voice-over, ready for projects.render_edit"""
+    spec = EditSpec(name=name or f"Voice-over edit {datetime.now().strftime('%Y%m%d_%H%M%S')}", fps=fps,
+                    skip_rendering=skip_rendering, video_audio_level=video_audio_level)
+    for clip in solved:
+        spec.timeline.append(Clip(asset_id=clip.asset_id, type=clip.type, in_frame=clip.in_frame,
+                                  out_frame=clip.out_frame))
+    spec.add_audio(audio_id, audio_seconds)
+    return spec.to_json()
@@ -0,0 +1,116 @@
+"""
+Crash-safe checkpoint journal for long agent runs.
+
+A run that dies half way (a crashed beat, a failed create_edit) used to be
+redone from scratch: new project, new voiceover, new beats and every download
+and upload again. RunJournal appends each completed stage to a per-run JSONL
+file, flushed and fsynced line by line, so a resumed run can pick up exactly
+where the last one stopped:
+
+    journal = RunJournal.open(run_id) if run_id else RunJournal.create()
+    project = journal.get("project")
+    if project is None:
+        ...
+        journal.record("project", {"project_id": project.id})
+
+Entries recorded with a key (e.g. one per beat) are kept per key, the latest
+entry winning. A partially written last line from a crash is ignored.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict
+
+from utils.cache import cache_path
+
+JOURNAL_DIR_ENV = "AGENT_RUN_DIR"
+
+
+def journal_path(run_id: str, directory: str = None) -> str:
+    directory = directory or os.environ.get(JOURNAL_DIR_ENV)
+    if not directory:
+        return cache_path("runs", f"{run_id}.jsonl")
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{run_id}.jsonl")
+
+
+class RunJournal:
+    """Append-only record of the stages a run has finished"""
+
+    def __init__(self, run_id: str, directory: str = None):
+        """
+        Args:
+            run_id: Identifier of the run (the journal's file name)
+            directory: Where journals live (default: AGENT_RUN_DIR or the shared cache dir)
+        """
+        self.run_id = run_id
+        self.path = journal_path(run_id, directory)
+        self._lock = threading.Lock()
+        self.stages: Dict[str, object] = {}
+        self.keyed: Dict[str, Dict[str, object]] = {}
+        if os.path.exists(self.path):
+            self._load()
+
+    @classmethod
+    def create(cls, directory: str = None) -> "RunJournal":
+        run_id = f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        return cls(run_id, directory)
+
+    @classmethod
+    def open(cls, run_id: str, directory: str = None) -> "RunJournal":
+        """Open an existing run's journal"""
+        path = journal_path(run_id, directory)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No journal for run {run_id} at {path}")
+        return cls(run_id, directory)
+
+    def _load(self):
+        with open(self.path, 'rb+') as f:
+            content = f.read()
+            complete = content.rfind(b"\n") + 1
+            if complete < len(content):
+                # A crash mid-write left half a line; drop it so new entries start cleanly
+                print(f"Warning: dropping incomplete last entry of {self.path}")
+                f.truncate(complete)
+        for line_number, line in enumerate(content[:complete].decode().splitlines(), 1):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                print(f"Warning: ignoring unreadable line {line_number} of {self.path}")
+                continue
+            self._apply(entry)
+
+    def _apply(self, entry: dict):
+        if entry.get("key") is None:
+            self.stages[entry["stage"]] = entry["data"]
+        else:
+            self.keyed.setdefault(entry["stage"], {})[str(entry["key"])] = entry["data"]
+
+    def record(self, stage: str, data, key=None):
+        """
+        Durably append a finished stage
+
+        Args:
+            stage: Stage name
+            data: JSON-serialisable result of the stage
+            key: Optional sub-key, for stages that finish piece by piece
+        """
+        entry = {"stage": stage, "key": key, "at": time.time(), "data": data}
+        line = json.dumps(entry, default=str)
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._apply(json.loads(line))
+
+    def get(self, stage: str, default=None):
+        """Data recorded for a stage, or default if it never finished"""
+        return self.stages.get(stage, default)
+
+    def entries(self, stage: str) -> Dict[str, object]:
+        """Latest data for each key recorded under a stage"""
+        return dict(self.keyed.get(stage, {}))
@@ -0,0 +1,238 @@
+"""
+Persistent cache for instructor structured-output calls.
+
+Beat generation, voice-over scripts and the web-search prompt ideas are
+re-generated on every run even when the research and prompts have not
+changed, which makes iterating on the downstream edit logic slow and
+expensive. Clients from utils.clients.instructor_client are wrapped so that
+``create`` calls are answered from disk when the same model, prompt and
+response_model schema were seen before:
+
+    client = instructor_client("openai")
+    beats = client.chat.completions.create(model="o3-mini", messages=..., response_model=VideoBeats)
+
+Pass ``cache=False`` to a call to always hit the model, or ``cache_ttl=``
+to override the default TTL for that call. The cache is bounded by entry
+count and size, evicting the least recently used responses first. Set
+LLM_CACHE=0 to disable it.
+"""
+import atexit
+import hashlib
+import inspect
+import json
+import os
+import threading
+import time
+from typing import Optional
+
+from utils.cache import cache_path
+from utils.cassette import active_cassette
+
+LLM_CACHE_ENV = "LLM_CACHE"
+DEFAULT_TTL = 7 * 24 * 3600
+
+# Arguments that change how instructor retries, not what the model is asked
+_UNKEYED_ARGS = {"response_model", "max_retries", "validation_context", "context", "strict", "hooks"}
+
+
+def _digest(value) -> str:
+    payload = json.dumps(value, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def schema_hash(response_model) -> Optional[str]:
+    """Hash of a response model's JSON schema, or None if it has no schema to key on"""
+    schema = getattr(response_model, "model_json_schema", None)
+    if schema is None:
+        return None
+    return _digest(schema())
+
+
+def request_key(mode: str, kwargs: dict) -> Optional[tuple]:
+    """(key, prompt_hash, schema_hash) for a create call, or None if it cannot be cached"""
+    if kwargs.get("stream"):
+        return None
+    schema = schema_hash(kwargs.get("response_model"))
+    if schema is None:
+        return None
+    prompt = _digest({name: value for name, value in kwargs.items() if name not in _UNKEYED_ARGS})
+    key = _digest([mode, kwargs.get("model"), prompt, schema])
+    return key, prompt, schema
+
+
+class LLMResponseCache:
+    """On-disk LRU cache of structured responses with a TTL"""
+
+    def __init__(self, path: str = None, ttl: float = DEFAULT_TTL, max_entries: int = 500,
+                 max_bytes: int = 20 * 1024 * 1024):
+        """
+        Args:
+            path: Cache file location (default: the shared cache dir)
+            ttl: Default lifetime of a response in seconds
+            max_entries: Most responses kept before evicting the least recently used
+            max_bytes: Most serialised response bytes kept before evicting
+        """
+        self.path = path or cache_path("llm-responses.json")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable LLM response cache {self.path}: {e}")
+        now = time.time()
+        self.entries = {key: entry for key, entry in self.entries.items() if entry["expires"] > now}
+        self._dirty = False
+        atexit.register(self.flush)
+
+    def get(self, key: str):
+        """The cached response data for key, or None if missing or expired"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["expires"] <= time.time():
+                return None
+            # Recency only matters for eviction, so it is written with the next put or at exit
+            entry["used"] = time.time()
+            self._dirty = True
+            return entry["response"]
+
+    def put(self, key: str, model: str, prompt_hash: str, schema: str, response, ttl: float = None):
+        data = response.model_dump(mode="json")
+        now = time.time()
+        with self._lock:
+            self.entries[key] = {
+                "model": model,
+                "prompt_hash": prompt_hash,
+                "schema_hash": schema,
+                "expires": now + (ttl or self.ttl),
+                "used": now,
+                "size": len(json.dumps(data)),
+                "response": data,
+            }
+            self._evict()
+            self._save()
+
+    def clear(self):
+        with self._lock:
+            self.entries = {}
+            self._save()
+
+    def flush(self):
+        """Write recency updates from cache hits to disk"""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+    def _evict(self):
+        now = time.time()
+        for key in [key for key, entry in self.entries.items() if entry["expires"] <= now]:
+            del self.entries[key]
+        by_age = sorted(self.entries, key=lambda key: self.entries[key]["used"])
+        total = sum(entry["size"] for entry in self.entries.values())
+        while by_age and (len(self.entries) > self.max_entries or total > self.max_bytes):
+            total -= self.entries.pop(by_age.pop(0))["size"]
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def wrap(self, client):
+        """Wrap an instructor client so its create calls go through the cache"""
+        if os.environ.get(LLM_CACHE_ENV) == "0":
+            return client
+        return CachedInstructor(client, self)
+
+
+class CachedInstructor:
+    """
+    An instructor client whose create calls are answered from an LLMResponseCache
+
+    Everything other than create (create_with_completion, create_partial, ...)
+    is passed straight through to the wrapped client.
+    """
+
+    def __init__(self, client, cache: LLMResponseCache):
+        self._client = client
+        self._cache = cache
+        self._mode = str(getattr(client, "mode", ""))
+
+    @property
+    def chat(self):
+        return self
+
+    @property
+    def completions(self):
+        return self
+
+    @property
+    def messages(self):
+        return self
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+    def _lookup(self, kwargs, cache: bool):
+        # Recorded runs must see every request, so the cache stays out of the way of cassettes
+        if not cache or active_cassette() is not None:
+            return None, None
+        keys = request_key(self._mode, kwargs)
+        if keys is None:
+            return None, None
+        data = self._cache.get(keys[0])
+        if data is None:
+            self._cache.misses += 1
+            return keys, None
+        self._cache.hits += 1
+        print(f"Using cached {kwargs['response_model'].__name__} response from {kwargs.get('model')}")
+        return keys, kwargs["response_model"].model_validate(data)
+
+    def _store(self, keys, kwargs, response, ttl):
+        if keys is not None and hasattr(response, "model_dump"):
+            self._cache.put(keys[0], kwargs.get("model"), keys[1], keys[2], response, ttl)
+
+    def create(self, *args, cache: bool = True, cache_ttl: float = None, **kwargs):
+        """
+        instructor's create, served from the cache when possible
+
+        Args:
+            cache: Set False to skip the cache for this call
+            cache_ttl: Lifetime of this response in seconds (default: the cache's TTL)
+        """
+        if inspect.iscoroutinefunction(self._client.create):
+            return self._acreate(*args, cache=cache, cache_ttl=cache_ttl, **kwargs)
+        keys, cached = self._lookup(kwargs, cache and not args)
+        if cached is not None:
+            return cached
+        response = self._client.create(*args, **kwargs)
+        self._store(keys, kwargs, response, cache_ttl)
+        return response
+
+    async def _acreate(self, *args, cache: bool = True, cache_ttl: float = None, **kwargs):
+        keys, cached = self._lookup(kwargs, cache and not args)
+        if cached is not None:
+            return cached
+        response = await self._client.create(*args, **kwargs)
+        self._store(keys, kwargs, response, cache_ttl)
+        return response
+
+
+_llm_cache = None
+_llm_cache_lock = threading.Lock()
+
+
+def default_llm_cache() -> LLMResponseCache:
+    """The process-wide LLM response cache"""
+    global _llm_cache
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache()
+        return _llm_cache
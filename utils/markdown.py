@@ -0,0 +1,120 @@
+"""
+Streaming section parser for markdown research documents.
+
+Deep-research dumps can run to several megabytes. iter_sections reads a file
+line by line and yields one Section per heading, with the byte offsets of
+the heading and its body, so a document can be indexed in constant memory
+and any single section read back later by seeking to its offsets:
+
+    for section in iter_sections("research.md", policy=H2):
+        print(section.heading, len(section.content))
+
+    index = list(iter_sections("research.md", policy=ANY_HEADING, lazy=True))
+    text = index[3].read()
+
+Two heading policies are supported: H2 splits only at "## " headings, leaving
+deeper headings inside the section body, and ANY_HEADING splits at every
+heading from "#" to "######". Text before the first heading is not part of any
+section, and lines inside fenced code blocks are never treated as headings.
+"""
+import re
+from typing import Iterable, Iterator, Optional
+
+from pydantic import BaseModel
+
+H2 = "h2"
+ANY_HEADING = "any"
+POLICIES = (H2, ANY_HEADING)
+
+HEADING = re.compile(r'^(#{1,6})[ \t]+(\S.*?)\s*$')
+FENCE = re.compile(r'^\s*(```|~~~)')
+
+
+class Section(BaseModel):
+    path: str
+    heading: str
+    level: int
+    start: int  # byte offset of the heading line
+    body_start: int  # byte offset just after the heading line
+    end: int  # byte offset just after the section body
+    content: Optional[str] = None  # None until read when parsed lazily
+
+    def read(self) -> str:
+        """The section body, stripped, read from the file by offset if it was parsed lazily"""
+        if self.content is None:
+            return read_range(self.path, self.body_start, self.end).strip()
+        return self.content
+
+
+def read_range(path: str, start: int, end: int) -> str:
+    """Decode bytes [start, end) of a file"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return f.read(end - start).decode('utf-8', errors='replace')
+
+
+def _heading(line: str, policy: str):
+    match = HEADING.match(line)
+    if match is None:
+        return None
+    level = len(match.group(1))
+    if policy == H2 and level != 2:
+        return None
+    return level, match.group(2)
+
+
+def iter_sections(path: str, policy: str = H2, lazy: bool = False,
+                  skip_headings: Iterable[str] = ()) -> Iterator[Section]:
+    """
+    Yield the sections of a markdown file in order, reading it line by line
+
+    Args:
+        path: Markdown file to parse
+        policy: H2 to split at "## " headings only, ANY_HEADING to split at every heading
+        lazy: Leave content unset (read it later with Section.read) so memory stays constant
+        skip_headings: Headings to leave out, compared case-insensitively (e.g. "references")
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown heading policy: {policy}")
+    skipped = {heading.lower() for heading in skip_headings}
+    current = None
+    body = []
+    offset = 0
+    in_fence = False
+
+    def finish(end: int):
+        current.end = end
+        if not lazy:
+            current.content = "".join(body).strip()
+        return current
+
+    with open(path, 'rb') as f:
+        for raw in f:
+            line = raw.decode('utf-8', errors='replace')
+            heading = None
+            if FENCE.match(line):
+                in_fence = not in_fence
+            elif not in_fence:
+                heading = _heading(line.rstrip('\r\n'), policy)
+
+            if heading is not None:
+                if current is not None and current.heading.lower() not in skipped:
+                    yield finish(offset)
+                level, text = heading
+                current = Section(path=path, heading=text, level=level, start=offset,
+                                  body_start=offset + len(raw), end=offset + len(raw))
+                body = []
+            elif current is not None and not lazy:
+                body.append(line)
+            offset += len(raw)
+
+    if current is not None and current.heading.lower() not in skipped:
+        yield finish(offset)
+
+
+def find_section(path: str, heading: str, policy: str = H2) -> Optional[Section]:
+    """The first section with the given heading, located without loading the other sections"""
+    for section in iter_sections(path, policy=policy, lazy=True):
+        if section.heading.lower() == heading.lower():
+            return section
+    return None
@@ -0,0 +1,209 @@
+"""
+Memoising cache for idempotent MCP tool calls.
+
+The edit agents call the same read-only tools (get-project-assets,
+search-remote-videos, ...) many times within a run and across runs. The cache
+sits in front of each pooled server as its ``process_tool_call`` hook: results
+of read-only tools are stored on disk by tool name and normalised arguments
+with a per-tool TTL, identical calls in flight at the same time share one
+request, and any mutating tool (update-video-edit, generate-edit-from-videos,
+...) drops everything cached for that server. Changes made to a project
+outside MCP, through the SDK, drop that project's entries:
+
+    invalidate_project(project_id)
+
+Which tools are cacheable, and for how long, is declared per server in
+utils.mcp_servers. Set MCP_TOOL_CACHE=0 to disable the cache.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterable
+
+from utils.cache import cache_path
+from utils.cassette import active_cassette
+
+TOOL_CACHE_ENV = "MCP_TOOL_CACHE"
+PROJECT_SERVER = "video-editor"
+
+
+def _normalise(value):
+    """Arguments in a canonical form: None values dropped, strings stripped"""
+    if isinstance(value, dict):
+        return {key: _normalise(item) for key, item in value.items() if item is not None}
+    if isinstance(value, (list, tuple)):
+        return [_normalise(item) for item in value]
+    if isinstance(value, str):
+        return value.strip()
+    return value
+
+
+def call_key(server: str, tool_name: str, arguments: dict) -> str:
+    payload = json.dumps([server, tool_name, _normalise(arguments or {})], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class MCPToolCache:
+    """On-disk TTL cache of MCP tool results, shared by every pooled server"""
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path: Cache file location (default: the shared cache dir)
+        """
+        self.path = path or cache_path("mcp-tool-cache.json")
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable MCP tool cache {self.path}: {e}")
+        now = time.time()
+        self.entries = {key: entry for key, entry in self.entries.items() if entry["expires"] > now}
+
+    def get(self, key: str):
+        """The cached entry for key, or None if missing or expired"""
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["expires"] <= time.time():
+                return None
+            return entry
+
+    def put(self, key: str, server: str, tool_name: str, result, ttl: float, arguments: dict = None):
+        try:
+            json.dumps(result)
+        except (TypeError, ValueError):
+            return  # binary content is not worth caching
+        with self._lock:
+            self.entries[key] = {
+                "server": server,
+                "tool": tool_name,
+                "args": _normalise(arguments or {}),
+                "expires": time.time() + ttl,
+                "result": result,
+            }
+            self._save()
+
+    def invalidate(self, server: str = None, tools: Iterable[str] = None, arguments: dict = None):
+        """
+        Drop cached results for a server (or every server)
+
+        Args:
+            server: Server whose results to drop (default: every server)
+            tools: Only drop results of these tools
+            arguments: Only drop results of calls made with these argument values
+        """
+        tools = set(tools) if tools is not None else None
+        wanted = _normalise(arguments or {})
+
+        def called_with(entry):
+            # Entries cached before arguments were stored can't be told apart, so they go too
+            args = entry.get("args")
+            return args is None or all(args.get(name) == value for name, value in wanted.items())
+
+        with self._lock:
+            stale = [
+                key for key, entry in self.entries.items()
+                if (server is None or entry["server"] == server)
+                and (tools is None or entry["tool"] in tools)
+                and called_with(entry)
+            ]
+            for key in stale:
+                del self.entries[key]
+            if stale:
+                self._save()
+        return len(stale)
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+    def hook(self, server: str, cache_ttls: Dict[str, float], mutating_tools: Iterable[str] = (), previous=None):
+        """
+        Build a process_tool_call hook for one server
+
+        Args:
+            server: Name the server's entries are stored under
+            cache_ttls: TTL in seconds for each read-only tool that may be cached
+            mutating_tools: Tools whose calls invalidate the server's cached results
+            previous: An existing process_tool_call hook to call through to on a miss
+        """
+        mutating_tools = set(mutating_tools)
+
+        async def process_tool_call(ctx, call_tool, tool_name, args):
+            async def call():
+                if previous is not None:
+                    return await previous(ctx, call_tool, tool_name, args)
+                return await call_tool(tool_name, args, None)
+
+            if tool_name in mutating_tools:
+                try:
+                    return await call()
+                finally:
+                    dropped = self.invalidate(server)
+                    if dropped:
+                        print(f"{tool_name} invalidated {dropped} cached {server} result(s)")
+
+            ttl = cache_ttls.get(tool_name)
+            # Recorded runs must see every call, so the cache stays out of the way of cassettes
+            if not ttl or active_cassette() is not None:
+                return await call()
+
+            key = call_key(server, tool_name, args)
+            entry = self.get(key)
+            if entry is not None:
+                self.hits += 1
+                return entry["result"]
+
+            if key in self._in_flight:
+                self.hits += 1
+                return await asyncio.shield(self._in_flight[key])
+
+            self.misses += 1
+            future = asyncio.ensure_future(call())
+            self._in_flight[key] = future
+            try:
+                result = await asyncio.shield(future)
+            finally:
+                self._in_flight.pop(key, None)
+            self.put(key, server, tool_name, result, ttl, arguments=args)
+            return result
+
+        return process_tool_call
+
+    def attach(self, mcp_server, server: str, cache_ttls: Dict[str, float], mutating_tools: Iterable[str] = ()):
+        """Install the cache in front of mcp_server, keeping any hook it already has"""
+        if os.environ.get(TOOL_CACHE_ENV) == "0" or not (cache_ttls or mutating_tools):
+            return mcp_server
+        mcp_server.process_tool_call = self.hook(
+            server, cache_ttls, mutating_tools, previous=mcp_server.process_tool_call,
+        )
+        return mcp_server
+
+
+_tool_cache = None
+_tool_cache_lock = threading.Lock()
+
+
+def default_tool_cache() -> MCPToolCache:
+    """The process-wide MCP tool cache"""
+    global _tool_cache
+    with _tool_cache_lock:
+        if _tool_cache is None:
+            _tool_cache = MCPToolCache()
+        return _tool_cache
+
+
+def invalidate_project(project_id: str) -> int:
+    """Drop cached results about a project after changing it through the SDK (uploads, new edits)"""
+    return default_tool_cache().invalidate(PROJECT_SERVER, arguments={"project_id": project_id})
@@ -0,0 +1,281 @@
+"""
+Process-wide pool of warm MCP servers.
+
+Every ``agent.run_mcp_servers()`` context used to spawn its own uvx
+subprocesses. The pool hands out one shared server object per name and keeps
+it running for as long as the pool is entered, so agents (including ones
+created per beat or per retry) only bump a reference count instead of
+spawning and re-initialising a server:
+
+    vj_server = mcp_pool.get("video-editor")
+    agent = Agent(..., mcp_servers=[vj_server])
+
+    async def async_main():
+        async with agent.run_mcp_servers():   # no spawn, just a refcount
+            ...
+
+    asyncio.run(mcp_pool.run(async_main()))
+
+Servers can also be kept alive between CLI invocations with the daemon:
+
+    uv run python -m utils.mcp_pool serve
+
+While it runs, the pool connects to the daemon over SSE instead of spawning
+anything. Set MCP_DAEMON=0 to ignore a running daemon.
+
+Read-only tool results are memoised by utils.mcp_cache. Server versions
+are pinned in utils.mcp_servers; run ``warmup`` once to install them so no
+launch has to resolve packages:
+
+    uv run python -m utils.mcp_pool warmup
+"""
+import asyncio
+import json
+import os
+import signal
+import time
+
+import anyio
+import click
+from pydantic_ai.mcp import MCPServer, MCPServerSSE
+
+from utils.cache import cache_path
+from utils.cassette import wrap_mcp_server
+from utils.mcp_cache import default_tool_cache
+from utils.mcp_servers import MCP_SERVERS
+from utils.profiling import tool_profiler_hook
+
+DAEMON_ENV = "MCP_DAEMON"
+DAEMON_PORT = 8765
+
+
+SERVER_DEFINITIONS = {name: spec.build for name, spec in MCP_SERVERS.items()}
+
+
+def _daemon_state_path() -> str:
+    return cache_path("mcp-daemon.json")
+
+
+def _read_daemon_state():
+    """Return the running daemon's state, or None if there is no live daemon"""
+    path = _daemon_state_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, 'r') as f:
+            state = json.load(f)
+        os.kill(state["pid"], 0)
+        return state
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _session(server: MCPServer):
+    """The live ClientSession behind a server, looking through cassette wrappers"""
+    inner = getattr(server, "server", server)
+    return getattr(inner, "_client", None) if inner.is_running else None
+
+
+class MCPServerPool:
+    """Starts each MCP server once and shares it across Agent instances"""
+
+    def __init__(self, definitions=None, health_timeout=5.0):
+        """
+        Args:
+            definitions: Map of server name to a zero-argument factory
+            health_timeout: Seconds to wait for a ping before a server is considered unhealthy
+        """
+        self.definitions = definitions or SERVER_DEFINITIONS
+        self.health_timeout = health_timeout
+        self._servers = {}
+        self._held = set()
+
+    def get(self, name: str) -> MCPServer:
+        """The shared server for name, created on first use"""
+        if name not in self._servers:
+            server = wrap_mcp_server(self._daemon_server(name) or self.definitions[name](), name)
+            spec = MCP_SERVERS.get(name)
+            if spec is not None:
+                default_tool_cache().attach(server, name, spec.cache_ttls, spec.mutating_tools)
+            # Outermost, so profiles show cache hits as the fast calls they are
+            server.process_tool_call = tool_profiler_hook(name, previous=server.process_tool_call)
+            self._servers[name] = server
+        return self._servers[name]
+
+    def _daemon_server(self, name: str):
+        if os.environ.get(DAEMON_ENV) == "0":
+            return None
+        state = _read_daemon_state()
+        if not state or name not in state["servers"]:
+            return None
+        print(f"Using MCP daemon for {name}")
+        return MCPServerSSE(url=state["servers"][name], timeout=30)
+
+    async def healthy(self, name: str) -> bool:
+        """Ping a running server"""
+        server = self._servers.get(name)
+        if server is None or not server.is_running:
+            return False
+        session = _session(server)
+        if session is None:
+            return True  # replayed from a cassette
+        try:
+            with anyio.fail_after(self.health_timeout):
+                await session.send_ping()
+            return True
+        except Exception:
+            return False
+
+    async def start(self, *names: str):
+        """
+        Start (or health-check) servers and hold them open until close()
+
+        Must be awaited from the task that will later call close(), since
+        the stdio transport is bound to the task that opened it.
+        """
+        for name in names or list(self._servers):
+            server = self.get(name)
+            if name in self._held:
+                if await self.healthy(name):
+                    continue
+                if server._running_count > 1:
+                    print(f"MCP server {name} failed its health check but is in use; leaving it running")
+                    continue
+                print(f"MCP server {name} failed its health check, restarting")
+                self._held.discard(name)
+                await server.__aexit__(None, None, None)
+
+            started = time.perf_counter()
+            await server.__aenter__()
+            self._held.add(name)
+            print(f"MCP server {name} ready in {time.perf_counter() - started:.1f}s")
+
+    async def close(self):
+        """Release every server the pool is holding"""
+        for name in list(self._held):
+            self._held.discard(name)
+            await self._servers[name].__aexit__(None, None, None)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+    async def run(self, coro):
+        """Await coro with every requested server warm for its whole duration"""
+        async with self:
+            return await coro
+
+
+mcp_pool = MCPServerPool()
+
+
+# Daemon mode: keep the stdio servers warm between CLI invocations and
+# expose each one over SSE on localhost.
+
+def _proxy_app(name: str, upstream: MCPServer):
+    from mcp.server.lowlevel import Server
+    from mcp.server.sse import SseServerTransport
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Mount, Route
+
+    proxy = Server(name)
+
+    @proxy.list_tools()
+    async def list_tools():
+        return (await upstream._client.list_tools()).tools
+
+    @proxy.call_tool()
+    async def call_tool(tool_name, arguments):
+        result = await upstream._client.call_tool(tool_name, arguments)
+        if result.isError:
+            raise RuntimeError("\n".join(getattr(part, "text", str(part)) for part in result.content))
+        return result.content
+
+    sse = SseServerTransport("/messages/")
+
+    async def handle_sse(request):
+        async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
+            await proxy.run(streams[0], streams[1], proxy.create_initialization_options())
+        return Response()
+
+    return Starlette(routes=[
+        Route("/sse", endpoint=handle_sse, methods=["GET"]),
+        Mount("/messages/", app=sse.handle_post_message),
+    ])
+
+
+async def serve(names, host: str = "127.0.0.1", port: int = DAEMON_PORT):
+    """Run the MCP daemon until interrupted"""
+    import uvicorn
+    from starlette.applications import Starlette
+    from starlette.routing import Mount
+
+    os.environ[DAEMON_ENV] = "0"  # the daemon itself must spawn the real servers
+    pool = MCPServerPool()
+    async with pool:
+        await pool.start(*names)
+        app = Starlette(routes=[Mount(f"/{name}", app=_proxy_app(name, pool.get(name))) for name in names])
+        state = {
+            "pid": os.getpid(),
+            "servers": {name: f"http://{host}:{port}/{name}/sse" for name in names},
+        }
+        with open(_daemon_state_path(), 'w') as f:
+            json.dump(state, f, indent=2)
+        print(f"MCP daemon serving {', '.join(names)} on http://{host}:{port}")
+        try:
+            await uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning")).serve()
+        finally:
+            if os.path.exists(_daemon_state_path()):
+                os.remove(_daemon_state_path())
+
+
+@click.group()
+def cli():
+    """Manage the shared MCP server daemon."""
+
+
+@cli.command("serve")
+@click.argument('names', nargs=-1)
+@click.option('--port', '-p', default=DAEMON_PORT, help='Port to serve the SSE endpoints on')
+def serve_command(names, port):
+    """Start the daemon (all known servers unless NAMES are given)."""
+    asyncio.run(serve(list(names) or list(SERVER_DEFINITIONS), port=port))
+
+
+@cli.command("status")
+def status_command():
+    """Show whether a daemon is running and what it serves."""
+    state = _read_daemon_state()
+    if not state:
+        print("No MCP daemon running")
+        return
+    print(f"MCP daemon running (pid {state['pid']})")
+    for name, url in state["servers"].items():
+        print(f"  {name}: {url}")
+
+
+@cli.command("stop")
+def stop_command():
+    """Stop a running daemon."""
+    state = _read_daemon_state()
+    if not state:
+        print("No MCP daemon running")
+        return
+    os.kill(state["pid"], signal.SIGTERM)
+    print(f"Stopped MCP daemon (pid {state['pid']})")
+
+
+@cli.command("warmup")
+@click.argument('names', nargs=-1)
+def warmup_command(names):
+    """Install the pinned server packages (all known servers unless NAMES are given)."""
+    failed = [name for name in names or MCP_SERVERS if not MCP_SERVERS[name].warmup()]
+    if failed:
+        raise click.ClickException(f"Could not warm up: {', '.join(failed)}")
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,161 @@
+"""
+Central registry of the MCP servers the agents use, with pinned versions.
+
+Launching through ``uvx pkg@latest`` re-resolves the package on every start.
+Each server here is pinned to an exact version and Python, and ``warmup``
+installs it once into a dedicated uv tool directory inside the agent cache:
+
+    uv run python -m utils.mcp_pool warmup
+
+After that, servers are launched by running the installed executable
+directly, with no resolution or network check. Without a warmup they fall
+back to a pinned ``uvx`` launch.
+"""
+import os
+import re
+import shutil
+import subprocess
+from dataclasses import dataclass, field
+from typing import Dict, List
+
+from pydantic_ai.mcp import MCPServerStdio
+
+from utils.cache import cache_path
+
+PYTHON_VERSION = "3.11"
+
+
+def _tool_dir() -> str:
+    return cache_path("mcp-tools", "tools")
+
+
+def _tool_bin_dir() -> str:
+    return cache_path("mcp-tools", "bin")
+
+
+@dataclass
+class MCPServerSpec:
+    """A pinned MCP server package and how to launch it"""
+    name: str
+    package: str
+    version: str
+    command: str
+    env_keys: List[str] = field(default_factory=list)
+    timeout: float = 30
+    # Read-only tools whose results may be memoised, with their TTL in seconds
+    cache_ttls: Dict[str, float] = field(default_factory=dict)
+    # Tools that change server state and invalidate this server's cached results
+    mutating_tools: List[str] = field(default_factory=list)
+
+    @property
+    def requirement(self) -> str:
+        return f"{self.package}=={self.version}"
+
+    @property
+    def _environment_path(self) -> str:
+        # uv names tool environments after the normalised package name
+        return os.path.join(_tool_dir(), re.sub(r"[-_.]+", "-", self.package).lower())
+
+    @property
+    def _marker_path(self) -> str:
+        return os.path.join(self._environment_path, ".pinned")
+
+    def installed_executable(self):
+        """Path to the warmed-up executable, or None if it needs a warmup"""
+        bin_name = "Scripts" if os.name == "nt" else "bin"
+        executable = os.path.join(self._environment_path, bin_name, self.command)
+        if os.name == "nt":
+            executable += ".exe"
+        try:
+            with open(self._marker_path, 'r') as f:
+                pinned = f.read().strip()
+        except OSError:
+            return None
+        if pinned != self.requirement or not os.path.exists(executable):
+            return None
+        return executable
+
+    def build(self) -> MCPServerStdio:
+        """Create the stdio server, preferring the pre-built environment"""
+        executable = self.installed_executable()
+        if executable:
+            command, args = executable, []
+        else:
+            print(f"MCP server {self.name} is not warmed up; launching through uvx "
+                  f"(run `python -m utils.mcp_pool warmup` to skip resolution)")
+            command = 'uvx'
+            args = [
+                '--python', PYTHON_VERSION,
+                '--from', self.requirement,
+                self.command,
+            ]
+        return MCPServerStdio(
+            command,
+            args=args,
+            env={key: os.environ[key] for key in self.env_keys},
+            timeout=self.timeout,
+        )
+
+    def warmup(self) -> bool:
+        """Install the pinned package into the agent's tool directory"""
+        uv = shutil.which("uv")
+        if uv is None:
+            print("uv is not installed; cannot warm up MCP servers")
+            return False
+        if self.installed_executable():
+            print(f"{self.name}: {self.requirement} already installed")
+            return True
+
+        print(f"{self.name}: installing {self.requirement} (Python {PYTHON_VERSION})...")
+        env = dict(os.environ, UV_TOOL_DIR=_tool_dir(), UV_TOOL_BIN_DIR=_tool_bin_dir())
+        result = subprocess.run(
+            [uv, 'tool', 'install', '--force', '--python', PYTHON_VERSION, self.requirement],
+            env=env, capture_output=True, text=True,
+        )
+        if result.returncode != 0:
+            print(f"{self.name}: install failed: {result.stderr.strip()[-500:]}")
+            return False
+        with open(self._marker_path, 'w') as f:
+            f.write(self.requirement)
+        print(f"{self.name}: ready at {self.installed_executable()}")
+        return True
+
+
+MCP_SERVERS = {
+    "video-editor": MCPServerSpec(
+        name="video-editor",
+        package="video_editor_mcp",
+        version="0.1.36",
+        command="video-editor-mcp",
+        env_keys=["VJ_API_KEY"],
+        cache_ttls={
+            "get-project-assets": 60,
+            "search-remote-videos": 6 * 3600,
+            "search-local-videos": 3600,
+        },
+        mutating_tools=[
+            "add-video",
+            "create-videojungle-project",
+            "generate-edit-from-videos",
+            "generate-edit-from-single-video",
+            "update-video-edit",
+            "edit-locally",
+            "generate-local-search",
+            "create-video-bar-chart-from-two-axis-data",
+            "create-video-line-chart-from-two-axis-data",
+        ],
+    ),
+    "serper": MCPServerSpec(
+        name="serper",
+        package="serper-mcp-server",
+        version="0.0.4",
+        command="serper-mcp-server",
+        env_keys=["SERPER_API_KEY"],
+        cache_ttls={
+            "google_search": 24 * 3600,
+            "google_search_videos": 24 * 3600,
+            "google_search_news": 3600,
+            "webpage_scrape": 24 * 3600,
+        },
+    ),
+}
@@ -0,0 +1,276 @@
+"""
+Per-run performance profiles for pydantic_ai agents.
+
+profiled_run is a drop-in replacement for ``agent.run`` that drives the run
+with ``agent.iter`` and records every model request (latency and tokens) and
+every MCP tool call (latency and payload size). When the run finishes it
+prints a summary and writes a JSON report to ./profiles, so request limits
+and prompts can be tuned from data:
+
+    result = await profiled_run(edit_agent, prompt, name="edit", usage_limits=UsageLimits(request_limit=8))
+
+Tool calls are captured by a process_tool_call hook that every pooled MCP
+server carries (see utils.mcp_pool); it only records while a profiled run is
+active in the current task. Set AGENT_PROFILE=0 to skip profiling.
+
+Pass on_output to act on structured output while the model is still
+streaming it (see utils.streaming).
+"""
+import json
+import os
+import time
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+
+from pydantic_ai import Agent
+from pydantic_ai.messages import (
+    FinalResultEvent, PartDeltaEvent, PartStartEvent, ToolCallPart, ToolCallPartDelta,
+)
+from pydantic_core import from_json, to_jsonable_python
+
+PROFILE_ENV = "AGENT_PROFILE"
+PROFILE_DIR_ENV = "AGENT_PROFILE_DIR"
+
+_current_profile: ContextVar[Optional["RunProfile"]] = ContextVar("agent_run_profile", default=None)
+
+
+def _payload_size(value) -> int:
+    try:
+        return len(json.dumps(to_jsonable_python(value, bytes_mode='base64'), default=str))
+    except Exception:
+        return len(str(value))
+
+
+class RunProfile:
+    """Timings collected during one agent run"""
+
+    def __init__(self, name: str, request_limit: Optional[int] = None):
+        self.name = name
+        self.request_limit = request_limit
+        self.started_at = datetime.now()
+        self._origin = time.perf_counter()
+        self.steps = []
+        self.tool_calls = []
+        self.wall_time = None
+
+    def _offset(self, t: float) -> float:
+        return round(t - self._origin, 4)
+
+    def record_model_request(self, started: float, ended: float, response):
+        usage = response.usage
+        self.steps.append({
+            "kind": "model",
+            "model": response.model_name,
+            "start": self._offset(started),
+            "duration": round(ended - started, 4),
+            "request_tokens": usage.request_tokens or 0,
+            "response_tokens": usage.response_tokens or 0,
+            "tools_requested": [part.tool_name for part in response.parts if isinstance(part, ToolCallPart)],
+        })
+
+    def record_tool_step(self, started: float, ended: float):
+        self.steps.append({
+            "kind": "tools",
+            "start": self._offset(started),
+            "duration": round(ended - started, 4),
+        })
+
+    def record_tool_call(self, server: str, tool_name: str, started: float, ended: float,
+                         args_size: int, result_size: int, error: Optional[str] = None):
+        self.tool_calls.append({
+            "server": server,
+            "tool": tool_name,
+            "start": self._offset(started),
+            "duration": round(ended - started, 4),
+            "args_bytes": args_size,
+            "result_bytes": result_size,
+            "error": error,
+        })
+
+    def critical_path(self):
+        """
+        The chain of work the run waited on
+
+        Model requests are strictly sequential; within a tool step the
+        calls run in parallel, so only the slowest one is on the path.
+        """
+        path = []
+        for step in self.steps:
+            if step["kind"] == "model":
+                path.append({"kind": "model", "name": step["model"], "duration": step["duration"]})
+                continue
+            end = step["start"] + step["duration"]
+            calls = [call for call in self.tool_calls if step["start"] <= call["start"] <= end]
+            if calls:
+                slowest = max(calls, key=lambda call: call["duration"])
+                path.append({"kind": "tool", "name": slowest["tool"], "duration": slowest["duration"],
+                             "parallel_calls": len(calls)})
+            elif step["duration"] >= 0.001:
+                path.append({"kind": "tools", "name": "local", "duration": step["duration"]})
+        return path
+
+    def tool_stats(self):
+        stats = {}
+        for call in self.tool_calls:
+            entry = stats.setdefault(call["tool"], {
+                "calls": 0, "total_time": 0.0, "max_time": 0.0, "result_bytes": 0, "errors": 0,
+            })
+            entry["calls"] += 1
+            entry["total_time"] = round(entry["total_time"] + call["duration"], 4)
+            entry["max_time"] = max(entry["max_time"], call["duration"])
+            entry["result_bytes"] += call["result_bytes"]
+            entry["errors"] += call["error"] is not None
+        return dict(sorted(stats.items(), key=lambda item: item[1]["total_time"], reverse=True))
+
+    def report(self) -> dict:
+        model_steps = [step for step in self.steps if step["kind"] == "model"]
+        return {
+            "name": self.name,
+            "started_at": self.started_at.isoformat(),
+            "wall_time": self.wall_time,
+            "requests": len(model_steps),
+            "request_limit": self.request_limit,
+            "model_time": round(sum(step["duration"] for step in model_steps), 4),
+            "request_tokens": sum(step["request_tokens"] for step in model_steps),
+            "response_tokens": sum(step["response_tokens"] for step in model_steps),
+            "tool_time": round(sum(call["duration"] for call in self.tool_calls), 4),
+            "tools": self.tool_stats(),
+            "critical_path": self.critical_path(),
+            "steps": self.steps,
+            "tool_calls": self.tool_calls,
+        }
+
+    def summary(self) -> str:
+        report = self.report()
+        limit = f"/{report['request_limit']}" if report["request_limit"] else ""
+        lines = [
+            f"Profile '{self.name}': {report['wall_time']:.1f}s wall time",
+            f"  Model: {report['requests']}{limit} requests, {report['model_time']:.1f}s, "
+            f"{report['request_tokens']:,} in / {report['response_tokens']:,} out tokens",
+            f"  Tools: {len(self.tool_calls)} calls, {report['tool_time']:.1f}s",
+        ]
+        for tool, stats in list(report["tools"].items())[:5]:
+            errors = f", {stats['errors']} errors" if stats["errors"] else ""
+            lines.append(f"    {tool}: {stats['calls']}x, {stats['total_time']:.1f}s total, "
+                         f"max {stats['max_time']:.1f}s, {stats['result_bytes'] / 1024:.1f} KB returned{errors}")
+        path = " -> ".join(f"{item['name']} {item['duration']:.1f}s" for item in report["critical_path"])
+        lines.append(f"  Critical path: {path}")
+        return "\n".join(lines)
+
+    def write(self, directory: str = None) -> str:
+        directory = directory or os.environ.get(PROFILE_DIR_ENV) or "profiles"
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.name}_{self.started_at.strftime('%Y%m%d_%H%M%S_%f')}.json")
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+        return path
+
+
+async def _stream_outputs(node, ctx, on_output):
+    """Pass the arguments of the output tool call to on_output as they stream in"""
+    async with node.stream(ctx) as request_stream:
+        args, output_index = {}, None
+        async for event in request_stream:
+            if isinstance(event, PartStartEvent) and isinstance(event.part, ToolCallPart):
+                args[event.index] = event.part.args or ""
+            elif isinstance(event, PartDeltaEvent) and isinstance(event.delta, ToolCallPartDelta):
+                delta = event.delta.args_delta
+                if isinstance(delta, str) and isinstance(args.get(event.index), str):
+                    args[event.index] += delta
+                elif delta is not None:
+                    args[event.index] = delta
+            elif isinstance(event, FinalResultEvent) and event.tool_name is not None:
+                output_index = max(args)  # emitted right after the output tool call starts
+            else:
+                continue
+            if output_index is None or getattr(event, "index", output_index) != output_index:
+                continue
+            data = args[output_index]
+            if isinstance(data, str):
+                try:
+                    data = from_json(data, allow_partial=True) if data else {}
+                except ValueError:
+                    continue
+            if isinstance(data, dict):
+                await on_output(data, final=False)
+
+
+async def profiled_run(agent: Agent, user_prompt, name: str = None, on_output=None, **kwargs):
+    """
+    Run an agent like agent.run, recording a performance profile
+
+    Args:
+        agent: The agent to run
+        user_prompt: Prompt passed to the agent
+        name: Label for the report (default: the agent's name, or "agent")
+        on_output: Optional async callback, called as on_output(data, final=False) with the partially
+            parsed output arguments (a dict) while they stream in, then with the validated output and final=True
+        **kwargs: Passed through to agent.iter (usage_limits, message_history, ...)
+
+    Returns:
+        The AgentRunResult, exactly as agent.run would return it
+    """
+    profiling = os.environ.get(PROFILE_ENV) != "0"
+    if not profiling and on_output is None:
+        return await agent.run(user_prompt, **kwargs)
+
+    kwargs.setdefault("infer_name", False)  # inference would only ever see our own frame
+    usage_limits = kwargs.get("usage_limits")
+    profile = RunProfile(name or agent.name or "agent", getattr(usage_limits, "request_limit", None))
+    token = _current_profile.set(profile)
+    try:
+        async with agent.iter(user_prompt, **kwargs) as agent_run:
+            previous, started = None, time.perf_counter()
+            async for node in agent_run:
+                now = time.perf_counter()
+                # A node is yielded before it runs, so it finishes when its successor appears
+                if Agent.is_model_request_node(previous) and Agent.is_call_tools_node(node):
+                    profile.record_model_request(started, now, node.model_response)
+                elif Agent.is_call_tools_node(previous):
+                    profile.record_tool_step(started, now)
+                previous, started = node, now
+                if on_output is not None and Agent.is_model_request_node(node):
+                    await _stream_outputs(node, agent_run.ctx, on_output)
+        result = agent_run.result
+    finally:
+        _current_profile.reset(token)
+        if profiling:
+            profile.wall_time = round(time.perf_counter() - profile._origin, 4)
+            print(profile.summary())
+            print(f"  Profile written to {profile.write()}")
+    if on_output is not None:
+        await on_output(result.output, final=True)
+    return result
+
+
+def tool_profiler_hook(server: str, previous=None):
+    """
+    A process_tool_call hook that times calls into the active profile
+
+    Args:
+        server: Server name recorded with each call
+        previous: An existing process_tool_call hook to call through to
+    """
+    async def process_tool_call(ctx, call_tool, tool_name, args):
+        async def call():
+            if previous is not None:
+                return await previous(ctx, call_tool, tool_name, args)
+            return await call_tool(tool_name, args, None)
+
+        profile = _current_profile.get()
+        if profile is None:
+            return await call()
+
+        started = time.perf_counter()
+        try:
+            result = await call()
+        except Exception as e:
+            profile.record_tool_call(server, tool_name, started, time.perf_counter(),
+                                     _payload_size(args), 0, error=f"{type(e).__name__}: {str(e)[:200]}")
+            raise
+        profile.record_tool_call(server, tool_name, started, time.perf_counter(),
+                                 _payload_size(args), _payload_size(result))
+        return result
+
+    return process_tool_call
@@ -0,0 +1,261 @@
+"""
+Render retrieval for Video Jungle edits.
+
+Replaces ApiClient.edits.download_edit_render, which polls blindly and then
+streams the file in a single attempt. RenderDownloader polls the render with
+backoff under an overall deadline, streams the result to a ``.part`` file in
+chunks, resumes with HTTP range requests after a dropped connection (only
+when the ``.part`` came from the same URL, guarded by If-Range), verifies
+size and checksum, and reports throughput as it goes.
+"""
+import hashlib
+import json
+import os
+import random
+import re
+import time
+
+import requests
+
+from utils.cassette import active_cassette
+
+
+class RenderError(Exception):
+    """Raised when a render fails, times out or cannot be downloaded"""
+
+
+class RenderDownloader:
+    """Waits for an edit render and downloads it resumably"""
+
+    def __init__(self, client, poll_interval=1.0, max_poll_interval=15.0, render_timeout=1800,
+                 chunk_size=1 << 20, max_retries=8, read_timeout=60, progress_interval=2.0):
+        """
+        Args:
+            client: Video Jungle ApiClient (a PooledApiClient's session is reused)
+            poll_interval: First delay between render status checks, in seconds
+            max_poll_interval: Upper bound for the backed-off poll delay
+            render_timeout: Give up waiting for the render after this many seconds
+            chunk_size: Bytes written per chunk while streaming
+            max_retries: Download attempts before giving up (each resumes)
+            read_timeout: Socket read timeout for the download stream
+            progress_interval: Seconds between progress lines
+        """
+        self.client = client
+        self.session = getattr(client, "session", None) or requests.Session()
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.render_timeout = render_timeout
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.read_timeout = read_timeout
+        self.progress_interval = progress_interval
+
+    def wait_for_render(self, project_id: str, edit_id: str) -> str:
+        """
+        Start a render if needed and wait until it is downloadable
+
+        Returns:
+            The download URL of the rendered file
+        """
+        edit = self.client._make_request("GET", f"/projects/{project_id}/edits/{edit_id}")
+        if edit.get("download_url"):
+            return edit["download_url"]
+
+        render = self.client._make_request("POST", f"/projects/{project_id}/edits/{edit_id}/render")
+        asset_id = render["asset_id"]
+        print(f"Rendering edit {edit_id} (asset {asset_id})...")
+
+        deadline = time.monotonic() + self.render_timeout
+        delay = self.poll_interval
+        last_status = None
+        started = time.monotonic()
+        while True:
+            asset = self.client._make_request("GET", f"/assets/{asset_id}")
+            if asset.get("uploaded") and asset.get("download_url"):
+                print(f"Render finished in {time.monotonic() - started:.1f}s")
+                return asset["download_url"]
+
+            status = asset.get("status")
+            if status != last_status:
+                print(f"  Render status: {status or 'pending'}")
+                last_status = status
+            if status and status.lower() in ("failed", "error"):
+                raise RenderError(f"Render of edit {edit_id} failed with status {status}")
+
+            if time.monotonic() + delay > deadline:
+                raise RenderError(f"Render of edit {edit_id} did not finish within {self.render_timeout}s")
+            # Back off with jitter so long renders are not hammered every half second
+            time.sleep(delay * random.uniform(0.8, 1.2))
+            delay = min(delay * 1.5, self.max_poll_interval)
+
+    def download(self, url: str, filename: str) -> str:
+        """Stream url to filename, resuming and verifying as needed"""
+        cassette = active_cassette()
+        if cassette is None:
+            return self._download(url, filename)
+
+        def fetch():
+            self._download(url, filename)
+            return {"size": os.path.getsize(filename)}
+
+        result = cassette.call("download", f"render {url.split('?')[0]}", {"filename": filename}, fetch)
+        if cassette.replaying:
+            with open(filename, 'wb') as f:
+                f.truncate(result["size"])
+        return filename
+
+    def _download(self, url: str, filename: str) -> str:
+        part_path = f"{filename}.part"
+        meta_path = f"{part_path}.json"
+        source = url.split('?')[0]
+        expected_size = None
+        etag = _resumable_etag(part_path, meta_path, source)
+        attempt = 0
+
+        while True:
+            have = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+            headers = {}
+            if have:
+                headers["Range"] = f"bytes={have}-"
+                if etag:
+                    # Only send the remaining bytes if the file is still the one the .part came from
+                    headers["If-Range"] = etag
+            try:
+                with self.session.get(url, headers=headers, stream=True, timeout=(10, self.read_timeout)) as response:
+                    if response.status_code == 416:
+                        # Range starts at the end of the file: the .part is already complete
+                        total = _content_range_total(response.headers.get("Content-Range"))
+                        if total == have:
+                            expected_size = total
+                            break
+                        # The .part doesn't fit this file, so every retry would fail the same way
+                        print(f"Discarding a {_megabytes(have)} partial download that doesn't match the render")
+                        for stale in (part_path, meta_path):
+                            if os.path.exists(stale):
+                                os.remove(stale)
+                        etag = None
+                        continue
+                    response.raise_for_status()
+
+                    if response.status_code == 206:
+                        total = _content_range_total(response.headers.get("Content-Range"))
+                        mode = 'ab'
+                    else:
+                        # Server ignored the range (or this is the first request): start over
+                        have = 0
+                        total = _int_or_none(response.headers.get("Content-Length"))
+                        mode = 'wb'
+                    expected_size = total or expected_size
+                    etag = response.headers.get("ETag", etag)
+                    with open(meta_path, 'w') as f:
+                        json.dump({"url": source, "etag": etag}, f)
+
+                    if have:
+                        print(f"Resuming download at {_megabytes(have)}")
+                    self._stream(response, part_path, mode, have, expected_size)
+                break
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                    requests.exceptions.ChunkedEncodingError) as e:
+                attempt += 1
+                if attempt >= self.max_retries:
+                    raise RenderError(f"Download failed after {attempt} attempts: {e}")
+                wait = min(2 ** attempt, 30)
+                print(f"Download interrupted ({str(e)[:60]}), retrying in {wait}s...")
+                time.sleep(wait)
+
+        try:
+            self._verify(part_path, expected_size, etag)
+        finally:
+            if os.path.exists(meta_path):
+                os.remove(meta_path)
+        os.replace(part_path, filename)
+        return filename
+
+    def _stream(self, response, part_path, mode, have, expected_size):
+        started = time.monotonic()
+        last_report = started
+        written = 0
+        with open(part_path, mode) as f:
+            for chunk in response.iter_content(self.chunk_size):
+                if not chunk:
+                    continue
+                f.write(chunk)
+                written += len(chunk)
+                now = time.monotonic()
+                if now - last_report >= self.progress_interval:
+                    last_report = now
+                    self._report(have + written, expected_size, written / (now - started))
+        elapsed = max(time.monotonic() - started, 1e-6)
+        self._report(have + written, expected_size, written / elapsed)
+
+    def _report(self, done, total, rate):
+        if total:
+            print(f"  {_megabytes(done)} / {_megabytes(total)} ({done / total:.0%}) at {rate / 1e6:.1f} MB/s")
+        else:
+            print(f"  {_megabytes(done)} at {rate / 1e6:.1f} MB/s")
+
+    def _verify(self, part_path, expected_size, etag):
+        size = os.path.getsize(part_path)
+        if expected_size is not None and size != expected_size:
+            os.remove(part_path)
+            raise RenderError(f"Downloaded {size} bytes but expected {expected_size}")
+
+        md5 = hashlib.md5()
+        sha256 = hashlib.sha256()
+        with open(part_path, 'rb') as f:
+            for block in iter(lambda: f.read(self.chunk_size), b''):
+                md5.update(block)
+                sha256.update(block)
+
+        # Single-part S3 objects use the MD5 of the content as their ETag
+        quoted = (etag or "").strip('"')
+        if re.fullmatch(r"[0-9a-f]{32}", quoted) and md5.hexdigest() != quoted:
+            os.remove(part_path)
+            raise RenderError(f"Checksum mismatch: got {md5.hexdigest()}, expected {quoted}")
+        print(f"Verified {_megabytes(size)} (sha256 {sha256.hexdigest()[:16]}...)")
+
+    def download_edit_render(self, project_id: str, edit_id: str, filename: str) -> str:
+        """Render (if needed) and download an edit, returning the filename"""
+        url = self.wait_for_render(project_id, edit_id)
+        print(f"Downloading render to {filename}")
+        return self.download(url, filename)
+
+
+def _resumable_etag(part_path, meta_path, source):
+    """
+    ETag of the download a leftover .part belongs to, or None
+
+    A .part written for a different URL (an earlier render saved under the
+    same file name), or with no record of where it came from, is deleted so
+    the download starts from zero instead of appending to someone else's bytes.
+    """
+    if not os.path.exists(part_path):
+        return None
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        meta = {}
+    if meta.get("url") == source:
+        return meta.get("etag")
+    print(f"Discarding {part_path}: it belongs to a different download")
+    os.remove(part_path)
+    return None
+
+
+def _int_or_none(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _content_range_total(value):
+    # e.g. "bytes 1000-1999/5000"
+    if value and "/" in value:
+        return _int_or_none(value.rsplit("/", 1)[1])
+    return None
+
+
+def _megabytes(size):
+    return f"{size / 1e6:.1f} MB"
@@ -0,0 +1,216 @@
+"""
+Cheap-first model cascades for structured agent runs.
+
+Instead of hard-coding one model per agent, a ModelCascade tries a list of
+models from cheapest to most capable. Each structured output is checked by
+validators (relevance scores, URL shape, edit timing) and the run is only
+escalated to the next model when the cheaper one errors or fails
+validation:
+
+    cascade = ModelCascade("beat_rerank", [
+        ("flash", gemini_model("gemini-2.5-flash")),
+        ("pro", gemini_model("gemini-2.5-pro")),
+    ], validators=[min_relevance(0.5), video_urls()])
+    result = await cascade.run(rerank_agent, prompt)
+
+Latency and success rate for every route are accumulated on disk, so the
+tiers can be tuned from data (see route_stats().summary()).
+"""
+import json
+import os
+import threading
+import time
+from typing import Callable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from utils.cache import cache_path
+from utils.profiling import profiled_run
+
+Validator = Callable[[object], Optional[str]]
+
+VIDEO_HOSTS = ("youtube.com", "youtu.be", "vimeo.com", "dailymotion.com", "tiktok.com", "instagram.com",
+               "twitter.com", "x.com", "facebook.com", "twitch.tv", "reddit.com", "streamable.com")
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".webm", ".m4v", ".mkv", ".m3u8")
+
+
+class CascadeFailed(Exception):
+    """Raised when every model in a cascade errors or fails validation"""
+
+    def __init__(self, message: str, last_result=None):
+        super().__init__(message)
+        self.last_result = last_result
+
+
+class RouteStats:
+    """Per-route attempt counts, latency and failure reasons, persisted as JSON"""
+
+    def __init__(self, path: str = None):
+        self.path = path or cache_path("routing-stats.json")
+        self._lock = threading.Lock()
+        self.routes = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.routes = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable routing stats {self.path}: {e}")
+
+    def record(self, route: str, ok: bool, latency: float, reason: str = None):
+        with self._lock:
+            entry = self.routes.setdefault(route, {
+                "attempts": 0, "successes": 0, "total_latency": 0.0, "failures": {},
+            })
+            entry["attempts"] += 1
+            entry["successes"] += ok
+            entry["total_latency"] = round(entry["total_latency"] + latency, 3)
+            if not ok:
+                key = (reason or "error")[:60]
+                entry["failures"][key] = entry["failures"].get(key, 0) + 1
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.routes, f, indent=2)
+            os.replace(tmp_path, self.path)
+
+    def summary(self, prefix: str = "") -> str:
+        lines = ["Route stats (all runs):"]
+        for route, entry in sorted(self.routes.items()):
+            if not route.startswith(prefix):
+                continue
+            rate = entry["successes"] / entry["attempts"]
+            latency = entry["total_latency"] / entry["attempts"]
+            lines.append(f"  {route}: {entry['attempts']} runs, {rate:.0%} passed, {latency:.1f}s avg")
+        return "\n".join(lines)
+
+
+_route_stats = None
+_route_stats_lock = threading.Lock()
+
+
+def route_stats() -> RouteStats:
+    """The process-wide route statistics"""
+    global _route_stats
+    with _route_stats_lock:
+        if _route_stats is None:
+            _route_stats = RouteStats()
+        return _route_stats
+
+
+class ModelCascade:
+    """Runs an agent on the cheapest model whose output passes validation"""
+
+    def __init__(self, name: str, models: List[Tuple[str, object]], validators: List[Validator] = None,
+                 stats: RouteStats = None):
+        """
+        Args:
+            name: Route name used in the statistics
+            models: (label, model) pairs, cheapest first
+            validators: Checks run on each output; each returns None if it passes or a reason if it fails
+            stats: Where to record outcomes (default: the shared route stats)
+        """
+        self.name = name
+        self.models = models
+        self.validators = validators or []
+        self.stats = stats or route_stats()
+
+    def validate(self, output, validators: List[Validator] = ()) -> Optional[str]:
+        for validator in [*self.validators, *validators]:
+            reason = validator(output)
+            if reason:
+                return reason
+        return None
+
+    async def run(self, agent, user_prompt, validators: List[Validator] = (), on_output=None, **kwargs):
+        """
+        Run agent on each model in turn until an output validates
+
+        Args:
+            agent: The agent to run (its own model is ignored)
+            user_prompt: Prompt passed to the agent
+            validators: Extra checks for this call only
+            on_output: profiled_run's output callback. Partial output is only streamed from the
+                last model, which has nothing to escalate to; an earlier model's output is passed
+                on (with final=True) once it has passed validation
+            **kwargs: Passed through to profiled_run (usage_limits, ...)
+
+        Returns:
+            The first AgentRunResult that passed validation
+        """
+        reasons = []
+        last_result = None
+        for i, (label, model) in enumerate(self.models):
+            route = f"{self.name}:{label}"
+            last = i + 1 == len(self.models)
+            started = time.perf_counter()
+            try:
+                result = await profiled_run(agent, user_prompt, name=route, model=model,
+                                            on_output=on_output if last else None, **kwargs)
+                reason = self.validate(result.output, validators)
+            except Exception as e:
+                result, reason = None, f"{type(e).__name__}: {str(e)[:80]}"
+            self.stats.record(route, reason is None, time.perf_counter() - started, reason)
+            if reason is None:
+                if on_output is not None and not last:
+                    await on_output(result.output, final=True)
+                return result
+            last_result = result or last_result
+            reasons.append(f"{label}: {reason}")
+            if i + 1 < len(self.models):
+                print(f"{route} rejected ({reason}), escalating to {self.models[i + 1][0]}")
+        raise CascadeFailed(f"{self.name} failed on every model ({'; '.join(reasons)})", last_result)
+
+
+# Validators
+
+def _videos(output):
+    return getattr(output, "videos", None) or []
+
+
+def min_relevance(threshold: float = 0.5, min_count: int = 1) -> Validator:
+    """At least min_count videos scored at or above threshold"""
+    def check(output):
+        relevant = [v for v in _videos(output) if getattr(v, "relevance_score", 0.0) >= threshold]
+        if len(relevant) < min_count:
+            return f"only {len(relevant)} videos with relevance >= {threshold}"
+        return None
+    return check
+
+
+def is_url(url: str) -> bool:
+    parsed = urlparse(url or "")
+    return parsed.scheme in ("http", "https") and "." in parsed.netloc and " " not in url
+
+
+def is_video_url(url: str) -> bool:
+    """A plausible http(s) link to a known video host or a media file"""
+    if not is_url(url):
+        return False
+    parsed = urlparse(url)
+    host = parsed.netloc.lower().split(":")[0]
+    if any(host == h or host.endswith(f".{h}") for h in VIDEO_HOSTS):
+        return True
+    return parsed.path.lower().endswith(VIDEO_EXTENSIONS)
+
+
+def video_urls(min_count: int = 1) -> Validator:
+    """Every URL is well formed and at least min_count point at a video host or media file"""
+    def check(output):
+        videos = _videos(output)
+        malformed = [v.url for v in videos if not is_url(v.url)]
+        if malformed:
+            return f"{len(malformed)} malformed URLs (e.g. {malformed[0][:60]})"
+        playable = [v for v in videos if is_video_url(v.url)]
+        if len(playable) < min_count:
+            return f"only {len(playable)} video URLs returned"
+        return None
+    return check
+
+
+def fills_duration(solve: Callable[[object], object]) -> Validator:
+    """The output can be solved into a timeline; solve raises (e.g. TimelineError) if it cannot"""
+    def check(output):
+        try:
+            solve(output)
+        except Exception as e:
+            return str(e)[:120] or type(e).__name__
+        return None
+    return check
@@ -0,0 +1,145 @@
+"""
+Direct async client for Serper's video search.
+
+Raw retrieval does not need an LLM: SerperClient calls the Serper API over
+the shared, pooled httpx client, sends several queries in one batched
+request, and caches responses on disk so a repeated query costs nothing.
+
+    serper = SerperClient()
+    results = await serper.search_videos_batch(["rocket launch", "mission control"])
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List
+
+from utils.cache import cache_path
+from utils.clients import async_http_client
+
+SERPER_URL = "https://google.serper.dev"
+SERPER_CACHE_ENV = "SERPER_CACHE"
+
+
+class SerperError(Exception):
+    """Raised when the Serper API rejects a request"""
+
+
+class SerperCache:
+    """On-disk TTL cache of Serper responses"""
+
+    def __init__(self, path: str = None, ttl: float = 24 * 3600):
+        """
+        Args:
+            path: Cache file location (default: the shared cache dir)
+            ttl: Seconds a cached response stays valid
+        """
+        self.path = path or cache_path("serper.json")
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable Serper cache {self.path}: {e}")
+        now = time.time()
+        self.entries = {key: entry for key, entry in self.entries.items() if entry["expires"] > now}
+
+    @staticmethod
+    def key(endpoint: str, payload: dict) -> str:
+        return hashlib.sha256(json.dumps([endpoint, payload], sort_keys=True).encode()).hexdigest()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None or entry["expires"] <= time.time():
+                return None
+            return entry["response"]
+
+    def put_many(self, responses: Dict[str, dict]):
+        with self._lock:
+            expires = time.time() + self.ttl
+            for key, response in responses.items():
+                self.entries[key] = {"expires": expires, "response": response}
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w') as f:
+                json.dump(self.entries, f)
+            os.replace(tmp_path, self.path)
+
+
+class SerperClient:
+    """Async, pooled Serper client with batching and a response cache"""
+
+    def __init__(self, api_key: str = None, batch_size: int = 20, max_concurrency: int = 4,
+                 cache: SerperCache = None, timeout: float = 30):
+        """
+        Args:
+            api_key: Serper API key (default: $SERPER_API_KEY)
+            batch_size: Most queries sent in a single batched request
+            max_concurrency: Most Serper requests in flight at once
+            cache: Response cache (default: the shared on-disk cache; SERPER_CACHE=0 disables it)
+            timeout: Request timeout in seconds
+        """
+        self.api_key = api_key or os.environ["SERPER_API_KEY"]
+        self.batch_size = batch_size
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        if cache is None and os.environ.get(SERPER_CACHE_ENV) != "0":
+            cache = SerperCache()
+        self.cache = cache
+        self.http = async_http_client(timeout)
+
+    async def _post(self, endpoint: str, payload):
+        async with self.semaphore:
+            response = await self.http.post(
+                f"{SERPER_URL}/{endpoint}",
+                headers={"X-API-KEY": self.api_key, "Content-Type": "application/json"},
+                json=payload,
+            )
+        if response.status_code != 200:
+            raise SerperError(f"Serper {endpoint} returned {response.status_code}: {response.text[:200]}")
+        return response.json()
+
+    async def batch(self, endpoint: str, payloads: List[dict]) -> List[dict]:
+        """
+        Run many searches against one endpoint, returning responses in order
+
+        Cached payloads are answered locally; the rest are deduplicated and
+        sent in batched requests of up to batch_size queries.
+        """
+        keys = [SerperCache.key(endpoint, payload) for payload in payloads]
+        responses = {}
+        missing = {}
+        for key, payload in zip(keys, payloads):
+            cached = self.cache.get(key) if self.cache else None
+            if cached is not None:
+                responses[key] = cached
+            else:
+                missing.setdefault(key, payload)
+
+        missing_keys = list(missing)
+        chunks = [missing_keys[i:i + self.batch_size] for i in range(0, len(missing_keys), self.batch_size)]
+        results = await asyncio.gather(*[
+            self._post(endpoint, [missing[key] for key in chunk]) for chunk in chunks
+        ])
+        fetched = {}
+        for chunk, result in zip(chunks, results):
+            # A batched request answers with one response per query, in order
+            fetched.update(zip(chunk, result if isinstance(result, list) else [result]))
+        if fetched and self.cache:
+            self.cache.put_many(fetched)
+        responses.update(fetched)
+        return [responses.get(key, {}) for key in keys]
+
+    async def search_videos_batch(self, queries: List[str], num: int = 10) -> Dict[str, List[dict]]:
+        """Video results for each query, as returned by Serper (title, link, snippet, duration, ...)"""
+        payloads = [{"q": query, "num": num} for query in queries]
+        responses = await self.batch("videos", payloads)
+        return {query: response.get("videos", []) for query, response in zip(queries, responses)}
+
+    async def search_videos(self, query: str, num: int = 10) -> List[dict]:
+        """Video results for a single query"""
+        return (await self.search_videos_batch([query], num=num))[query]
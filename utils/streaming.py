@@ -0,0 +1,123 @@
+"""
+Start work on list items while a structured agent output is still streaming.
+
+The search agents return a VideoList, and nothing used to download until the
+whole list had been generated. StreamedItems receives the partially parsed
+output of a streamed run (via profiled_run's on_output) and queues each item
+as soon as it is complete and validates, so downloads overlap with the rest
+of the model's output:
+
+    videos = StreamedItems(VideoItem, "videos", key=lambda video: video.url)
+
+    async def search():
+        try:
+            return await profiled_run(search_agent, prompt, on_output=videos.on_output)
+        finally:
+            videos.close()
+
+    search_task = asyncio.create_task(search())
+    outcomes = await videos.consume(download_video)
+    result = await search_task
+"""
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Set, Type
+
+from pydantic import BaseModel, ValidationError
+
+_DONE = object()
+
+
+class StreamedItems:
+    """
+    Queues each item of a streamed list output once, as soon as it is complete
+
+    The last item of a partial output may still be growing (a URL cut off
+    half way), so it is only queued once the model has started on the next
+    item, or when the final output arrives.
+
+    A run can stream an output tool call that then fails validation and is
+    retried. When the final output arrives, items it doesn't contain that are
+    still waiting in the queue are dropped (and may be queued again later);
+    items a consumer has already picked up cannot be recalled.
+    """
+
+    def __init__(self, item_type: Type[BaseModel], field: str = "videos", key: Callable = None,
+                 seen: Optional[Set] = None):
+        """
+        Args:
+            item_type: Model each list item is validated against
+            field: Name of the list field on the output model
+            key: Identity of an item for de-duplication (default: its JSON)
+            seen: Keys to skip, e.g. shared across several searches; queued keys are added to it
+        """
+        self.item_type = item_type
+        self.field = field
+        self.key = key or (lambda item: item.model_dump_json())
+        self.seen = seen if seen is not None else set()
+        self.queued = 0
+        self._queue = asyncio.Queue()
+
+    async def on_output(self, output, final: bool = False):
+        """
+        Args:
+            output: Partially parsed output arguments (a dict), or the validated output when final
+            final: Whether this is the run's complete output
+        """
+        if final:
+            items = list(getattr(output, self.field, None) or [])
+            self._drop_queued_except({self.key(item) for item in items})
+        else:
+            items = []
+            raw = output.get(self.field) if isinstance(output, dict) else None
+            for data in (raw if isinstance(raw, list) else [])[:-1]:
+                try:
+                    items.append(self.item_type.model_validate(data))
+                except ValidationError:
+                    continue  # the final output is validated (and retried) by the run itself
+        for item in items:
+            key = self.key(item)
+            if key in self.seen:
+                continue
+            self.seen.add(key)
+            self.queued += 1
+            self._queue.put_nowait(item)
+
+    def _drop_queued_except(self, keys: Set):
+        """Drop waiting items whose keys aren't in keys, e.g. those from a rejected output"""
+        waiting = []
+        while not self._queue.empty():
+            waiting.append(self._queue.get_nowait())
+        for item in waiting:
+            if item is not _DONE and self.key(item) not in keys:
+                self.seen.discard(self.key(item))
+                self.queued -= 1
+                continue
+            self._queue.put_nowait(item)
+
+    def close(self):
+        """No more items will arrive; consumers finish once the queue drains"""
+        self._queue.put_nowait(_DONE)
+
+    async def consume(self, handler: Callable[[object], Awaitable], workers: int = 1) -> List:
+        """
+        Run handler on every queued item until close() is called
+
+        Args:
+            handler: Async function called with each item
+            workers: How many items to handle at once
+
+        Returns:
+            The handler results, in the order items finished
+        """
+        results = []
+
+        async def worker():
+            while True:
+                item = await self._queue.get()
+                if item is _DONE:
+                    self._queue.put_nowait(_DONE)  # let the other workers see it too
+                    return
+                results.append(await handler(item))
+
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        return results
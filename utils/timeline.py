@@ -0,0 +1,390 @@
+"""
+Deterministic timeline solving for voice-over edits.
+
+Asking the edit agent to make clip in/out points add up to the voice-over
+length costs extra model turns and edit updates whenever it gets the
+arithmetic wrong. Instead, the agent (or a heuristic) only chooses the clip
+order, where each clip's interesting part starts and roughly how long it
+should run; solve_timeline turns that into frame-exact in/out points that
+fill the audio duration exactly while respecting each clip's limits.
+
+Time is kept in integer frames throughout and only rendered as HH:MM:SS.mmm
+at the edge, so long edits never drift or overflow the minutes field.
+Timeline holds a sequence of clips in an implicit treap, so inserting,
+removing, splitting and resizing (rippling everything after) a clip are all
+O(log n), even for edits with thousands of clips.
+"""
+import math
+import random
+from typing import Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+FPS = 30
+
+
+class TimelineError(Exception):
+    """Raised when the clips cannot fill the requested duration"""
+
+
+def seconds_to_frames(seconds: float, fps: int = FPS) -> int:
+    return int(round(seconds * fps))
+
+
+def frames_to_timestamp(frames: int, fps: int = FPS) -> str:
+    """Frames as an HH:MM:SS.mmm timestamp"""
+    millis = int(round(frames * 1000 / fps))
+    hours, millis = divmod(millis, 3_600_000)
+    minutes, millis = divmod(millis, 60_000)
+    seconds, millis = divmod(millis, 1000)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}.{millis:03d}"
+
+
+class ClipRequest(BaseModel):
+    asset_id: str
+    type: str = "user"
+    source_start: float = 0.0
+    preferred_seconds: Optional[float] = None
+    min_seconds: float = 1.0
+    max_seconds: Optional[float] = None
+    asset_duration: Optional[float] = None
+
+
+class SolvedClip(BaseModel):
+    asset_id: str
+    type: str
+    in_frame: int
+    out_frame: int
+    timeline_frame: int
+
+    @property
+    def frames(self) -> int:
+        return self.out_frame - self.in_frame
+
+
+def _bounds(clip: ClipRequest, fps: int):
+    """(in_frame, min_frames, max_frames) for a clip; max is inf when the asset length is unknown"""
+    in_frame = seconds_to_frames(max(clip.source_start, 0.0), fps)
+    high = math.inf
+    if clip.asset_duration is not None:
+        high = seconds_to_frames(clip.asset_duration, fps) - in_frame
+        if high <= 0 and in_frame:
+            # The in-point is past the end of the asset: start from the beginning instead
+            in_frame, high = 0, seconds_to_frames(clip.asset_duration, fps)
+    if clip.max_seconds is not None:
+        high = min(high, seconds_to_frames(clip.max_seconds, fps))
+    low = min(seconds_to_frames(clip.min_seconds, fps), high)
+    return in_frame, low, high
+
+
+_MAX_DOUBLINGS = 256
+
+
+def _fill(weights, lows, highs, total):
+    """Scale weights so the clamped lengths sum to total, then round to whole frames"""
+    def lengths(scale):
+        return [min(max(scale * w, lo), hi) for w, lo, hi in zip(weights, lows, highs)]
+
+    low_scale, high_scale = 0.0, 1.0
+    for _ in range(_MAX_DOUBLINGS):
+        if sum(lengths(high_scale)) >= total:
+            break
+        high_scale *= 2
+    else:
+        # Weights that cannot grow (none positive) would never reach the total
+        return split_evenly(total, len(weights))
+    for _ in range(100):
+        mid = (low_scale + high_scale) / 2
+        if sum(lengths(mid)) < total:
+            low_scale = mid
+        else:
+            high_scale = mid
+
+    exact = lengths(high_scale)
+    frames = [max(int(math.floor(length)), lo) for length, lo in zip(exact, lows)]
+    # Hand out (or take back) the frames lost to rounding, largest remainder first
+    order = sorted(range(len(frames)), key=lambda i: exact[i] - math.floor(exact[i]), reverse=True)
+    remainder = total - sum(frames)
+    while remainder:
+        step = 1 if remainder > 0 else -1
+        candidates = [i for i in (order if step > 0 else reversed(order))
+                      if (frames[i] < highs[i] if step > 0 else frames[i] > lows[i])]
+        if not candidates:
+            break
+        for i in candidates:
+            if not remainder:
+                break
+            frames[i] += step
+            remainder -= step
+    return frames
+
+
+def solve_timeline(clips: List[ClipRequest], total_seconds: float, fps: int = FPS) -> List[SolvedClip]:
+    """
+    Frame-exact in/out points for clips, in order, that exactly fill total_seconds
+
+    Clips keep their relative preferred lengths where the limits allow. If even
+    the minimum lengths overflow the duration, clips are dropped from the end.
+
+    Args:
+        clips: Clips in timeline order
+        total_seconds: Duration to fill (e.g. the voice-over length)
+        fps: Frame rate of the edit
+
+    Raises:
+        TimelineError: If the clips are too short to fill the duration
+    """
+    total = seconds_to_frames(total_seconds, fps)
+    entries = []
+    for clip in clips:
+        in_frame, low, high = _bounds(clip, fps)
+        if high > 0:
+            entries.append((clip, in_frame, low, high))
+    while entries and sum(low for _, _, low, _ in entries) > total:
+        entries.pop()
+    if not entries:
+        raise TimelineError("No usable clips to fill the timeline")
+
+    capacity = sum(high for _, _, _, high in entries)
+    if capacity < total:
+        raise TimelineError(
+            f"Clips only cover {capacity / fps:.2f}s of the {total_seconds:.2f}s timeline"
+        )
+
+    fair_share = total / len(entries)
+    weights = []
+    for clip, _, _, high in entries:
+        if clip.preferred_seconds and clip.preferred_seconds > 0:
+            weights.append(clip.preferred_seconds * fps)
+        else:
+            weights.append(min(fair_share, high))
+    frames = _fill(weights, [e[2] for e in entries], [e[3] for e in entries], total)
+
+    solved = []
+    position = 0
+    for (clip, in_frame, _, _), length in zip(entries, frames):
+        solved.append(SolvedClip(
+            asset_id=clip.asset_id,
+            type=clip.type,
+            in_frame=in_frame,
+            out_frame=in_frame + length,
+            timeline_frame=position,
+        ))
+        position += length
+    return solved
+
+
+def split_evenly(total_frames: int, count: int) -> List[int]:
+    """count whole-frame lengths that differ by at most one frame and sum to total_frames"""
+    return [total_frames * (i + 1) // count - total_frames * i // count for i in range(count)]
+
+
+class Clip(BaseModel):
+    """A span of a source asset: frames in_frame up to (not including) out_frame"""
+    asset_id: str
+    type: str = "user"
+    in_frame: int = 0
+    out_frame: int
+
+    @property
+    def frames(self) -> int:
+        return self.out_frame - self.in_frame
+
+
+class _Node:
+    __slots__ = ("clip", "priority", "left", "right", "count", "frames")
+
+    def __init__(self, clip: Clip):
+        self.clip = clip
+        self.priority = random.random()
+        self.left = None
+        self.right = None
+        self.count = 1
+        self.frames = clip.frames
+
+    def update(self):
+        self.count = 1 + _count(self.left) + _count(self.right)
+        self.frames = self.clip.frames + _frames(self.left) + _frames(self.right)
+
+
+def _count(node) -> int:
+    return node.count if node else 0
+
+
+def _frames(node) -> int:
+    return node.frames if node else 0
+
+
+def _split(node, index: int):
+    """(first index clips, the rest)"""
+    if node is None:
+        return None, None
+    if _count(node.left) < index:
+        node.right, right = _split(node.right, index - _count(node.left) - 1)
+        node.update()
+        return node, right
+    left, node.left = _split(node.left, index)
+    node.update()
+    return left, node
+
+
+def _merge(left, right):
+    if left is None or right is None:
+        return left or right
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        left.update()
+        return left
+    right.left = _merge(left, right.left)
+    right.update()
+    return right
+
+
+class Timeline:
+    """
+    An ordered sequence of clips played back to back, with frame positions
+
+    A clip's position on the timeline is never stored: it is the sum of the
+    lengths before it, kept per subtree, so changing one clip's length
+    ripples every later clip for free.
+
+    Args:
+        clips: Initial clips, in order
+        fps: Frame rate of the edit
+    """
+
+    def __init__(self, clips: List[Clip] = (), fps: int = FPS):
+        self.fps = fps
+        self._root = None
+        for clip in clips:
+            self.append(clip)
+
+    def __len__(self) -> int:
+        return _count(self._root)
+
+    @property
+    def frames(self) -> int:
+        """Total length of the timeline in frames"""
+        return _frames(self._root)
+
+    @property
+    def seconds(self) -> float:
+        return self.frames / self.fps
+
+    def _check_index(self, index: int, allow_end: bool = False) -> int:
+        size = len(self)
+        if index < 0:
+            index += size
+        if not 0 <= index < size + allow_end:
+            raise IndexError(f"Clip index {index} out of range for a timeline of {size} clips")
+        return index
+
+    def insert(self, index: int, clip: Clip):
+        """Insert clip before position index, shifting later clips right"""
+        if clip.frames <= 0:
+            raise TimelineError(f"Clip {clip.asset_id} has no frames")
+        left, right = _split(self._root, self._check_index(index, allow_end=True))
+        self._root = _merge(_merge(left, _Node(clip)), right)
+
+    def append(self, clip: Clip):
+        self.insert(len(self), clip)
+
+    def remove(self, index: int) -> Clip:
+        """Remove and return the clip at index, closing the gap"""
+        index = self._check_index(index)
+        left, rest = _split(self._root, index)
+        node, right = _split(rest, 1)
+        self._root = _merge(left, right)
+        return node.clip
+
+    def __getitem__(self, index: int) -> Clip:
+        index = self._check_index(index)
+        node = self._root
+        while True:
+            left = _count(node.left)
+            if index == left:
+                return node.clip
+            if index < left:
+                node = node.left
+            else:
+                index -= left + 1
+                node = node.right
+
+    def replace(self, index: int, clip: Clip):
+        """Swap the clip at index for another, rippling later clips by the change in length"""
+        if clip.frames <= 0:
+            raise TimelineError(f"Clip {clip.asset_id} has no frames")
+        left, rest = _split(self._root, self._check_index(index))
+        node, right = _split(rest, 1)
+        node.clip = clip
+        node.update()
+        self._root = _merge(_merge(left, node), right)
+
+    def resize(self, index: int, frames: int):
+        """Change the clip at index to last frames frames (trimming or extending its out point)"""
+        clip = self[index]
+        self.replace(index, clip.model_copy(update={"out_frame": clip.in_frame + frames}))
+
+    def start_frame(self, index: int) -> int:
+        """Timeline frame at which the clip at index starts"""
+        index = self._check_index(index, allow_end=True)
+        node, start = self._root, 0
+        while node is not None:
+            left = _count(node.left)
+            if index <= left:
+                node = node.left
+            else:
+                start += _frames(node.left) + node.clip.frames
+                index -= left + 1
+                node = node.right
+        return start
+
+    def clip_at(self, frame: int) -> Tuple[int, Clip, int]:
+        """(index, clip, frames into the clip) for the clip playing at a timeline frame"""
+        if not 0 <= frame < self.frames:
+            raise IndexError(f"Frame {frame} is outside a timeline of {self.frames} frames")
+        node, index = self._root, 0
+        while True:
+            left_frames = _frames(node.left)
+            if frame < left_frames:
+                node = node.left
+            elif frame < left_frames + node.clip.frames:
+                return index + _count(node.left), node.clip, frame - left_frames
+            else:
+                frame -= left_frames + node.clip.frames
+                index += _count(node.left) + 1
+                node = node.right
+
+    def split(self, frame: int) -> int:
+        """
+        Cut the clip playing at a timeline frame in two at that frame
+
+        Returns:
+            Index of the clip that now starts at frame
+        """
+        index, clip, offset = self.clip_at(frame)
+        if offset == 0:
+            return index
+        cut = clip.in_frame + offset
+        self.replace(index, clip.model_copy(update={"out_frame": cut}))
+        self.insert(index + 1, clip.model_copy(update={"in_frame": cut}))
+        return index + 1
+
+    def __iter__(self) -> Iterator[Clip]:
+        stack, node = [], self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.clip
+            node = node.right
+
+    def solved(self) -> List[SolvedClip]:
+        """Every clip with its timeline position, in order"""
+        solved, position = [], 0
+        for clip in self:
+            solved.append(SolvedClip(asset_id=clip.asset_id, type=clip.type, in_frame=clip.in_frame,
+                                     out_frame=clip.out_frame, timeline_frame=position))
+            position += clip.frames
+        return solved
@@ -1,7 +1,10 @@
+import os
 import subprocess
 import yt_dlp
 from yt_dlp.networking.impersonate import ImpersonateTarget
 
+from utils.cassette import active_cassette
+
 class YtDlpImpersonator:
     """A wrapper for yt-dlp with automatic impersonation"""
     
@@ -200,8 +203,23 @@ def download(url, output_path=None, format='best', **extra_opts):
         format: Format to download (default: 'best')
         **extra_opts: Additional options to pass to yt-dlp
     """
-    impersonator = YtDlpImpersonator()
-    return impersonator.download(url, output_path, format, True, **extra_opts)
+    cassette = active_cassette()
+    if cassette is None:
+        impersonator = YtDlpImpersonator()
+        return impersonator.download(url, output_path, format, True, **extra_opts)
+
+    def fetch():
+        YtDlpImpersonator().download(url, output_path, format, True, **extra_opts)
+        if output_path and os.path.exists(output_path):
+            return {"size": os.path.getsize(output_path)}
+        return {"size": None}
+
+    result = cassette.call("download", f"yt-dlp {url}", {"output_path": output_path, "format": format}, fetch)
+    if cassette.replaying and output_path and result["size"] is not None:
+        # Recreate the file as a sparse placeholder of the recorded size
+        with open(output_path, 'wb') as f:
+            f.truncate(result["size"])
+    return None
 
 def extract_info(url, **extra_opts):
     """
@@ -0,0 +1,180 @@
+"""
+Content-hash deduplication for Video Jungle uploads.
+
+A local manifest maps the SHA-256 of every uploaded file to the asset it
+became, and to the library video file holding the same content. Uploading a
+known file again reuses that asset when it is already in the target project,
+or links the library video file into a new project as a video reference, so
+the file is neither re-uploaded nor re-analysed. The video file id is looked
+up after the first upload (add_videofile_to_project does not accept asset
+ids); a file with no library copy yet is uploaded again.
+"""
+import hashlib
+import json
+import mmap
+import os
+import threading
+from datetime import datetime
+
+from utils.cache import cache_path
+from utils.mcp_cache import invalidate_project
+
+MANIFEST_ENV = "UPLOAD_MANIFEST"
+
+
+def file_hash(path: str) -> str:
+    """SHA-256 of a file, hashed through mmap so it is never read into memory"""
+    digest = hashlib.sha256()
+    if os.path.getsize(path) == 0:
+        return digest.hexdigest()
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        digest.update(mapped)
+    return digest.hexdigest()
+
+
+class UploadManifest:
+    """JSON manifest of uploaded files keyed by content hash"""
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path: Manifest location (default: $UPLOAD_MANIFEST or the shared cache dir)
+        """
+        self.path = path or os.environ.get(MANIFEST_ENV) or cache_path("uploads.json")
+        self._lock = threading.Lock()
+        self.entries = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Warning: ignoring unreadable upload manifest {self.path}: {e}")
+
+    def get(self, content_hash: str):
+        with self._lock:
+            return self.entries.get(content_hash)
+
+    def record(self, content_hash: str, size: int, project_id: str, asset_id: str, name: str, original: bool = False,
+               video_file_id: str = None):
+        """Remember that content_hash is available as asset_id in project_id (and as a library video file)"""
+        with self._lock:
+            entry = self.entries.setdefault(content_hash, {
+                "size": size,
+                "name": name,
+                "projects": {},
+            })
+            if original or "asset_id" not in entry:
+                entry["asset_id"] = asset_id
+                entry["uploaded_at"] = datetime.now().isoformat()
+            entry["projects"][project_id] = asset_id
+            if video_file_id:
+                entry["video_file_id"] = video_file_id
+            self._save()
+
+    def forget(self, content_hash: str, project_id: str = None):
+        """Drop a stale entry, or just one project's copy of it"""
+        with self._lock:
+            if content_hash not in self.entries:
+                return
+            if project_id is None:
+                del self.entries[content_hash]
+            else:
+                self.entries[content_hash]["projects"].pop(project_id, None)
+            self._save()
+
+    def _save(self):
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
+_manifest = None
+_manifest_lock = threading.Lock()
+
+
+def default_manifest() -> UploadManifest:
+    """The process-wide upload manifest"""
+    global _manifest
+    with _manifest_lock:
+        if _manifest is None:
+            _manifest = UploadManifest()
+        return _manifest
+
+
+def library_video_file_id(client, asset, content_hash: str):
+    """The library video file with the same content as an uploaded asset, if Video Jungle has one"""
+    params = asset.create_parameters if isinstance(getattr(asset, "create_parameters", None), dict) else {}
+    for key in ("video_file_id", "videofile_id"):
+        if params.get(key):
+            return str(params[key])
+    try:
+        video_files = client.video_files.list()
+    except Exception as e:
+        print(f"Could not look up library video files: {str(e)[:80]}")
+        return None
+    for video_file in video_files:
+        if (video_file.hash or "").lower() == content_hash:
+            return video_file.id
+    return None
+
+
+def upload_or_link(client, project_id: str, filename: str, name: str, description: str, manifest: UploadManifest = None,
+                   video_file_id: str = None):
+    """
+    Make a local file available as an asset in a project, uploading only if needed
+
+    Args:
+        client: Video Jungle ApiClient
+        project_id: Project the asset should end up in
+        filename: Local file to upload
+        name: Asset name used if the file has to be uploaded or linked
+        description: Asset description
+        manifest: Manifest to consult (default: the shared one)
+        video_file_id: Library video file with the same content, if the caller knows it (otherwise looked up)
+
+    Returns:
+        Tuple of (asset_id, how) where how is "reused", "linked" or "uploaded"
+    """
+    manifest = manifest or default_manifest()
+    content_hash = file_hash(filename)
+    size = os.path.getsize(filename)
+    entry = manifest.get(content_hash)
+
+    if entry:
+        existing = entry["projects"].get(project_id)
+        if existing:
+            try:
+                client.assets.get(existing)
+                return existing, "reused"
+            except Exception:
+                manifest.forget(content_hash, project_id)
+
+        # Only library video files can be linked, not another project's asset
+        linkable = entry.get("video_file_id") or video_file_id
+        if not linkable:
+            try:
+                original = client.assets.get(entry["asset_id"])
+            except Exception:
+                original = None
+            linkable = library_video_file_id(client, original, content_hash)
+        if linkable:
+            try:
+                asset = client.assets.add_videofile_to_project(project_id, linkable, description=description)
+                manifest.record(content_hash, size, project_id, asset.id, name, video_file_id=linkable)
+                invalidate_project(project_id)
+                return asset.id, "linked"
+            except Exception as e:
+                print(f"Could not link video file for {name}, uploading instead: {str(e)[:80]}")
+                manifest.forget(content_hash)
+
+    asset = client.assets.upload_asset(
+        name=name,
+        description=description,
+        project_id=project_id,
+        filename=filename,
+    )
+    video_file_id = video_file_id or library_video_file_id(client, asset, content_hash)
+    manifest.record(content_hash, size, project_id, asset.id, name, original=True, video_file_id=video_file_id)
+    invalidate_project(project_id)  # cached get-project-assets results no longer list every asset
+    return asset.id, "uploaded"
@@ -0,0 +1,125 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from videojungle import ApiClient
+
+from utils.cassette import active_cassette
+
+
+class PooledApiClient(ApiClient):
+    """An ApiClient that sends every request through one shared keep-alive session"""
+
+    def __init__(self, token, pool_size=16):
+        """
+        Initialize the client and its connection pool
+
+        Args:
+            token: Video Jungle API key
+            pool_size: Maximum number of pooled connections per host
+        """
+        super().__init__(token)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _make_request(self, method, endpoint, **kwargs):
+        cassette = active_cassette()
+        if cassette is None:
+            return self._send(method, endpoint, **kwargs)
+
+        path, _, query = endpoint.partition('?')
+        request = {
+            "query": query,
+            "json": kwargs.get("json"),
+            "params": kwargs.get("params"),
+            "files": sorted(kwargs["files"]) if "files" in kwargs else None,
+        }
+        return cassette.call(
+            "vj", f"{method} {path}", request,
+            lambda: self._send(method, endpoint, **kwargs),
+            errors={"HTTPError": requests.exceptions.HTTPError},
+        )
+
+    def _send(self, method, endpoint, **kwargs):
+        headers = {
+            "X-API-Key": self.token
+        }
+        if 'headers' in kwargs:
+            headers.update(kwargs.pop('headers'))
+
+        url = f"{self.BASE_URL}/{endpoint.lstrip('/')}"
+        response = self.session.request(method, url, headers=headers, **kwargs)
+
+        try:
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.HTTPError as e:
+            if response.status_code == 422:
+                try:
+                    print(f"422 Unprocessable Entity: {response.json()}")
+                except ValueError:
+                    print("422 Unprocessable Entity: Could not parse error response")
+            raise e
+
+
+class AsyncResource:
+    """Async view of a single ApiClient resource (projects, assets, ...)"""
+
+    def __init__(self, resource, client):
+        self._resource = resource
+        self._client = client
+
+    def __getattr__(self, name):
+        attr = getattr(self._resource, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            return await self._client.run(attr, *args, **kwargs)
+
+        return call
+
+
+class AsyncApiClient:
+    """
+    Async facade over a Video Jungle ApiClient.
+
+    Every call is run on a bounded thread pool so it never blocks the event
+    loop, and all calls share the wrapped client's connection pool:
+
+        avj = AsyncApiClient(PooledApiClient(token))
+        project = await avj.projects.get(project_id)
+    """
+
+    def __init__(self, client: ApiClient, max_workers=8):
+        """
+        Args:
+            client: The ApiClient to wrap (ideally a PooledApiClient)
+            max_workers: Maximum number of API calls in flight at once
+        """
+        self.client = client
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="vj-api")
+        self.projects = AsyncResource(client.projects, self)
+        self.assets = AsyncResource(client.assets, self)
+        self.video_files = AsyncResource(client.video_files, self)
+        self.edits = AsyncResource(client.edits, self)
+        self.scripts = AsyncResource(client.scripts, self)
+        self.prompts = AsyncResource(client.prompts, self)
+        self.user_account = AsyncResource(client.user_account, self)
+
+    async def run(self, fn, *args, **kwargs):
+        """Run any blocking callable on the API thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(fn, *args, **kwargs))
+
+    def close(self):
+        """Shut down the thread pool and the underlying connection pool"""
+        self.executor.shutdown(wait=False)
+        session = getattr(self.client, "session", None)
+        if session is not None:
+            session.close()
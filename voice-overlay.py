@@ -1,20 +1,24 @@
 from pydantic_ai import Agent
 from pydantic_ai.usage import UsageLimits
-from pydantic_ai.models.anthropic import AnthropicModel
-from pydantic_ai.models.gemini import GeminiModel
-from pydantic_ai.mcp import MCPServerStdio
-
-from videojungle import ApiClient
+from utils.mcp_pool import mcp_pool
 
 from typing import List, Optional
-import instructor
-from anthropic import Anthropic # Assumes you've set your API key as an environment variable
 
 from pydantic import BaseModel, Field
 from utils.tools import download
+from utils.vj import PooledApiClient, AsyncApiClient
+from utils.uploads import upload_or_link
+from utils.streaming import StreamedItems
+from utils.digest import AssetDigest, add_digest_tool, project_digest
+from utils.routing import CascadeFailed, ModelCascade, fills_duration, route_stats, video_urls
+from utils.timeline import ClipRequest, TimelineError, frames_to_timestamp, solve_timeline
+from utils.edit_spec import voiceover_edit_spec
+from utils.mcp_cache import invalidate_project
+from utils.render import RenderDownloader
+from utils.clients import anthropic_model, gemini_model, instructor_client
 import logfire
 import os
-import time
+import asyncio
 import click
 import random
 
@@ -28,34 +32,13 @@ vj_api_key = os.environ["VJ_API_KEY"]
 serper_api_key = os.environ["SERPER_API_KEY"]
 
 logfire.configure()
-logfire.instrument_openai()
-
-vj = ApiClient(vj_api_key) # video jungle api client
-
-vj_server = MCPServerStdio(
-    'uvx',
-    args=[
-        '-p', '3.11',
-        '--from', 'video_editor_mcp@0.1.36',
-        'video-editor-mcp'
-    ],
-    env={
-        'VJ_API_KEY': vj_api_key,
-    },
-    timeout=30
-)
 
-serper_server = MCPServerStdio(
-    'uvx',
-    args=[
-        '-p', '3.11',
-        'serper-mcp-server@latest',
-    ],
-    env={
-        'SERPER_API_KEY': serper_api_key,
-    },
-    timeout=30
-)
+vj = PooledApiClient(vj_api_key) # video jungle api client
+avj = AsyncApiClient(vj) # non-blocking view of the same client
+
+vj_server = mcp_pool.get("video-editor")
+
+serper_server = mcp_pool.get("serper")
 
 class ClipParameters(BaseModel):
     clip_topics: List[str]
@@ -75,8 +58,7 @@ class VideoEdit(BaseModel):
 def search_and_render_audio():
     # Let's search the web for some up to date Nathan Fielder episode topics / controversies
     # and generate paramters for our prompt
-    workflow_client = Anthropic()
-    client = instructor.from_anthropic(workflow_client)  # Initialize the instructor with Anthropic client
+    client = instructor_client("anthropic")  # Shared instructor-wrapped Anthropic client
 
     search_prompt = """
     I'm trying to come up with an interesting spoken dialogue prompt about nathan fielder's the rehearsal season 2.
@@ -100,6 +82,7 @@ def search_and_render_audio():
             "max_uses": 5
         }],
         response_model=ClipParameters,
+        cache_ttl=6 * 3600,  # web search results go stale faster than the default week
     )
 
     print(f"latest episode topic: {resp.latest_episode_topic}")
@@ -142,23 +125,45 @@ def search_and_render_audio():
     return (project.id, audio['asset_id'])
 
 # for flash preview
-cheap_model = GeminiModel("gemini-2.5-flash-preview-05-20")
+cheap_model = gemini_model("gemini-2.5-flash-preview-05-20")
 # for pro preview
-#model = GeminiModel("gemini-2.5-pro-preview-05-06")
-good_model = AnthropicModel("claude-sonnet-4-20250514")
-
-edit_agent = Agent(
+pro_model = gemini_model("gemini-2.5-pro-preview-05-06")
+good_model = anthropic_model("claude-sonnet-4-20250514")
+
+# Cheap model first; escalate only when its output fails validation
+search_cascade = ModelCascade("clip_search", [
+    ("flash", cheap_model),
+    ("pro", pro_model),
+], validators=[video_urls(min_count=1)])
+plan_cascade = ModelCascade("edit_plan", [
+    ("flash", cheap_model),
+    ("sonnet", good_model),
+])
+
+class ClipChoice(BaseModel):
+    asset_id: str
+    start_seconds: float = Field(default=0.0, description="Where the interesting part of the clip starts, in seconds")
+    preferred_seconds: Optional[float] = Field(default=None, gt=0, description="Roughly how long to show the clip, in seconds")
+    max_seconds: Optional[float] = Field(default=None, description="Never show more than this many seconds of the clip")
+
+class ClipPlan(BaseModel):
+    clips: List[ClipChoice] = Field(description="Clips in the order they should appear in the edit")
+
+plan_agent = Agent(
+    name='plan_agent',
     model=good_model,
     instructions='You are an expert video editor, creating fast paced, interesting video edits for social media. ' \
-    'You can answer questions, download and analyze videos, and create rough video edits using a mix of project assets and remote videos.' \
-    'By default, if a project id is provided, you will use ONLY the assets in that project to create the edit. If no project id is provided,'
-    'you will create a new project, and search videofiles to create an edit instead. For video assets in a project, you will use the type "user" instead of "videofile".' \
-    'if you are doing a voice over, you will use the audio asset in the project as the voiceover for the edit, and set the video asset\'s audio level to 0 so that the voiceover is the only audio in the edit. ',
-    mcp_servers=[vj_server],
-    output_type=VideoEdit,
+    'You plan edits from the video assets in a project: choose the order of the clips, where the interesting part of each clip starts, ' \
+    'and roughly how long each clip should be shown. Exact timings are computed for you afterwards so that the edit matches the voiceover, ' \
+    'so you never need to make the durations add up yourself.',
+    output_type=ClipPlan,
     instrument=True,
 )
+
+add_digest_tool(plan_agent, avj)
+
 search_agent = Agent(
+    name='search_agent',
     model=cheap_model,
     instructions='You are an expert video sourcer. You find the best source videos for a given topic.',
     mcp_servers=[vj_server, serper_server],
@@ -166,103 +171,252 @@ search_agent = Agent(
     instrument=True,
 )
 
-async def async_main(project_id: Optional[str] = None, asset_id: Optional[str] = None):
+async def process_video(project_id: str, video: VideoItem, may_upload=None, abandoned=None) -> bool:
+    """
+    Download one video and add it to the project, returning whether it succeeded
+
+    Args:
+        project_id: Project to upload the video to
+        video: Video to download
+        may_upload: Called just before uploading; the upload is skipped when it returns False
+        abandoned: If this is cancelled mid-download or mid-upload, (work, filename) is
+            appended here so the caller can wait for the worker thread and delete the file
+    """
+    print(f"Processing video - Title: {video.title}, URL: {video.url}")
+    # Create a safe filename by replacing problematic characters
+    safe_title = video.title.replace('/', '-').replace('\\', '-')
+    output_filename = f"{safe_title}.mp4"
+
+    async def finish(blocking):
+        # Cancelling this coroutine cannot stop the worker thread, so shield it and
+        # hand the still-running work to the caller to clean up after
+        work = asyncio.ensure_future(blocking)
+        try:
+            return await asyncio.shield(work)
+        except asyncio.CancelledError:
+            if abandoned is not None:
+                abandoned.append((work, output_filename))
+            raise
+
+    try:
+        # Try to download the video
+        print(f"Downloading {video.title}...")
+        await finish(asyncio.to_thread(download, video.url, output_path=output_filename, format="best"))
+
+        # Check if file exists before uploading
+        if os.path.exists(output_filename):
+            if may_upload is not None and not may_upload():
+                print(f"Skipping upload of {video.title}: the quota has been reached")
+                os.remove(output_filename)
+                return False
+            print(f"Upload to Video Jungle: {video.title}")
+            asset_id, how = await finish(avj.run(
+                upload_or_link, vj, project_id, output_filename,
+                name=video.title,
+                description=f"Agent downloaded video: {video.title}",
+            ))
+            print(f"Asset {how}: {asset_id}")
+            # Optionally, you can delete the local file after uploading
+            os.remove(output_filename)
+            return True
+        print(f"Error: Download failed or file not found for {video.title}")
+
+    except Exception as e:
+        # Only print error message if it's not empty
+        if str(e):
+            print(f"Error processing {video.title}: {e}")
+        else:
+            print(f"Error processing {video.title}")
+    return False
+
+async def source_clips(project_id: str, quota: int = 5, max_search_attempts: int = 5, download_workers: int = 3):
+    """
+    Search for clips and upload them to the project until quota uploads have succeeded
+
+    Searching and downloading overlap: each video is queued for download as soon as it
+    streams out of the search agent, and the next search round starts as soon as the
+    previous one returns, while its downloads are still running. An upload only starts
+    while the successful and in-flight uploads are short of quota, so the project never
+    ends up with more. Once quota uploads have succeeded, every outstanding search and
+    download is cancelled; downloads and uploads already running in worker threads are
+    waited for and their local files deleted.
+
+    Args:
+        project_id: Project to upload the clips to
+        quota: Number of successful uploads to stop at
+        max_search_attempts: Most search rounds to run
+        download_workers: How many videos to download and upload at once
+
+    Returns:
+        (successful uploads, titles of failed videos, search rounds started)
+    """
+    processed_urls = set()  # Keep track of URLs we've already tried
+    videos = StreamedItems(VideoItem, "videos", key=lambda video: video.url, seen=processed_urls)
+    successful_videos = 0
+    failed_videos = []
+    search_attempts = 0
+    uploading = 0
+    abandoned = []  # (work, filename) for downloads and uploads cancelled mid-way
+    quota_met = asyncio.Event()
+
+    async def search_round(attempt: int):
+        # Request more videos than needed to account for failures
+        videos_to_request = 8 if attempt == 1 else 10
+        tried_before = set(processed_urls)
+
+        def finds_new_clips(output):
+            new = [video for video in output.videos if video.url not in tried_before]
+            return None if new else "no new clips"
+
+        print(f"\nSearch attempt {attempt}: Searching for Nathan Fielder clips...")
+        search_query = f"can you search the web for the newest clips about nathan fielder? I'd like a list of {videos_to_request} urls with video clips. it's may 30, 2025 by the way, and nathan is doing a show called 'the rehearsal'."
+        if tried_before:
+            search_query += f" Please find different clips than these ones we already have: {', '.join(sorted(tried_before))}"
+
+        try:
+            result = await search_cascade.run(search_agent, search_query, validators=[finds_new_clips],
+                                              on_output=videos.on_output,
+                                              usage_limits=UsageLimits(request_limit=5))
+        except CascadeFailed as e:
+            if e.last_result is None:
+                print(f"Search attempt {attempt} failed: {str(e)[:100]}")
+                return
+            result = e.last_result
+        print(f"Found {len(result.output.videos)} videos in search attempt {attempt}")
+
+    async def search_rounds():
+        nonlocal search_attempts
+        try:
+            async with search_agent.run_mcp_servers():
+                # Don't wait for this round's downloads before searching again
+                while search_attempts < max_search_attempts and not quota_met.is_set():
+                    search_attempts += 1
+                    await search_round(search_attempts)
+        finally:
+            videos.close()
+
+    async def handle(video: VideoItem):
+        nonlocal successful_videos, uploading
+        claimed = False
+
+        def may_upload():
+            # Reserve a slot so uploads running at once can't overshoot the quota
+            nonlocal claimed, uploading
+            claimed = successful_videos + uploading < quota
+            uploading += claimed
+            return claimed
+
+        try:
+            uploaded = await process_video(project_id, video, may_upload=may_upload, abandoned=abandoned)
+        finally:
+            uploading -= claimed
+        if uploaded:
+            successful_videos += 1
+            print(f"Successfully uploaded video {successful_videos}/{quota}")
+            if successful_videos >= quota:
+                quota_met.set()
+        else:
+            failed_videos.append(video.title)
+
+    searching = asyncio.create_task(search_rounds())
+    downloading = asyncio.create_task(videos.consume(handle, workers=download_workers))
+    reached_quota = asyncio.create_task(quota_met.wait())
+    await asyncio.wait([downloading, reached_quota], return_when=asyncio.FIRST_COMPLETED)
+    if quota_met.is_set():
+        print(f"Reached {quota} uploads, cancelling outstanding searches and downloads")
+    for task in (searching, downloading, reached_quota):
+        task.cancel()
+    await asyncio.gather(searching, downloading, reached_quota, return_exceptions=True)
+    if not searching.cancelled() and searching.exception() is not None:
+        print(f"Searching stopped early: {searching.exception()}")
+    if abandoned:
+        print(f"Waiting for {len(abandoned)} cancelled downloads and uploads to stop before cleaning up")
+        await asyncio.gather(*(work for work, _ in abandoned), return_exceptions=True)
+        for _, filename in abandoned:
+            if os.path.exists(filename):
+                os.remove(filename)
+    return successful_videos, failed_videos, search_attempts
+
+def heuristic_plan(digests: List[AssetDigest]) -> ClipPlan:
+    """Outdoor scenes first, then the rest, each clip starting from the beginning"""
+    ordered = sorted(digests, key=lambda d: not d.outdoor)
+    return ClipPlan(clips=[ClipChoice(asset_id=d.id) for d in ordered])
+
+async def create_voiceover_edit(project_id: str, audio_asset_id: str, audio_seconds: float, planner: str = "agent") -> VideoEdit:
+    """Plan the clips, solve frame-exact timings that fill the voiceover, and create the edit once."""
+    digests = [d for d in await avj.run(project_digest, vj, project_id) if d.analyzed]
+    if not digests:
+        raise TimelineError(f"No analyzed video assets in project {project_id}")
+
+    durations = {d.id: d.duration for d in digests}
+
+    def solve(plan: ClipPlan):
+        clips = []
+        for choice in plan.clips:
+            if choice.asset_id not in durations:
+                continue
+            # The solver treats an unknown length as unbounded, which could run past the end
+            # of the asset, so bound it by the plan's max_seconds or leave the clip out
+            duration = durations[choice.asset_id]
+            if duration is None:
+                if choice.max_seconds is None:
+                    print(f"  Skipping {choice.asset_id}: its length is unknown")
+                    continue
+                duration = choice.start_seconds + choice.max_seconds
+            clips.append(ClipRequest(
+                asset_id=choice.asset_id,
+                source_start=choice.start_seconds,
+                preferred_seconds=choice.preferred_seconds,
+                max_seconds=choice.max_seconds,
+                asset_duration=duration,
+            ))
+        return solve_timeline(clips, audio_seconds)
+
+    solved = None
+    if planner == "agent":
+        print("Planning the edit...")
+        try:
+            result = await plan_cascade.run(plan_agent, f"""plan a single edit using the video assets in the project_id '{project_id}'.
+                                      the edit will play under a {audio_seconds:.1f} second voiceover. use every video asset once,
+                                      and if there are any outdoor scenes, show them first. give every clip whose length
+                                      is shown as '?' a max_seconds, or it will be left out.""",
+                                      validators=[fills_duration(solve)],
+                                      usage_limits=UsageLimits(request_limit=3))
+            solved = solve(result.output)
+        except Exception as e:
+            print(f"Planning failed ({str(e)[:80]}), falling back to the heuristic plan")
+    if solved is None:
+        solved = solve(heuristic_plan(digests))
+    for clip in solved:
+        print(f"  {clip.asset_id}: {frames_to_timestamp(clip.in_frame)} - {frames_to_timestamp(clip.out_frame)} "
+              f"at {frames_to_timestamp(clip.timeline_frame)}")
+
+    edit = await avj.projects.render_edit(project_id, voiceover_edit_spec(solved, audio_asset_id, audio_seconds))
+    invalidate_project(project_id)
+    return VideoEdit(project_id=project_id, edit_id=edit["edit_id"])
+
+async def async_main(project_id: Optional[str] = None, asset_id: Optional[str] = None, planner: str = "agent",
+                     download_workers: int = 3):
 
     if project_id:
 
         # Use existing project TODO: not implemented yet
         print(f"Using existing project ID: {project_id}")
-        project = vj.projects.get(project_id)
+        project = await avj.projects.get(project_id)
         print(f"Project name: {project.name}")
-        async with edit_agent.run_mcp_servers():
-            asset = vj.assets.get(asset_id)
-            asset_length = asset.create_parameters['metadata']['duration_seconds']
-            print("Video Editing Agent is now running")
-            result = await edit_agent.run(f"""can you use the video assets in the project_id '{project.id}' to create a
-                                      single edit incorporating all the assets that are videos in there? use the audio asset with id '{asset_id}' as the voiceover for the edit. it should have a start time of 0 and an end time of {asset_length} seconds.
-                                      be sure to not render the final video, just create the edit. if there are any outdoor scenes,
-                                      show them first. also, only use the assets in the project in the edit. you should grab
-                                      two asset's info from the project at a time, and use multiple requests from the get-project-assets
-                                      tool if you use it if necessary. only show each video once in the edit. remember, each asset in the edit should have a start_time and an end_time where something interesting happens,
-                                      and the total duration of these start_time and stop_time added together for the video edits should match the asset's duration, {asset_length} seconds.
-                                      think hard about when to start and stop each video asset in the edit, and how to make it flow well with the voiceover. MAKE SURE TO DOUBLE CHECK THAT THE TOTAL DURATION OF THE VIDEO EDIT IS THE SAME AS THE VOICEOVER DURATION WHICH IS {asset_length} SECONDS.
-                                      BE SURE TO SET ALL VIDEO ASSET's audio_level TO 0 so that the voiceover is the only audio in the edit.
-                                      remember, you MUST use the AUDIO asset in the project as the voiceover for the edit, and you can UPDATE the EDIT if you need to.""",
-                                        usage_limits=UsageLimits(request_limit=10))
-        print(f"resultant project is: {result.output.project_id} and {result.output.edit_id}")
+        asset = await avj.assets.get(asset_id)
+        asset_length = asset.create_parameters['metadata']['duration_seconds']
+        edit = await create_voiceover_edit(project.id, asset_id, asset_length, planner)
+        print(f"resultant project is: {edit.project_id} and {edit.edit_id}")
         return
     else:
         # Create new project with videos
 
-        successful_videos = 0
-        failed_videos = []
-        processed_urls = set()  # Keep track of URLs we've already tried
-        search_attempts = 0
-        max_search_attempts = 5  # Maximum number of search attempts
-        project_id, audio_asset_id = search_and_render_audio()
-        project = vj.projects.get(project_id)
-        while successful_videos < 5 and search_attempts < max_search_attempts:
-            search_attempts += 1
-
-            # Request more videos than needed to account for failures
-            videos_to_request = 8 if search_attempts == 1 else 10
-
-            async with search_agent.run_mcp_servers():
-                print(f"\nSearch attempt {search_attempts}: Searching for Nathan Fielder clips...")
-                search_query = f"can you search the web for the newest clips about nathan fielder? I'd like a list of {videos_to_request} urls with video clips. it's may 30, 2025 by the way, and nathan is doing a show called 'the rehearsal'."
-                if search_attempts > 1:
-                    search_query += " Please find different clips than before."
-
-                result = await search_agent.run(search_query, usage_limits=UsageLimits(request_limit=5))
-
-            print(f"Found {len(result.output.videos)} videos in search attempt {search_attempts}")
-
-            for video in result.output.videos:
-                # Skip if we've already tried this URL
-                if video.url in processed_urls:
-                    print(f"Skipping already processed URL: {video.url}")
-                    continue
-
-                processed_urls.add(video.url)
-
-                # Stop if we have enough videos
-                if successful_videos >= 5:
-                    break
-
-                print(f"Processing video - Title: {video.title}, URL: {video.url}")
-                # Create a safe filename by replacing problematic characters
-                safe_title = video.title.replace('/', '-').replace('\\', '-')
-                output_filename = f"{safe_title}.mp4"
-
-                try:
-                    # Try to download the video
-                    print(f"Downloading {video.title}...")
-                    download(video.url, output_path=output_filename, format="best")
-
-                    # Check if file exists before uploading
-                    if os.path.exists(output_filename):
-                        print(f"Upload to Video Jungle: {video.title}")
-                        project.upload_asset(
-                            name=video.title,
-                            description=f"Agent downloaded video: {video.title}",
-                            filename=output_filename,
-                        )
-                        successful_videos += 1
-                        print(f"Successfully uploaded video {successful_videos}/5")
-                        # Optionally, you can delete the local file after uploading
-                        os.remove(output_filename)
-                    else:
-                        print(f"Error: Download failed or file not found for {video.title}")
-                        failed_videos.append(video.title)
-
-                except Exception as e:
-                    # Only print error message if it's not empty
-                    if str(e):
-                        print(f"Error processing {video.title}: {e}")
-                    else:
-                        print(f"Error processing {video.title}")
-                    failed_videos.append(video.title)
-                    continue  # Skip to the next video
+        project_id, audio_asset_id = await asyncio.to_thread(search_and_render_audio)
+        project = await avj.projects.get(project_id)
+        successful_videos, failed_videos, search_attempts = await source_clips(
+            project.id, quota=5, download_workers=download_workers,
+        )
 
         # Summary
         print(f"\nFinal Summary: Successfully processed {successful_videos} videos after {search_attempts} search attempts")
@@ -272,40 +426,32 @@ async def async_main(project_id: Optional[str] = None, asset_id: Optional[str] =
         if successful_videos < 5:
             print(f"\nWarning: Only managed to download {successful_videos} videos after {search_attempts} attempts")
 
-        time.sleep(45) # wait 45 seconds for analysis to finish (we'll make this precise later)
+        await asyncio.sleep(45) # wait 45 seconds for analysis to finish (we'll make this precise later)
     # Next we can use the project info to generate a rough cut
 
-    async with edit_agent.run_mcp_servers():
-        print("Video Editing Agent is now running")
-        asset = vj.assets.get(audio_asset_id)
-        asset_length = asset.create_parameters['metadata']['duration_seconds']
-        result = await edit_agent.run(f"""can you use the video assets in the project_id '{project.id}' to create a
-                                      single edit incorporating all the assets that are videos in there? use the audio asset with id '{audio_asset_id}' as the voiceover for the edit. it should have a start time of 0 and an end time of {asset_length} seconds.
-                                      be sure to not render the final video, just create the edit. if there are any outdoor scenes,
-                                      show them first. also, only use the assets in the project in the edit. you should grab
-                                      two asset's info from the project at a time, and use multiple requests from the get-project-assets
-                                      tool if you use it if necessary. only show each video once in the edit. remember, each asset in the edit should have a start_time and an end_time where something interesting happens,
-                                      and the total duration of these start_time and stop_time added together for the video edits should match the asset's duration, {asset_length} seconds.
-                                      think hard about when to start and stop each video asset in the edit, and how to make it flow well with the voiceover. MAKE SURE TO DOUBLE CHECK THAT THE TOTAL DURATION OF THE VIDEO EDIT IS THE SAME AS THE VOICEOVER DURATION WHICH IS {asset_length} SECONDS.
-                                      BE SURE TO SET ALL VIDEO ASSET's audio_level TO 0 so that the voiceover is the only audio in the edit.
-                                      remember, you MUST use the AUDIO asset in the project as the voiceover for the edit, and you can UPDATE the EDIT if you need to. """,
-                                      usage_limits=UsageLimits(request_limit=14))
-    print(f"resultant project is: {result.output.project_id} and {result.output.edit_id}")
+    asset = await avj.assets.get(audio_asset_id)
+    asset_length = asset.create_parameters['metadata']['duration_seconds']
+    edit = await create_voiceover_edit(project.id, audio_asset_id, asset_length, planner)
+    print(f"resultant project is: {edit.project_id} and {edit.edit_id}")
     # below is not necessary because open the edit in the browser is default behavior
-    # vj.edits.open_in_browser(project.id, result.output.edit_id)
-    # Render and download the edit
-    vj.edits.download_edit_render(
-        project_id=result.output.project_id,
-        edit_id=result.output.edit_id,
+    # vj.edits.open_in_browser(project.id, edit.edit_id)
+    # Render and download the edit, resuming if the connection drops
+    await avj.run(
+        RenderDownloader(vj).download_edit_render,
+        project_id=edit.project_id,
+        edit_id=edit.edit_id,
         filename=f"{project.name}_edit.mp4"
     )
+    print(route_stats().summary())
 
 @click.command()
 @click.option('--project-id', '-p', help='Existing project ID to use instead of creating a new one')
 @click.option('--asset-id', '-a', help='Audio asset ID to use for the edit')
-def main(project_id: Optional[str] = None, asset_id: Optional[str] = None):
-    import asyncio
-    asyncio.run(async_main(project_id, asset_id))
+@click.option('--planner', type=click.Choice(['agent', 'heuristic']), default='agent', help='Who chooses clip order and emphasis (timings are always solved locally)')
+@click.option('--download-workers', type=int, default=3, help='How many clips to download and upload at once')
+def main(project_id: Optional[str] = None, asset_id: Optional[str] = None, planner: str = "agent",
+         download_workers: int = 3):
+    asyncio.run(mcp_pool.run(async_main(project_id, asset_id, planner, download_workers)))
 
 if __name__ == "__main__":
     main()